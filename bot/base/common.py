@@ -24,13 +24,17 @@ class ImageMatchConfig:
     match_area: Area
     match_mode: ImageMatchMode
     match_accuracy: float
+    pyramid_scale: int
 
     def __init__(self, match_area: Area = Area(0, 0, 720, 1280),
                  match_mode: ImageMatchMode = ImageMatchMode.IMAGE_MATCH_MODE_TEMPLATE_MATCH,
-                 match_accuracy: float = 0.86):
+                 match_accuracy: float = 0.86,
+                 pyramid_scale: int = 1):
         self.match_area = match_area
         self.match_mode = match_mode
         self.match_accuracy = match_accuracy
+        # pyramid_scale > 1: 先在 1/scale 分辨率上找候选位置, 再在原分辨率小窗口内确认
+        self.pyramid_scale = pyramid_scale
 
 
 class Coordinate:
@@ -3,6 +3,7 @@ from abc import abstractmethod, ABCMeta
 from bot.base.resource import UI
 from bot.base.task import Task
 from bot.conn.ctrl import AndroidController
+from bot.recog.frame_cache import get_frame
 
 
 class BotContext(metaclass=ABCMeta):
@@ -15,10 +16,20 @@ class BotContext(metaclass=ABCMeta):
 
     next_ui: UI = None
 
+    # 与上一帧相比: frame_changed 是否有变化, dirty_area 变化区域 (Area, 无变化时为 None).
+    # dirty_area 仅供参考 (目前没有解析依赖它), 与 frame_changed 用同一阈值, frame_changed 为 True 时一定不为 None
+    frame_changed: bool = True
+    dirty_area = None
+
     def __init__(self, task: Task, ctrl: AndroidController):
         self.task = task
         self.ctrl = ctrl
 
+    # frame 当前画面的识别缓存, current_screen 变化后自动失效
+    @property
+    def frame(self):
+        return get_frame(self.current_screen)
+
     @abstractmethod
     def is_task_finish(self) -> bool:
         pass
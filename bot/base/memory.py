@@ -0,0 +1,152 @@
+import gc
+import os
+import threading
+import time
+import tracemalloc
+
+import bot.base.log as logger
+
+log = logger.get_logger(__name__)
+
+# 内存策略: 执行循环每轮只回收第 0 代, 完整回收只在间隔足够久或 RSS 明显上涨时进行.
+# 启动完成后 gc.freeze() 把模板/模型等常驻对象移出分代回收, 后续回收不再扫描它们.
+GEN0_THRESHOLD = 5000
+FULL_COLLECT_EVERY = 200
+FULL_COLLECT_RSS_GROWTH_MB = 64.0
+
+TRACE_FRAMES = 8
+TRACE_EVERY = 20
+TRACE_FOCUS = ("parse.py", "cultivate.py")
+
+_lock = threading.Lock()
+_state = {
+    "iterations": 0,
+    "gen0_collections": 0,
+    "full_collections": 0,
+    "last_full_rss_mb": 0.0,
+    "last_full_at": 0.0,
+    "full_ms": 0.0,
+}
+_trace = {"prev": None, "last": None, "prev_iter": 0, "last_iter": 0}
+
+
+def rss_mb():
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss / 1048576.0
+    except Exception:
+        return 0.0
+
+
+def configure_gc():
+    try:
+        _, g1, g2 = gc.get_threshold()
+        gc.set_threshold(GEN0_THRESHOLD, g1, g2)
+        gc.collect()
+        gc.freeze()
+        _state["last_full_rss_mb"] = rss_mb()
+        _state["last_full_at"] = time.time()
+        log.debug(f"gc configured: threshold={gc.get_threshold()}, frozen={gc.get_freeze_count()}")
+    except Exception:
+        pass
+    if os.getenv("UAT_TRACEMALLOC", "0") == "1":
+        start_tracing()
+
+
+def full_collect(reason=""):
+    started = time.perf_counter()
+    gc.collect()
+    with _lock:
+        _state["full_collections"] += 1
+        _state["full_ms"] = (time.perf_counter() - started) * 1000.0
+        _state["last_full_rss_mb"] = rss_mb()
+        _state["last_full_at"] = time.time()
+    if reason:
+        log.debug(f"full gc ({reason}) took {_state['full_ms']:.0f} ms")
+
+
+def after_iteration():
+    """Called once per executor loop iteration in place of a blanket gc.collect()."""
+    with _lock:
+        _state["iterations"] += 1
+        n = _state["iterations"]
+    gc.collect(0)
+    _state["gen0_collections"] += 1
+    if n % FULL_COLLECT_EVERY == 0:
+        full_collect("periodic")
+    elif n % 10 == 0 and rss_mb() - _state["last_full_rss_mb"] > FULL_COLLECT_RSS_GROWTH_MB:
+        full_collect("rss growth")
+    if tracemalloc.is_tracing() and n % TRACE_EVERY == 0:
+        take_snapshot()
+
+
+def start_tracing(frames=TRACE_FRAMES):
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        log.info(f"tracemalloc started ({frames} frames)")
+    take_snapshot()
+
+
+def stop_tracing():
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+    with _lock:
+        _trace.update(prev=None, last=None, prev_iter=0, last_iter=0)
+
+
+def take_snapshot():
+    if not tracemalloc.is_tracing():
+        return
+    snap = tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    ))
+    with _lock:
+        _trace["prev"], _trace["prev_iter"] = _trace["last"], _trace["last_iter"]
+        _trace["last"], _trace["last_iter"] = snap, _state["iterations"]
+
+
+def _top(stats, limit, iterations):
+    out = []
+    for st in stats[:limit]:
+        frame = st.traceback[0]
+        out.append({
+            "site": f"{frame.filename}:{frame.lineno}",
+            "size_diff_kb": round(st.size_diff / 1024.0, 1),
+            "count_diff": st.count_diff,
+            "per_iteration_kb": round(st.size_diff / 1024.0 / iterations, 2) if iterations else None,
+        })
+    return out
+
+
+def allocation_report(limit=20):
+    """Allocation growth between the two latest snapshots, overall and for TRACE_FOCUS files."""
+    with _lock:
+        prev, last = _trace["prev"], _trace["last"]
+        iterations = _trace["last_iter"] - _trace["prev_iter"]
+    report = {"tracing": tracemalloc.is_tracing(), "iterations": iterations, "top": [], "focus": []}
+    if tracemalloc.is_tracing():
+        cur, peak = tracemalloc.get_traced_memory()
+        report["traced_mb"] = round(cur / 1048576.0, 1)
+        report["peak_mb"] = round(peak / 1048576.0, 1)
+    if prev is None or last is None:
+        return report
+    stats = last.compare_to(prev, "lineno")
+    stats = [s for s in stats if s.size_diff > 0]
+    report["top"] = _top(stats, limit, iterations)
+    focus = [s for s in stats if any(s.traceback[0].filename.endswith(f) for f in TRACE_FOCUS)]
+    report["focus"] = _top(focus, limit, iterations)
+    return report
+
+
+def stats():
+    with _lock:
+        d = dict(_state)
+    d["rss_mb"] = round(rss_mb(), 1)
+    d["gc_threshold"] = gc.get_threshold()
+    d["gc_counts"] = gc.get_count()
+    try:
+        d["gc_frozen"] = gc.get_freeze_count()
+    except Exception:
+        pass
+    return d
@@ -0,0 +1,55 @@
+import hashlib
+import os
+import pickle
+
+import bot.base.log as logger
+
+log = logger.get_logger(__name__)
+
+# 预编译数据的 pickle 缓存: 模板库 / 事件库 / 技能目录共用.
+# 文件内容是 {"key": key, "data": data}, key 不一致 (源数据或相关代码变了) 就当作没有缓存; 写入先写临时文件再替换.
+
+
+def digest(*parts, modules=()) -> str:
+    """blake2b over `parts` (bytes or str) and the source files of `modules`. Passing the modules whose
+    instances get pickled makes a change to their code invalidate the cache."""
+    h = hashlib.blake2b(digest_size=16)
+    for p in parts:
+        h.update(p if isinstance(p, bytes) else str(p).encode("utf-8", "ignore"))
+        h.update(b"\0")
+    for m in modules:
+        try:
+            with open(m.__file__, "rb") as f:
+                h.update(f.read())
+        except Exception:
+            h.update(m.__name__.encode())
+    return h.hexdigest()
+
+
+def load(path, key):
+    """Cached data stored under `key`, or None."""
+    if not path:
+        return None
+    try:
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if not isinstance(data, dict) or data.get("key") != key:
+            return None
+        return data.get("data")
+    except Exception:
+        return None
+
+
+def save(path, key, data):
+    if not path:
+        return
+    try:
+        d = os.path.dirname(path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump({"key": key, "data": data}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except Exception as e:
+        log.debug(f"pickle cache write failed for {path}: {e}")
@@ -1,4 +1,3 @@
-import gc
 import os
 import sys
 import time
@@ -71,6 +70,66 @@ def soft_process_restart():
             pass
 
 
+# restart_rss_mb: 任务结束后 RSS 超过该值才重启进程, 否则在进程内回收任务状态直接开始下一个任务
+DEFAULT_RESTART_RSS_MB = 4096
+
+
+def restart_rss_limit_mb():
+    try:
+        env = os.getenv("UAT_RESTART_RSS_MB")
+        if env:
+            return float(env)
+        from config import CONFIG
+        v = CONFIG.bot.auto.restart_rss_mb
+        return float(v) if v else DEFAULT_RESTART_RSS_MB
+    except Exception:
+        return DEFAULT_RESTART_RSS_MB
+
+
+def recycle_task_state(reason: str = "", shared: bool = False):
+    """`shared`: other devices are still running, so keep the frame cache, controller and OCR models."""
+    if not shared:
+        try:
+            from bot.recog.frame_cache import invalidate
+            invalidate()
+        except Exception:
+            pass
+        try:
+            import bot.conn.fetch as fetch
+            sc = getattr(fetch, 'shared_controller', None)
+            fetch.shared_controller = None
+            if sc is not None:
+                sc.destroy()
+        except Exception:
+            pass
+        try:
+            from bot.recog.ocr import release_ocr
+            release_ocr(reason)
+        except Exception:
+            pass
+    try:
+        from bot.base.memory import full_collect, rss_mb
+        full_collect(reason)
+        return rss_mb()
+    except Exception:
+        return 0.0
+
+
+def finish_task_process(reason: str = "task end", shared: bool = False):
+    """Called after every task: recycle per-task state in-process, restart only above the RSS limit."""
+    rss = recycle_task_state(reason, shared)
+    limit = restart_rss_limit_mb()
+    if rss > limit and shared:
+        log.info(f"RSS {rss:.0f} MB above {limit:.0f} MB, restart deferred until other devices finish")
+        return False
+    if rss > limit:
+        log.info(f"RSS {rss:.0f} MB above {limit:.0f} MB after task, restarting process")
+        soft_process_restart()
+        return True
+    log.info(f"task state recycled in-process (RSS {rss:.0f} MB / {limit:.0f} MB)")
+    return False
+
+
 def acquire_instance_lock():
     try:
         os.makedirs('userdata', exist_ok=True)
@@ -232,7 +291,8 @@ def save_scheduler_tasks():
                     'task_type': ttype,
                     'task_desc': desc,
                     'attachment_data': attachment,
-                    'cron_job_config': {'cron': cron_dump} if cron_dump else None
+                    'cron_job_config': {'cron': cron_dump} if cron_dump else None,
+                    'device_name': getattr(t, 'device_name', None)
                 }
                 tasks.append(entry)
             except Exception:
@@ -276,7 +336,8 @@ def load_saved_tasks():
                     it.get('task_type'),
                     it.get('task_desc'),
                     cron_obj,
-                    it.get('attachment_data')
+                    it.get('attachment_data'),
+                    it.get('device_name')
                 )
                 try:
                     from bot.engine.scheduler import scheduler
@@ -309,9 +370,11 @@ def purge_all(reason: str = ""):
         pass
 
     try:
-        from bot.recog.ocr import reset_ocr
-        reset_ocr()
-        log.info("purge: OCR reset")
+        from bot.recog.ocr import release_ocr
+        if release_ocr(reason):
+            log.info("purge: OCR reset")
+        else:
+            log.info("purge: OCR models kept warm")
     except Exception:
         pass
 
@@ -356,8 +419,8 @@ def purge_all(reason: str = ""):
         pass
 
     try:
-        gc.collect()
-        gc.collect()
+        from bot.base.memory import full_collect
+        full_collect("purge")
     except Exception:
         pass
 
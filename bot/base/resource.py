@@ -1,6 +1,7 @@
 import os
 import cv2
 from bot.base.common import ImageMatchConfig
+import bot.base.template_bank as template_bank
 
 import weakref
 
@@ -20,6 +21,7 @@ class Template:
         self.template_name = template_name
         self.template_path = os.path.join("resource" + self.resource_path, template_name.lower() + ".png")
         self.template_img = None
+        self.template_scaled = {}
         self.image_match_config = image_match_config
         TEMPLATE_INSTANCES.add(self)
 
@@ -27,11 +29,24 @@ class Template:
     def template_image(self):
         if self.template_img is None:
             try:
-                self.template_img = cv2.imread(self.template_path, 0)
+                self.template_img = template_bank.get(self.template_path)
             except Exception:
                 self.template_img = None
         return self.template_img
 
+    def scaled_image(self, scale: int):
+        if scale <= 1:
+            return self.template_image
+        img = self.template_scaled.get(scale)
+        if img is None:
+            base = self.template_image
+            if base is None:
+                return None
+            h, w = base.shape[:2]
+            img = cv2.resize(base, (max(1, w // scale), max(1, h // scale)), interpolation=cv2.INTER_AREA)
+            self.template_scaled[scale] = img
+        return img
+
 
 class UI:
     ui_name = None
@@ -50,6 +65,7 @@ def purge_all_templates():
         for tpl in list(TEMPLATE_INSTANCES):
             try:
                 tpl.template_img = None
+                tpl.template_scaled = {}
             except Exception:
                 pass
     except Exception:
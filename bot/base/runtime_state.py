@@ -19,9 +19,38 @@ _state: Dict[str, Any] = {
 }
 
 
+# 多设备时每台设备各自的计数, 顶层字段保留最近一次更新的值
+_devices: Dict[str, Dict[str, Any]] = {}
+
+
+def _device_state(device: Optional[str]) -> Optional[Dict[str, Any]]:
+    if not device:
+        return None
+    d = _devices.get(device)
+    if d is None:
+        d = {"repetitive_count": 0, "repetitive_other_clicks": 0, "watchdog_unchanged": 0}
+        _devices[device] = d
+    d["last_update_ts"] = time.time()
+    return d
+
+
 def get_state() -> Dict[str, Any]:
     with _lock:
-        return dict(_state)
+        state = dict(_state)
+        state["devices"] = {k: dict(v) for k, v in _devices.items()}
+    try:
+        from bot.engine.scheduler import scheduler
+        for slot in scheduler.device_status():
+            state["devices"].setdefault(slot["device"], {}).update(slot)
+    except Exception:
+        pass
+    try:
+        from bot.recog.ocr import OCR_GATE
+        for device, m in OCR_GATE.stats()["devices"].items():
+            state["devices"].setdefault(device, {})["recognition"] = m
+    except Exception:
+        pass
+    return state
 
 
 def set_thresholds(repetitive_threshold: Optional[int] = None,
@@ -47,16 +76,20 @@ def set_counts(repetitive_count: Optional[int] = None,
         _state["last_update_ts"] = time.time()
 
 
-def update_repetitive(repetitive_count: int, repetitive_other_clicks: int) -> None:
+def update_repetitive(repetitive_count: int, repetitive_other_clicks: int, device: Optional[str] = None) -> None:
     with _lock:
-        _state["repetitive_count"] = int(max(0, repetitive_count))
-        _state["repetitive_other_clicks"] = int(max(0, repetitive_other_clicks))
+        for d in (_state, _device_state(device)):
+            if d is not None:
+                d["repetitive_count"] = int(max(0, repetitive_count))
+                d["repetitive_other_clicks"] = int(max(0, repetitive_other_clicks))
         _state["last_update_ts"] = time.time()
 
 
-def update_watchdog(watchdog_unchanged: int) -> None:
+def update_watchdog(watchdog_unchanged: int, device: Optional[str] = None) -> None:
     with _lock:
-        _state["watchdog_unchanged"] = int(max(0, watchdog_unchanged))
+        for d in (_state, _device_state(device)):
+            if d is not None:
+                d["watchdog_unchanged"] = int(max(0, watchdog_unchanged))
         _state["last_update_ts"] = time.time()
 
 
@@ -47,6 +47,9 @@ class Task(metaclass=ABCMeta):
     task_start_time: int = None
     task_end_time: int = None
     end_task_reason: EndTaskReason = None
+    # device_name: 指定运行的设备, 为空时分配给任意空闲设备; device: 实际运行(过)的设备
+    device_name: str = None
+    device: str = None
 
     def __init__(self, app_name: str, task_execute_mode: TaskExecuteMode, task_type,
                  task_desc: str, cron_job_config: CronJobConfig = None):
@@ -60,6 +63,8 @@ class Task(metaclass=ABCMeta):
             self.task_status = TaskStatus.TASK_STATUS_PENDING
         self.task_desc = task_desc
         self.cron_job_config = cron_job_config
+        self.device_name = None
+        self.device = None
 
     @abstractmethod
     def end_task(self, status, reason) -> None:
@@ -0,0 +1,113 @@
+import glob
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+import bot.base.log as logger
+import bot.base.pickle_cache as pickle_cache
+
+log = logger.get_logger(__name__)
+
+DEFAULT_ROOT = os.path.join("resource", "umamusume")
+DEFAULT_CACHE_PATH = os.path.join("userdata", "template_bank.pkl")
+CACHE_VERSION = 1
+
+_lock = threading.Lock()
+_images = {}
+_stats = {"hits": 0, "misses": 0, "bytes": 0, "count": 0, "load_ms": 0.0, "source": "none"}
+
+
+def _key(path):
+    return os.path.normcase(os.path.normpath(path))
+
+
+def _decode(path):
+    try:
+        buf = np.fromfile(path, dtype=np.uint8)
+        if buf.size == 0:
+            return None
+        return cv2.imdecode(buf, cv2.IMREAD_GRAYSCALE)
+    except Exception:
+        return None
+
+
+def _store(key, img):
+    old = _images.get(key)
+    if old is not None:
+        _stats["bytes"] -= int(old.nbytes)
+    _images[key] = img
+    _stats["bytes"] += int(img.nbytes)
+    _stats["count"] = len(_images)
+
+
+def _signature(files):
+    h = hashlib.sha1()
+    h.update(str(CACHE_VERSION).encode())
+    for f in files:
+        try:
+            st = os.stat(f)
+            h.update(f"{_key(f)}|{st.st_size}|{st.st_mtime_ns}\n".encode("utf-8", "ignore"))
+        except Exception:
+            continue
+    return h.hexdigest()
+
+
+def preload(root=DEFAULT_ROOT, workers=None, cache_path=None):
+    """Decode every template png under `root` into memory. With `cache_path`, a packed
+    pickle of the decoded arrays is reused while the png set is unchanged."""
+    started = time.time()
+    files = sorted(glob.glob(os.path.join(root, "**", "*.png"), recursive=True))
+    if not files:
+        return 0
+    sig = _signature(files) if cache_path else None
+    images = pickle_cache.load(cache_path, sig)
+    source = "cache"
+    if images is None:
+        source = "disk"
+        if workers is None:
+            workers = max(1, min(8, os.cpu_count() or 1))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            decoded = list(pool.map(_decode, files))
+        images = {_key(f): img for f, img in zip(files, decoded) if img is not None}
+        pickle_cache.save(cache_path, sig, images)
+    with _lock:
+        for k, img in images.items():
+            _store(k, img)
+        _stats["load_ms"] = (time.time() - started) * 1000.0
+        _stats["source"] = source
+    log.info(f"template bank: {len(images)} templates, {_stats['bytes'] / 1048576:.1f} MB "
+             f"from {source} in {_stats['load_ms']:.0f} ms")
+    return len(images)
+
+
+def get(path):
+    key = _key(path)
+    img = _images.get(key)
+    if img is not None:
+        _stats["hits"] += 1
+        return img
+    img = _decode(path)
+    with _lock:
+        _stats["misses"] += 1
+        if img is not None:
+            _store(key, img)
+    if img is not None:
+        log.debug(f"template bank miss: {path}")
+    return img
+
+
+def stats():
+    with _lock:
+        return dict(_stats)
+
+
+def purge():
+    with _lock:
+        _images.clear()
+        _stats["bytes"] = 0
+        _stats["count"] = 0
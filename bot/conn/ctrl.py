@@ -29,4 +29,11 @@ class AndroidController(metaclass=ABCMeta):
     def get_screen(self, to_gray=False):
         pass
 
+    def streaming(self) -> bool:
+        return False
+
+    def wait_for(self, template=None, ui=None, changed=False, stable=False, timeout=2.0, interval=None,
+                 reference=None):
+        pass
+
 
@@ -1,16 +1,59 @@
-import cv2
+import threading
 import time
 from typing import Dict, Any, Optional
+from bot.base.common import Area
 from bot.conn.u2_ctrl import U2AndroidController
-from bot.recog.image_matcher import image_match, compare_color_equal
+from bot.recog.frame_cache import get_frame
+from bot.recog.pixel_probe import LineProbe, ProbeSet
 from bot.recog.ocr import ocr_line
+import bot.recog.service as recog_service
 from module.umamusume.asset import MOTIVATION_LIST
 
 shared_controller: Optional[U2AndroidController] = None
 
+TOP_AREA = Area(0, 0, 720, 186)
+
+# 体力条: 160 行 229~505 像素中不是灰色(空槽)的像素数
+ENERGY_BAR_WIDTH = 276
+ENERGY_PROBES = ProbeSet([
+    LineProbe("energy", 160, 229, 229 + ENERGY_BAR_WIDTH, (117, 117, 117), tolerance=20, count="miss"),
+])
+
+
+# 多设备时每个执行线程绑定自己的控制器, 没有绑定时退回进程共享的控制器
+_bound = threading.local()
+
+
+def bind_controller(ctrl: Optional[U2AndroidController]):
+    _bound.ctrl = ctrl
+
+
+def bound(fn):
+    """`fn` wrapped to run with the calling thread's device, priority and controller bindings.
+    Thread pools and helper threads don't inherit thread-locals, so wrap the target when submitting."""
+    device = recog_service.current_device()
+    level = recog_service.current_priority()
+    ctrl = getattr(_bound, "ctrl", None)
+
+    def run(*args, **kwargs):
+        prev_device = recog_service.current_device()
+        prev_ctrl = getattr(_bound, "ctrl", None)
+        recog_service.bind_device(device)
+        bind_controller(ctrl)
+        try:
+            with recog_service.priority(level):
+                return fn(*args, **kwargs)
+        finally:
+            recog_service.bind_device(prev_device)
+            bind_controller(prev_ctrl)
+    return run
+
 
 def get_shared_controller() -> U2AndroidController:
     global shared_controller
+    ctrl = getattr(_bound, "ctrl", None)
+    if ctrl is not None:
+        return ctrl
     if shared_controller is None:
         shared_controller = U2AndroidController()
         shared_controller.init_env()
@@ -30,69 +73,84 @@ def ensure_top_img(img: Optional[any]) -> any:
         return img[:186, :]
     return img
 
-def read_energy(img: Optional[any] = None) -> int:
+def ensure_frame(img: Optional[any] = None):
     if img is None:
-        top = ensure_top_img(None)
-    else:
-        top = img
-    if top is None or top.size == 0:
+        try:
+            ctrl = get_shared_controller()
+            img = ctrl.get_screen(to_gray=False)
+        except Exception:
+            img = None
+    if img is None or getattr(img, 'size', 0) == 0:
+        return None
+    return get_frame(img)
+
+def read_energy(img: Optional[any] = None) -> int:
+    fc = ensure_frame(img)
+    if fc is None:
         time.sleep(0.37)
-        top = ensure_top_img(None)
-        if top is None or top.size == 0:
+        fc = ensure_frame(None)
+        if fc is None:
             return 0
-    sub = top[160:161, 229:505]
-    if sub.size == 0:
-        return 0
-    cnt = 0
-    for c in sub[0]:
-        if not compare_color_equal(c, [117, 117, 117], tolerance=20):
-            cnt += 1
-    return int(cnt / 276 * 100)
+    cached = fc.memo.get("energy")
+    if cached is not None:
+        return cached
+    cnt = ENERGY_PROBES.evaluate(fc.image)["energy"]
+    energy = int(cnt / ENERGY_BAR_WIDTH * 100)
+    fc.memo["energy"] = energy
+    return energy
 
 def read_year(img: Optional[any] = None) -> str:
-    if img is None:
-        top = ensure_top_img(None)
-    else:
-        top = img
-    if top is None or top.size == 0:
+    fc = ensure_frame(img)
+    if fc is None:
         return "Unknown"
+    cached = fc.memo.get("year")
+    if cached is not None:
+        return cached
     rois = [
         (40, 120, 0, 1280),
         (60, 140, 0, 1280),
         (74, 100, 250, 575),
     ]
+    year = "Unknown"
     for y1, y2, x1, x2 in rois:
-        sub = top[y1:y2, x1:x2]
-        if sub.size == 0:
+        gray = fc.crop(y1, y2, x1, x2, "gray")
+        if gray is None or gray.size == 0:
             continue
-        gray = cv2.cvtColor(sub, cv2.COLOR_BGR2GRAY)
         t = ocr_text(gray).lower()
         if not t:
             continue
         if "junior" in t:
-            return "Junior"
-        if "classic" in t:
-            return "Classic"
-        if "senior" in t:
-            return "Senior"
-        if "finale" in t or "final" in t:
-            return "Finals"
-    return "Unknown"
+            year = "Junior"
+        elif "classic" in t:
+            year = "Classic"
+        elif "senior" in t:
+            year = "Senior"
+        elif "finale" in t or "final" in t:
+            year = "Finals"
+        else:
+            continue
+        break
+    fc.memo["year"] = year
+    return year
 
 def read_mood(img: Optional[any] = None) -> Optional[int]:
-    if img is None:
-        top = ensure_top_img(None)
-    else:
-        top = img
-    if top is None or top.size == 0:
+    fc = ensure_frame(img)
+    if fc is None:
         return None
-    gray = cv2.cvtColor(top, cv2.COLOR_BGR2GRAY)
+    if "mood" in fc.memo:
+        return fc.memo["mood"]
+    mood = None
     for i in range(len(MOTIVATION_LIST)):
-        res = image_match(gray, MOTIVATION_LIST[i])
-        if res.find_match:
-            return i + 1
-    return None
-
-def fetch_state(img: Optional[any] = None) -> Dict[str, Any]:
-    top = ensure_top_img(img)
-    return {"year": read_year(top), "mood": read_mood(top), "energy": read_energy(top)}
+        res = fc.match(MOTIVATION_LIST[i], TOP_AREA)
+        if res is not None and res.find_match:
+            mood = i + 1
+            break
+    fc.memo["mood"] = mood
+    return mood
+
+def fetch_state(img: Optional[any] = None, ctx=None) -> Dict[str, Any]:
+    if img is None and ctx is not None:
+        img = getattr(ctx, 'current_screen', None)
+    fc = ensure_frame(img)
+    frame = fc.image if fc is not None else None
+    return {"year": read_year(frame), "mood": read_mood(frame), "energy": read_energy(frame)}
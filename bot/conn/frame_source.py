@@ -0,0 +1,75 @@
+import time
+
+import bot.base.log as logger
+
+log = logger.get_logger(__name__)
+
+
+class Frame:
+    __slots__ = ("image", "timestamp", "seq")
+
+    def __init__(self, image, timestamp, seq):
+        self.image = image
+        self.timestamp = timestamp
+        self.seq = seq
+
+    def age(self):
+        return time.time() - self.timestamp
+
+
+class FrameSource:
+    """Timestamped, sequenced frames from a push-based device stream (the minicap reader).
+
+    Nothing is polled: the stream's reader thread publishes encoded frames as the display changes and a
+    frame is only decoded when asked for. `stream` provides `is_running()`, `seq`, `timestamp`,
+    `wait(predicate, timeout)` and `decode()` -> (image, timestamp, seq)."""
+
+    def __init__(self, stream):
+        self.stream = stream
+
+    def start(self):
+        if not self.stream.is_running():
+            raise RuntimeError("frame stream is not running")
+
+    def stop(self):
+        self.stream = None
+
+    def is_running(self):
+        s = self.stream
+        return s is not None and s.is_running()
+
+    @property
+    def seq(self):
+        s = self.stream
+        return s.seq if s is not None else 0
+
+    def _frame(self):
+        s = self.stream
+        if s is None:
+            return None
+        img, ts, seq = s.decode()
+        if img is None:
+            return None
+        return Frame(img, ts, seq)
+
+    def latest(self):
+        return self._frame()
+
+    def wait_newer(self, seq=None, timeout=1.0, max_age=None):
+        """Return the first frame with seq > `seq` (and younger than `max_age` s), or None on timeout."""
+        s = self.stream
+        if s is None:
+            return None
+        if seq is None:
+            seq = s.seq
+        ok = s.wait(lambda: s.seq > seq and (max_age is None or time.time() - s.timestamp <= max_age), timeout)
+        return self._frame() if ok else None
+
+    def wait_after(self, ts, timeout=1.0):
+        """Return the first frame captured at or after wall-clock time `ts`. The stream only pushes when
+        the display changes, so on timeout the latest frame is still the current screen."""
+        s = self.stream
+        if s is None:
+            return None
+        s.wait(lambda: s.seq > 0 and s.timestamp >= ts, timeout)
+        return self._frame()
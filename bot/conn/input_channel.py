@@ -0,0 +1,159 @@
+import itertools
+import subprocess
+import threading
+import time
+from collections import deque
+
+import bot.base.log as logger
+
+log = logger.get_logger(__name__)
+
+# 输入通道: 点击 / 滑动不再每次都启动 adb 进程
+#   shell: 常驻一个 adb shell, 往 stdin 写 input 命令, 以回显标记确认执行完成
+#   u2:    走 uiautomator2 已有的 HTTP 通道注入触摸事件
+#   adb:   旧方式, 每次执行 adb shell input
+
+
+class InputLatency:
+    def __init__(self, window=256):
+        self._lock = threading.Lock()
+        self._samples = deque(maxlen=window)
+        self.count = 0
+        self.errors = 0
+
+    def record(self, ms):
+        with self._lock:
+            self._samples.append(ms)
+            self.count += 1
+
+    def stats(self):
+        with self._lock:
+            s = sorted(self._samples)
+        if not s:
+            return {"count": self.count, "errors": self.errors}
+        return {
+            "count": self.count,
+            "errors": self.errors,
+            "avg_ms": round(sum(s) / len(s), 1),
+            "p50_ms": round(s[len(s) // 2], 1),
+            "p95_ms": round(s[min(len(s) - 1, int(len(s) * 0.95))], 1),
+            "max_ms": round(s[-1], 1),
+        }
+
+
+LATENCY = InputLatency()
+
+
+class InputTimeout(RuntimeError):
+    """The command reached the device but was not confirmed; it may still have run, so it must not be re-sent."""
+
+
+class AdbShellInput:
+    name = "shell"
+
+    def __init__(self, adb_path, device_name, timeout=5.0):
+        self.cmd = adb_path + "adb -s " + device_name + " shell"
+        self.timeout = timeout
+        self.proc = None
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._done = threading.Condition()
+        self._last_marker = 0
+
+    def start(self):
+        self.proc = subprocess.Popen(self.cmd, shell=True, stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                     stderr=subprocess.STDOUT, bufsize=0)
+        threading.Thread(target=self._read, name="adb-input-shell", daemon=True).start()
+        self.run("true")
+
+    def _read(self):
+        proc = self.proc
+        try:
+            for raw in iter(proc.stdout.readline, b""):
+                line = raw.decode("utf-8", "ignore").strip()
+                if line.startswith("__uat_done_"):
+                    try:
+                        n = int(line[len("__uat_done_"):])
+                    except ValueError:
+                        continue
+                    with self._done:
+                        self._last_marker = n
+                        self._done.notify_all()
+        except Exception:
+            pass
+        with self._done:
+            self._done.notify_all()
+
+    def alive(self):
+        return self.proc is not None and self.proc.poll() is None
+
+    def run(self, command):
+        with self._lock:
+            if not self.alive():
+                raise RuntimeError("adb input shell is not running")
+            n = next(self._ids)
+            self.proc.stdin.write(f"{command}; echo __uat_done_{n}\n".encode())
+            self.proc.stdin.flush()
+            deadline = time.time() + self.timeout
+            with self._done:
+                while self._last_marker < n:
+                    remaining = deadline - time.time()
+                    if remaining <= 0 or not self.alive():
+                        break
+                    self._done.wait(remaining)
+                else:
+                    return
+            # 命令已经写进 shell, 杀掉 shell 让排队中的命令不再执行; 正在执行的那条无法确认, 不能重发
+            self._kill()
+            raise InputTimeout(f"adb input shell timed out on: {command}")
+
+    def _kill(self):
+        proc = self.proc
+        self.proc = None
+        if proc is not None:
+            try:
+                proc.kill()
+            except Exception:
+                pass
+
+    def swipe(self, x1, y1, x2, y2, duration_ms):
+        self.run(f"input swipe {int(x1)} {int(y1)} {int(x2)} {int(y2)} {int(duration_ms)}")
+
+    def close(self):
+        proc = self.proc
+        self.proc = None
+        if proc is None:
+            return
+        try:
+            proc.stdin.write(b"exit\n")
+            proc.stdin.flush()
+            proc.stdin.close()
+        except Exception:
+            pass
+        try:
+            proc.wait(timeout=2)
+        except Exception:
+            try:
+                proc.kill()
+            except Exception:
+                pass
+
+
+class U2Input:
+    name = "u2"
+
+    def __init__(self, u2client):
+        self.u2client = u2client
+
+    def start(self):
+        if self.u2client is None:
+            raise RuntimeError("uiautomator2 client is not connected")
+
+    def alive(self):
+        return self.u2client is not None
+
+    def swipe(self, x1, y1, x2, y2, duration_ms):
+        self.u2client.swipe(int(x1), int(y1), int(x2), int(y2), max(0.01, duration_ms / 1000.0))
+
+    def close(self):
+        self.u2client = None
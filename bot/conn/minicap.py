@@ -1,12 +1,20 @@
 import socket
-import sys
 import struct
+import threading
+import time
 
 import cv2
 from collections import OrderedDict
 
 import numpy
 
+import bot.base.log as logger
+
+log = logger.get_logger(__name__)
+
+BANNER_LENGTH = 24
+BANNER_FORMAT = "<BBIIIIIBB"
+
 
 class Banner:
     def __init__(self):
@@ -31,90 +39,158 @@ class Banner:
     def keys(self):
         return self.__banner.keys()
 
+    def parse(self, raw):
+        values = struct.unpack(BANNER_FORMAT, bytes(raw[:BANNER_LENGTH]))
+        for key, val in zip(list(self.__banner.keys()), values):
+            self.__banner[key] = val
+        self.__banner['orientation'] = self.__banner['orientation'] * 90
+
     def __str__(self):
         return str(self.__banner)
 
 
 class Minicap:
-    cur_image = None
+    """minicap socket reader. Frames are written into two preallocated bytearrays that are swapped on
+    completion, so the reader never allocates per frame and get_screen decodes straight from a memoryview."""
 
-    def __init__(self, host, port, banner):
+    def __init__(self, host, port, banner=None, buffer_size=65536, frame_capacity=1 << 20):
         self.__socket = None
-        self.buffer_size = 4096
+        self.buffer_size = buffer_size
         self.host = host
         self.port = port
-        self.banner = banner
+        self.banner = banner if banner is not None else Banner()
+        self._recv_buf = bytearray(buffer_size)
+        self._recv_view = memoryview(self._recv_buf)
+        self._back = bytearray(frame_capacity)
+        self._front = bytearray(frame_capacity)
+        self._front_len = 0
+        self._cond = threading.Condition()
+        self._thread = None
+        self._running = False
+        self.seq = 0
+        self.timestamp = 0.0
 
     def start(self):
         self.connect()
-        self.start_cap()
+        self._running = True
+        self._thread = threading.Thread(target=self.start_cap, name=f"minicap-{self.port}", daemon=True)
+        self._thread.start()
 
     def stop(self):
-        self.__socket.close()
-
-    def get_screen(self):
-        if self.cur_image is None:
-            return None
+        self._running = False
         try:
-            arr = numpy.frombuffer(bytes(self.cur_image), dtype=numpy.uint8)
+            if self.__socket is not None:
+                self.__socket.close()
         except Exception:
-            try:
-                arr = numpy.array(self.cur_image, dtype=numpy.uint8)
-            except Exception:
-                return None
-        try:
-            img = cv2.imdecode(arr, cv2.IMREAD_COLOR)
-            if img is None or getattr(img, 'size', 0) == 0:
-                return None
-            h, w = img.shape[:2]
-            if h < 100 or w < 100:
-                return None
-            return img
-        except Exception:
-            return None
+            pass
+        with self._cond:
+            self._cond.notify_all()
+
+    def is_running(self):
+        return self._running and self._thread is not None and self._thread.is_alive()
 
     def connect(self):
-        try:
-            self.__socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        except socket.error as e:
-            print(e)
-            sys.exit(1)
+        self.__socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.__socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, self.buffer_size * 4)
+        self.__socket.settimeout(5)
         self.__socket.connect((self.host, self.port))
 
+    def wait(self, predicate, timeout=1.0):
+        deadline = time.time() + timeout
+        with self._cond:
+            while not predicate():
+                remaining = deadline - time.time()
+                if remaining <= 0 or not self._running:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def wait_frame(self, after_ts=0.0, timeout=1.0):
+        return self.wait(lambda: self.seq > 0 and self.timestamp >= after_ts, timeout)
+
+    def decode(self):
+        """(image, timestamp, seq) of the latest frame; image is None when there is none yet."""
+        with self._cond:
+            if self.seq == 0:
+                return None, 0.0, 0
+            ts, seq = self.timestamp, self.seq
+            # imdecode reads the memoryview in place; the lock keeps the reader from swapping it mid-decode
+            arr = numpy.frombuffer(memoryview(self._front)[:self._front_len], dtype=numpy.uint8)
+            try:
+                img = cv2.imdecode(arr, cv2.IMREAD_COLOR)
+            except Exception:
+                return None, ts, seq
+        if img is None or getattr(img, 'size', 0) == 0:
+            return None, ts, seq
+        h, w = img.shape[:2]
+        if h < 100 or w < 100:
+            return None, ts, seq
+        return img, ts, seq
+
+    def get_screen(self, after_ts=0.0, timeout=1.0):
+        # minicap only pushes frames when the display changes, so once the wait times out the
+        # latest frame is still the current screen
+        self.wait_frame(after_ts, timeout)
+        return self.decode()[0]
+
+    def _ensure_back_capacity(self, size):
+        if len(self._back) < size:
+            self._back = bytearray(max(size, len(self._back) * 2))
+
+    def _publish(self, length, started):
+        with self._cond:
+            self._front, self._back = self._back, self._front
+            self._front_len = length
+            self.seq += 1
+            self.timestamp = started
+            self._cond.notify_all()
+
     def start_cap(self):
         read_banner_bytes = 0
-        banner_length = 24
+        banner_raw = bytearray(BANNER_LENGTH)
         read_frame_bytes = 0
         frame_body_length = 0
-        data = []
-        while not getattr(self.__socket, '_closed'):
+        frame_filled = 0
+        frame_started = 0.0
+        sock = self.__socket
+        sock.settimeout(None)
+        while self._running:
             try:
-                chunk = self.__socket.recv(self.buffer_size)
-            except socket.error as e:
-                print(e)
-                sys.exit(1)
+                buf_len = sock.recv_into(self._recv_buf)
+            except (OSError, socket.error) as e:
+                if self._running:
+                    log.warning(f"minicap stream closed: {e}")
+                break
+            if buf_len == 0:
+                log.warning("minicap stream ended")
+                break
+            chunk = self._recv_view
             cursor = 0
-            buf_len = len(chunk)
             while cursor < buf_len:
-                if read_banner_bytes < banner_length:
-                    map(lambda i, val: self.banner.__setitem__(self.banner.keys()[i], val),
-                        [i for i in range(len(self.banner.keys()))], struct.unpack("<2b5ibB", chunk))
-                    cursor = buf_len
-                    read_banner_bytes = banner_length
+                if read_banner_bytes < BANNER_LENGTH:
+                    take = min(BANNER_LENGTH - read_banner_bytes, buf_len - cursor)
+                    banner_raw[read_banner_bytes:read_banner_bytes + take] = chunk[cursor:cursor + take]
+                    cursor += take
+                    read_banner_bytes += take
+                    if read_banner_bytes == BANNER_LENGTH:
+                        self.banner.parse(banner_raw)
+                        log.debug(f"minicap banner: {self.banner}")
                 elif read_frame_bytes < 4:
-                    frame_body_length += (chunk[cursor] << (read_frame_bytes * 8)) >> 0
+                    frame_body_length += chunk[cursor] << (read_frame_bytes * 8)
                     cursor += 1
                     read_frame_bytes += 1
+                    if read_frame_bytes == 4:
+                        self._ensure_back_capacity(frame_body_length)
+                        frame_filled = 0
+                        frame_started = time.time()
                 else:
-                    if buf_len - cursor >= frame_body_length:
-                        data.extend(chunk[cursor:cursor + frame_body_length])
-                        self.cur_image = data
-                        cursor += frame_body_length
-                        frame_body_length = read_frame_bytes = 0
-                        data = []
-                    else:
-                        data.extend(chunk[cursor:buf_len])
-                        frame_body_length -= buf_len - cursor
-                        read_frame_bytes += buf_len - cursor
-                        cursor = buf_len
-
+                    take = min(frame_body_length - frame_filled, buf_len - cursor)
+                    self._back[frame_filled:frame_filled + take] = chunk[cursor:cursor + take]
+                    frame_filled += take
+                    cursor += take
+                    if frame_filled == frame_body_length:
+                        self._publish(frame_body_length, frame_started)
+                        frame_body_length = read_frame_bytes = frame_filled = 0
+        self._running = False
+        with self._cond:
+            self._cond.notify_all()
@@ -1,3 +1,5 @@
+import subprocess
+from os import path as ospath
 import time
 import random
 from typing import Optional
@@ -12,6 +14,10 @@ import threading
 from bot.base.common import ImageMatchMode
 from bot.base.point import ClickPoint, ClickPointType
 from bot.conn.ctrl import AndroidController
+from bot.conn.frame_source import FrameSource, Frame
+from bot.conn.input_channel import AdbShellInput, U2Input, InputTimeout, LATENCY
+from bot.conn.minicap import Minicap
+from bot.recog.frame_cache import signature, signature_delta
 from bot.recog.image_matcher import template_match, image_match
 from config import CONFIG, Config
 from dataclasses import dataclass, field
@@ -20,6 +26,9 @@ from module.umamusume.asset.template import REF_DONT_CLICK
 log = logger.get_logger(__name__)
 
 INPUT_BLOCKED = False
+MINICAP_DEPS_DIR = ospath.join("deps", "minicap")
+# 输入通道失败后至少隔这么久再重建
+INPUT_RESTART_DELAY = 30.0
 
 
 @dataclass
@@ -28,6 +37,10 @@ class U2AndroidConfig:
     delay: float
     bluestacks_config_path: Optional[str] = None
     bluestacks_config_keyword: Optional[str] = None
+    screen_source: str = "screenshot"
+    stream_max_wait: float = 1.5
+    minicap_port: int = 1717
+    input_channel: str = "shell"
 
     _bluestacks_port: Optional[str] = field(init=False, repr=False, default=None)
 
@@ -52,15 +65,56 @@ class U2AndroidConfig:
         return self._bluestacks_port
 
     @staticmethod
-    def load(config: Config):
+    def load(config: Config, device=None):
+        """`device` is an entry of bot.auto.adb.devices: a device name or a dict overriding adb keys."""
+        adb = Config(config.bot.auto.adb or {})
+        if isinstance(device, str):
+            adb = Config({**adb, "device_name": device})
+        elif isinstance(device, dict):
+            adb = Config({**adb, **device})
         return U2AndroidConfig(
-            _device_name=config.bot.auto.adb.device_name,
-            delay=config.bot.auto.adb.delay,
-            bluestacks_config_path=config.bot.auto.adb.bluestacks_config_path,
-            bluestacks_config_keyword=config.bot.auto.adb.bluestacks_config_keyword,
+            _device_name=adb.device_name,
+            delay=adb.delay,
+            bluestacks_config_path=adb.bluestacks_config_path,
+            bluestacks_config_keyword=adb.bluestacks_config_keyword,
+            screen_source=str(adb.screen_source or "screenshot").lower(),
+            stream_max_wait=float(adb.stream_max_wait_ms or 1500) / 1000.0,
+            minicap_port=int(adb.minicap_port or 1717),
+            input_channel=str(adb.input_channel or "shell").lower(),
         )
 
 
+def device_list(config: Config = CONFIG) -> list:
+    """bot.auto.adb.devices, or the single bot.auto.adb.device_name when no list is configured.
+    Every device gets its own minicap_port: an explicit per-device port is kept unless another device
+    already uses it, the rest get base port + slot index."""
+    devices = config.bot.auto.adb.devices or []
+    if not isinstance(devices, list):
+        devices = [devices]
+    devices = [d for d in devices if d]
+    if not devices:
+        return [None]
+    base = int(config.bot.auto.adb.minicap_port or 1717)
+    explicit = [d.get("minicap_port") if isinstance(d, dict) else None for d in devices]
+    used = set()
+    out = []
+    for i, d in enumerate(devices):
+        entry = dict(d) if isinstance(d, dict) else {"device_name": d}
+        port = explicit[i]
+        if port is not None and int(port) in used:
+            log.warning(f"minicap_port {port} of {entry.get('device_name')} is already used by another device, reassigning")
+            port = None
+        if port is None:
+            port = base + i
+            # 同一端口在别的设备上显式配置过, 顺延
+            while port in used or port in [int(p) for j, p in enumerate(explicit) if p is not None and j > i]:
+                port += 1
+        used.add(int(port))
+        entry["minicap_port"] = int(port)
+        out.append(entry)
+    return out
+
+
 class U2AndroidController(AndroidController):
     config = U2AndroidConfig.load(CONFIG)
 
@@ -69,6 +123,19 @@ class U2AndroidController(AndroidController):
     recent_operation_time = None
     same_point_operation_interval = 0.27
     u2client = None
+    frame_source = None
+    minicap = None
+    minicap_proc = None
+    input = None
+    input_retry_at = 0.0
+    last_input_time = 0.0
+    last_screen = None
+
+    # wait_for: 平均灰度差超过 CHANGE 视为画面已变化, 连续两帧低于 STABLE 视为画面已稳定
+    WAIT_CHANGE_THRESHOLD = 3.0
+    WAIT_STABLE_THRESHOLD = 1.0
+    WAIT_INTERVAL_STREAM = 0.05
+    WAIT_INTERVAL_SCREENSHOT = 0.25
 
     repetitive_click_name = None
     repetitive_click_count = 0
@@ -76,7 +143,10 @@ class U2AndroidController(AndroidController):
     last_click_time = 0.0
     min_click_interval = 0.3
 
-    def __init__(self):
+    def __init__(self, device=None):
+        if device is not None:
+            self.config = U2AndroidConfig.load(CONFIG, device)
+        self.input_blocked = False
         self.recent_click_buckets = []
         self.fallback_block_until = 0.0
         self.trigger_decision_reset = False
@@ -123,7 +193,7 @@ class U2AndroidController(AndroidController):
             self.repetitive_other_clicks = 0
             try:
                 if update_repetitive:
-                    update_repetitive(self.repetitive_click_count, self.repetitive_other_clicks)
+                    update_repetitive(self.repetitive_click_count, self.repetitive_other_clicks, self.config.device_name)
             except Exception:
                 pass
             return False
@@ -137,7 +207,7 @@ class U2AndroidController(AndroidController):
                 self.repetitive_other_clicks = 0
         try:
             if update_repetitive:
-                update_repetitive(self.repetitive_click_count, self.repetitive_other_clicks)
+                update_repetitive(self.repetitive_click_count, self.repetitive_other_clicks, self.config.device_name)
         except Exception:
             pass
 
@@ -150,7 +220,7 @@ class U2AndroidController(AndroidController):
                 self.repetitive_other_clicks = 0
                 try:
                     if update_repetitive:
-                        update_repetitive(0, 0)
+                        update_repetitive(0, 0, self.config.device_name)
                 except Exception:
                     pass
             time.sleep(self.config.delay)
@@ -191,16 +261,160 @@ class U2AndroidController(AndroidController):
 
     def tap(self, x, y, hold_duration):
         duration = random.randint(0, 166) + hold_duration
-        _ = self.execute_adb_shell("shell input swipe " + str(x) + " " + str(y) + " " + str(x) + " " + str(y) + " " + str(duration), True)
+        self.send_swipe(x, y, x, y, duration)
         self.last_click_time = time.time()
+        self.last_input_time = self.last_click_time
         time.sleep(self.config.delay)
 
+    # send_swipe 通过输入通道发送 (tap 即起点终点相同的 swipe), 通道失败时本次退回 adb 命令,
+    # 通道在 INPUT_RESTART_DELAY 秒后的下一次输入时重新建立.
+    # 命令已送达但超时未确认 (InputTimeout) 时不重发, 避免游戏里出现两次点击
+    def send_swipe(self, x1, y1, x2, y2, duration):
+        started = time.perf_counter()
+        ch = self.input
+        if ch is None and self.config.input_channel != "adb" and time.time() >= self.input_retry_at:
+            ch = self.start_input()
+        if ch is not None:
+            try:
+                ch.swipe(x1, y1, x2, y2, duration)
+                LATENCY.record((time.perf_counter() - started) * 1000.0)
+                return
+            except InputTimeout as e:
+                LATENCY.errors += 1
+                log.warning(f"input channel '{ch.name}' timed out, not re-sending: {e}")
+                self.drop_input()
+                return
+            except Exception as e:
+                LATENCY.errors += 1
+                log.warning(f"input channel '{ch.name}' failed, falling back to adb: {e}")
+                self.drop_input()
+        self.execute_adb_shell("shell input swipe " + str(x1) + " " + str(y1) + " " + str(x2) + " " + str(y2) + " " + str(duration), True)
+        LATENCY.record((time.perf_counter() - started) * 1000.0)
+
+    def start_input(self):
+        self.stop_input()
+        kind = self.config.input_channel
+        if kind == "adb":
+            return None
+        try:
+            ch = U2Input(self.u2client) if kind == "u2" else AdbShellInput(self.path, self.config.device_name)
+            ch.start()
+            self.input = ch
+            log.info(f"input channel: {ch.name}")
+        except Exception as e:
+            log.warning(f"input channel '{kind}' unavailable, using adb commands: {e}")
+            self.input = None
+            self.input_retry_at = time.time() + INPUT_RESTART_DELAY
+        return self.input
+
+    def drop_input(self):
+        self.stop_input()
+        self.input_retry_at = time.time() + INPUT_RESTART_DELAY
+
+    def stop_input(self):
+        ch = self.input
+        self.input = None
+        if ch is not None:
+            try:
+                ch.close()
+            except Exception:
+                pass
+
     # init_env 初始化环境
     def init_env(self) -> None:
         self.u2client = u2.connect(self.config.device_name)
+        self.start_input()
+        # "stream" 与 "minicap" 相同: 帧序号 / 时间戳都来自 minicap 推流, 不再后台轮询截图
+        if self.config.screen_source in ("minicap", "stream"):
+            try:
+                self.start_minicap()
+                self.start_frame_source()
+            except Exception as e:
+                log.warning(f"minicap unavailable, falling back to screenshots: {e}")
+                self.stop_frame_source()
+                self.stop_minicap()
+
+    # start_minicap 推送并启动minicap, 通过adb forward读取画面流
+    def start_minicap(self):
+        remote_dir = "/data/local/tmp/"
+        abi = self.get_device_cpu_info()
+        sdk = self.get_device_os_info()
+        if not self.check_file_exist(remote_dir, "minicap.so"):
+            # deps/minicap 不随仓库发布, 缺文件时直接失败, 不再走连接重试
+            binary = ospath.join(MINICAP_DEPS_DIR, abi, "minicap")
+            library = ospath.join(MINICAP_DEPS_DIR, "android-" + sdk, abi, "minicap.so")
+            missing = [p for p in (binary, library) if not ospath.isfile(p)]
+            if missing:
+                raise RuntimeError(f"minicap binaries for {abi} / android-{sdk} not found: {', '.join(missing)}")
+            self.push_file(binary, remote_dir)
+            self.push_file(library, remote_dir)
+            self.execute_adb_shell("shell chmod 755 " + remote_dir + "minicap", True)
+        w, h = 720, 1280
+        try:
+            size = self.u2client.window_size()
+            w, h = int(size[0]), int(size[1])
+        except Exception:
+            pass
+        projection = f"{w}x{h}@{w}x{h}/0"
+        # 不经过 shell 启动, stop_minicap 结束的就是 adb 进程本身
+        self.minicap_proc = subprocess.Popen(
+            [self.path + "adb", "-s", self.config.device_name, "shell",
+             "LD_LIBRARY_PATH=" + remote_dir + " " + remote_dir + "minicap -P " + projection],
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        self.execute_adb_shell("forward tcp:" + str(self.config.minicap_port) + " localabstract:minicap", True)
+        last_err = None
+        for _ in range(20):
+            time.sleep(0.25)
+            if self.minicap_proc.poll() is not None:
+                raise RuntimeError(f"minicap exited with code {self.minicap_proc.returncode}")
+            try:
+                self.minicap = Minicap("127.0.0.1", self.config.minicap_port)
+                self.minicap.start()
+                break
+            except Exception as e:
+                last_err = e
+                self.minicap = None
+        if self.minicap is None:
+            raise RuntimeError(f"minicap connect failed: {last_err}")
+        log.info(f"minicap stream started on port {self.config.minicap_port} ({projection})")
+
+    def stop_minicap(self):
+        mc = self.minicap
+        self.minicap = None
+        if mc is not None:
+            try:
+                mc.stop()
+            except Exception:
+                pass
+        proc = self.minicap_proc
+        self.minicap_proc = None
+        if proc is not None:
+            try:
+                proc.kill()
+                proc.wait(timeout=2)
+            except Exception:
+                pass
 
-    # get_screen 获取图片
-    def get_screen(self, to_gray=False):
+    def start_frame_source(self):
+        if self.frame_source is not None and self.frame_source.is_running():
+            return self.frame_source
+        fs = FrameSource(self.minicap)
+        fs.start()
+        self.frame_source = fs
+        log.info(f"streaming frame source started for {self.config.device_name}")
+        return self.frame_source
+
+    def stop_frame_source(self):
+        fs = self.frame_source
+        self.frame_source = None
+        if fs is not None:
+            try:
+                fs.stop()
+            except Exception:
+                pass
+
+    # grab_screen 直接截图
+    def grab_screen(self):
         try:
             cur_screen = self.u2client.screenshot(format='opencv')
         except Exception:
@@ -215,15 +429,103 @@ class U2AndroidController(AndroidController):
             h, w = cur_screen.shape[:2]
             if h < 100 or w < 100:
                 return None
+            return cur_screen
+        except Exception:
+            return None
+
+    # streaming 画面是否来自推流 (minicap); 否则每次取画面都是一次截图
+    def streaming(self) -> bool:
+        mc = self.minicap
+        return mc is not None and mc.is_running()
+
+    # get_frame 获取带时间戳与序号的最新帧, newer_than 为序号
+    def get_frame(self, newer_than=None, timeout=None):
+        fs = self.frame_source
+        if fs is None or not fs.is_running():
+            img = self.grab_screen()
+            if img is None:
+                return None
+            return Frame(img, time.time(), 0)
+        if timeout is None:
+            timeout = self.config.stream_max_wait
+        if newer_than is not None:
+            return fs.wait_newer(newer_than, timeout)
+        # frames captured before the last input may not reflect it yet
+        after = self.last_input_time
+        frame = fs.wait_after(after, timeout)
+        if frame is None or frame.timestamp < after:
+            self._input_settled(after)
+        return frame
+
+    # _input_settled 输入后等新帧超时说明画面没有变化, 清掉水位, 同一次输入最多只等一次
+    def _input_settled(self, after):
+        if self.last_input_time == after:
+            self.last_input_time = 0.0
+
+    # get_screen 获取图片
+    def get_screen(self, to_gray=False):
+        cur_screen = None
+        mc = self.minicap
+        if mc is not None and mc.is_running():
+            try:
+                after = self.last_input_time
+                if not mc.wait_frame(after, min(self.config.stream_max_wait, 0.3)):
+                    self._input_settled(after)
+                cur_screen = mc.decode()[0]
+            except Exception:
+                cur_screen = None
+        if cur_screen is None:
+            cur_screen = self.grab_screen()
+        if cur_screen is None:
+            return None
+        self.last_screen = cur_screen
+        try:
             if to_gray:
                 return cv2.cvtColor(cur_screen, cv2.COLOR_BGR2GRAY)
             return cur_screen
         except Exception:
             return None
 
+    # wait_for 等待画面变化/稳定或目标出现, 代替点击后的固定 sleep. 超时返回 None, 否则返回当时的画面
+    def wait_for(self, template=None, ui=None, changed=False, stable=False, timeout=2.0, interval=None,
+                 reference=None):
+        deadline = time.time() + timeout
+        if interval is None:
+            # 截图模式下每次轮询都是一次截图, 放慢轮询
+            interval = self.WAIT_INTERVAL_STREAM if self.streaming() else self.WAIT_INTERVAL_SCREENSHOT
+        if reference is None:
+            reference = self.last_screen
+        ref_sig = signature(reference) if changed else None
+        changed_seen = not changed or ref_sig is None
+        prev_sig = None
+        while True:
+            img = self.get_screen()
+            if img is not None:
+                gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+                if template is not None and getattr(image_match(gray, template), "find_match", False):
+                    return img
+                if ui is not None:
+                    from bot.engine.ui_classifier import match_ui
+                    if match_ui(ui, gray):
+                        return img
+                if changed or stable:
+                    sig = signature(gray)
+                    if not changed_seen and signature_delta(sig, ref_sig) > self.WAIT_CHANGE_THRESHOLD:
+                        changed_seen = True
+                        if not stable:
+                            return img
+                    elif changed_seen and stable and prev_sig is not None \
+                            and signature_delta(sig, prev_sig) < self.WAIT_STABLE_THRESHOLD:
+                        return img
+                    prev_sig = sig
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            time.sleep(min(interval, remaining))
+
     # ===== ctrl =====
     def click_by_point(self, point: ClickPoint, random_offset=True, hold_duration=0):
-        if INPUT_BLOCKED:
+        if INPUT_BLOCKED or self.input_blocked:
             return
         if self.recent_point is not None:
             if self.recent_point == point and time.time() - self.recent_operation_time < self.same_point_operation_interval:
@@ -241,7 +543,7 @@ class U2AndroidController(AndroidController):
         self.recent_operation_time = time.time()
 
     def click(self, x, y, name="", random_offset=True, max_x=720, max_y=1280, hold_duration=0):
-        if INPUT_BLOCKED:
+        if INPUT_BLOCKED or self.input_blocked:
             return
         if name != "":
             log.debug("click >> " + name)
@@ -266,7 +568,7 @@ class U2AndroidController(AndroidController):
         self.tap(x, y, hold_duration)
 
     def swipe(self, x1=1025, y1=550, x2=1025, y2=550, duration=0.2, name=""):
-        if INPUT_BLOCKED:
+        if INPUT_BLOCKED or self.input_blocked:
             return
         if name != "":
             log.debug("swipe >> " + name)
@@ -281,7 +583,8 @@ class U2AndroidController(AndroidController):
         x2 += offset_x2
         y2 += offset_y2
         
-        _ = self.execute_adb_shell("shell input swipe " + str(x1) + " " + str(y1) + " " + str(x2) + " " + str(y2) + " " + str(duration), True)
+        self.send_swipe(x1, y1, x2, y2, duration)
+        self.last_input_time = time.time()
         time.sleep(self.config.delay)
 
     # ===== common =====
@@ -372,6 +675,11 @@ class U2AndroidController(AndroidController):
 
     # destroy 销毁
     def destroy(self):
+        self.stop_frame_source()
+        self.stop_minicap()
+        self.stop_input()
+        # 销毁后不再自动重建输入通道, 等 init_env
+        self.input_retry_at = float("inf")
         try:
             self.u2client = None
         except Exception:
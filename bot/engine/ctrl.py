@@ -12,9 +12,10 @@ def stop():
     scheduler.stop()
 
 
-def add_task(app_name, task_execute_mode, task_type, task_desc, cron_job_config, attachment_data):
+def add_task(app_name, task_execute_mode, task_type, task_desc, cron_job_config, attachment_data, device_name=None):
     app_config = APP_MANIFEST_LIST[app_name]
     task = app_config.build_task(task_execute_mode, task_type, task_desc, cron_job_config, attachment_data)
+    task.device_name = device_name or None
     scheduler.add_task(task)
 
 
@@ -27,7 +28,8 @@ def get_task_list():
 
 
 def reset_task(task_id):
+    device = scheduler.device_for(task_id)
     scheduler.reset_task(task_id)
-    ctrl = U2AndroidController()
+    ctrl = U2AndroidController(device)
     ctrl.init_env()
     ctrl.click_by_point(ESCAPE)
@@ -3,21 +3,22 @@ import time
 import traceback
 import psutil
 import os
-import gc
 
 import bot.base.log as logger
+import bot.base.memory as memory
+import bot.recog.service as recog_service
 import cv2
 
-from bot.base.common import ImageMatchMode
 from bot.base.resource import UI, NOT_FOUND_UI
 from bot.base.task import TaskStatus, Task, EndTaskReason
 from bot.conn.os import push_system_notification
 from bot.conn.u2_ctrl import U2AndroidController
-from bot.recog.image_matcher import template_match, image_match
-from bot.recog.ocr import reset_ocr
-from bot.base.purge import save_task_data, save_scheduler_tasks, save_scheduler_state, soft_process_restart
+from bot.recog.frame_cache import get_frame, signature_delta, dirty_area
+from bot.recog.image_matcher import template_match
+from bot.base.purge import save_task_data, save_scheduler_tasks, save_scheduler_state, finish_task_process
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from bot.base.manifest import APP_MANIFEST_LIST
+from bot.engine.ui_classifier import UIClassifier, match_ui, thumbnail
 from config import CONFIG
 
 
@@ -26,8 +27,18 @@ log = logger.get_logger(__name__)
 debug = True
 
 
-def get_controller() -> U2AndroidController:
-    return U2AndroidController()
+# 正在运行任务的设备, 任务收尾时据此判断是否还有其他设备在用共享资源
+_running_devices = set()
+_running_lock = threading.Lock()
+
+
+def get_controller(device=None) -> U2AndroidController:
+    return U2AndroidController(device)
+
+
+def running_devices() -> list:
+    with _running_lock:
+        return sorted(_running_devices)
 
 
 class Executor:
@@ -35,11 +46,16 @@ class Executor:
 
     app_alive_check_counter = 5
     app_alive_check_interval = 5
+    ui_sequential_candidates = 3
 
-    def __init__(self):
+    def __init__(self, device=None):
+        self.device = device
         psutil.Process().cpu_affinity(list(range(CONFIG.bot.auto.cpu_alloc)))
         self.detect_ui_results_write_lock = threading.Lock()
         self.detect_ui_results = []
+        self.ui_classifier = UIClassifier()
+        self.unchanged_threshold = 0.5
+        self.unchanged_redetect = 10
         self.executor = ThreadPoolExecutor(max_workers=CONFIG.bot.auto.cpu_alloc)
 
     def ensure_pool(self):
@@ -74,6 +90,7 @@ class Executor:
             self.detect_ui_results.clear()
         except Exception:
             self.detect_ui_results = []
+        self.ui_classifier.reset()
         self.run_work_flow(task)
 
     def stop(self):
@@ -84,13 +101,31 @@ class Executor:
         except Exception:
             pass
 
-    def detect_ui(self, ui_list: list[UI], target) -> UI:
-        target = cv2.cvtColor(target, cv2.COLOR_BGR2GRAY)
+    def detect_ui(self, ui_list: list[UI], target, prev_ui: UI = None) -> UI:
+        target = get_frame(target).gray()
+        thumb = thumbnail(target)
+        ranked = self.ui_classifier.rank(ui_list, prev_ui, thumb)
+        head = ranked[:self.ui_sequential_candidates]
+        for ui in head:
+            self.ui_classifier.verified += 1
+            if match_ui(ui, target):
+                self.ui_classifier.record(prev_ui, ui, thumb)
+                return ui
+        found = self.detect_ui_parallel(ranked[len(head):], target)
+        self.ui_classifier.record(prev_ui, None if found is NOT_FOUND_UI else found, thumb)
+        return found
+
+    def detect_ui_parallel(self, ui_list: list[UI], target) -> UI:
+        if len(ui_list) == 0:
+            return NOT_FOUND_UI
         self.ensure_pool()
         if self.executor is None or getattr(self.executor, "_shutdown", False):
             return NOT_FOUND_UI
+        import bot.conn.fetch as fetch
+        # 线程池里的工作线程没有本设备的绑定, 提交时带上
+        detect = fetch.bound(self.detect_ui_sub)
         try:
-            futures = {self.executor.submit(self.detect_ui_sub, ui, target): ui for ui in ui_list}
+            futures = {self.executor.submit(detect, ui, target): ui for ui in ui_list}
         except RuntimeError as e:
             if "interpreter shutdown" in str(e).lower():
                 return NOT_FOUND_UI
@@ -113,28 +148,8 @@ class Executor:
         return NOT_FOUND_UI
 
     def detect_ui_sub(self, ui: UI, target) -> None:
-        result = True
-        for template in ui.check_exist_template_list:
-            sub_target = target[
-                         template.image_match_config.match_area.y1:template.image_match_config.match_area.y2,
-                         template.image_match_config.match_area.x1:template.image_match_config.match_area.x2].copy()
-            if template.image_match_config.match_mode == ImageMatchMode.IMAGE_MATCH_MODE_TEMPLATE_MATCH:
-                if not image_match(sub_target, template).find_match:
-                    result = False
-                    break
-            else:
-                log.error("template not set match mode")
-        for template in ui.check_non_exist_template_list:
-            sub_target = target[
-                         template.image_match_config.match_area.y1:template.image_match_config.match_area.y2,
-                         template.image_match_config.match_area.x1:template.image_match_config.match_area.x2].copy()
-            if template.image_match_config.match_mode == ImageMatchMode.IMAGE_MATCH_MODE_TEMPLATE_MATCH:
-                if image_match(sub_target, template).find_match:
-                    result = False
-                    break
-            else:
-                log.error("template not set match mode")
-        if result is True:
+        self.ui_classifier.verified += 1
+        if match_ui(ui, target):
             self.detect_ui_results_write_lock.acquire()
             self.detect_ui_results.append(ui)
             self.detect_ui_results_write_lock.release()
@@ -144,7 +159,18 @@ class Executor:
         ui_list = manifest.ui_list
         before_hook = manifest.before_hook
         after_hook = manifest.after_hook
-        controller = get_controller()
+        controller = get_controller(self.device)
+        device_name = controller.config.device_name
+        task.device = device_name
+        with _running_lock:
+            _running_devices.add(device_name)
+        recog_service.bind_device(device_name)
+        recog_service.device_started(device_name)
+        try:
+            import bot.conn.fetch as fetch
+            fetch.bind_controller(controller)
+        except Exception:
+            fetch = None
         try:
             # 初始化
             controller.init_env()
@@ -186,7 +212,7 @@ class Executor:
                             unchanged += 1
                             try:
                                 if update_watchdog:
-                                    update_watchdog(unchanged)
+                                    update_watchdog(unchanged, device_name)
                             except Exception:
                                 pass
                             print(f"{unchanged}/{watchdog_threshold}", flush=True)
@@ -201,7 +227,7 @@ class Executor:
                                 unchanged = 0
                                 try:
                                     if update_watchdog:
-                                        update_watchdog(unchanged)
+                                        update_watchdog(unchanged, device_name)
                                 except Exception:
                                     pass
                                 print(f"0/{watchdog_threshold}", flush=True)
@@ -224,7 +250,7 @@ class Executor:
                                 unchanged += 1
                                 try:
                                     if update_watchdog:
-                                        update_watchdog(unchanged)
+                                        update_watchdog(unchanged, device_name)
                                 except Exception:
                                     pass
                                 print(f"{unchanged}/{watchdog_threshold}", flush=True)
@@ -236,7 +262,7 @@ class Executor:
                                 unchanged = 0
                                 try:
                                     if update_watchdog:
-                                        update_watchdog(unchanged)
+                                        update_watchdog(unchanged, device_name)
                                 except Exception:
                                     pass
                                 print(f"0/{watchdog_threshold}", flush=True)
@@ -253,8 +279,7 @@ class Executor:
                             except Exception:
                                 pass
                             try:
-                                import bot.conn.u2_ctrl as u2c
-                                u2c.INPUT_BLOCKED = True
+                                controller.input_blocked = True
                                 controller.execute_adb_shell("shell am force-stop com.cygames.umamusume", True)
                                 time.sleep(1.0)
                                 controller.start_app(manifest.app_package_name, manifest.app_activity_name)
@@ -266,15 +291,12 @@ class Executor:
                             except Exception:
                                 pass
                             finally:
-                                try:
-                                    u2c.INPUT_BLOCKED = False
-                                except Exception:
-                                    pass
+                                controller.input_blocked = False
                             unchanged = 0
                             last_img = None
                             try:
                                 if update_watchdog:
-                                    update_watchdog(unchanged)
+                                    update_watchdog(unchanged, device_name)
                             except Exception:
                                 pass
                             print(f"0/{watchdog_threshold}", flush=True)
@@ -290,15 +312,31 @@ class Executor:
             watchdog_thread = threading.Thread(target=screen_watchdog, args=(), daemon=True)
             watchdog_thread.start()
 
+            settled_screen = None
+            last_sig = None
+            reused = 0
             while self.active:
                 if task.task_status == TaskStatus.TASK_STATUS_RUNNING:
-                    ctx.current_screen = ctx.ctrl.get_screen()
+                    ctx.current_screen = settled_screen if settled_screen is not None else ctx.ctrl.get_screen()
+                    settled_screen = None
                     if ctx.current_screen is None:
                         log.debug("No image detected")
                         time.sleep(1)
                         continue
+                    # 画面与上一帧相同时沿用上一次的 UI 识别结果, 每 unchanged_redetect 帧强制重新识别一次
+                    sig = ctx.frame.signature()
+                    delta = signature_delta(sig, last_sig)
+                    ctx.frame_changed = delta >= self.unchanged_threshold
+                    ctx.dirty_area = dirty_area(last_sig, sig, ctx.current_screen.shape,
+                                                changed_threshold=self.unchanged_threshold) if ctx.frame_changed else None
+                    last_sig = sig
                     ctx.prev_ui = ctx.current_ui
-                    ctx.current_ui = self.detect_ui(ui_list, ctx.current_screen)
+                    if not ctx.frame_changed and ctx.current_ui is not None and reused < self.unchanged_redetect:
+                        reused += 1
+                        self.ui_classifier.skipped += 1
+                    else:
+                        reused = 0
+                        ctx.current_ui = self.detect_ui(ui_list, ctx.current_screen, ctx.prev_ui)
                     log.debug("current_ui:" + ctx.current_ui.ui_name)
                     if before_hook is not None:
                         before_hook(ctx)
@@ -312,27 +350,39 @@ class Executor:
                     except Exception:
                         pass
                     try:
-                        gc.collect()
+                        memory.after_iteration()
                     except Exception:
                         pass
                 else:
                     break
+                # 有推流 (minicap) 时画面变化并稳定后立即进入下一轮, 最多等待 UAT_EXECUTOR_LOOP_SLEEP_MS;
+                # 截图模式下轮询会额外截图, 仍然固定等待
                 try:
                     sleep_ms = int(os.getenv("UAT_EXECUTOR_LOOP_SLEEP_MS", "500"))
-                    time.sleep(max(0.0, sleep_ms / 1000.0))
+                    if controller.streaming():
+                        settled_screen = controller.wait_for(changed=True, stable=True,
+                                                             timeout=max(0.0, sleep_ms / 1000.0))
+                    else:
+                        time.sleep(max(0.0, sleep_ms / 1000.0))
                 except Exception:
                     time.sleep(0.5)
         except Exception:
             task.end_task(TaskStatus.TASK_STATUS_FAILED, EndTaskReason.SYSTEM_ERROR)
             traceback.print_exc()
+        # active 保持到收尾结束, 避免调度器在进程内回收完成前启动下一个任务
         if not self.active:
             task.end_task(TaskStatus.TASK_STATUS_INTERRUPT, EndTaskReason.MANUAL_ABORTED)
-        else:
-            self.active = False
         task.end_task_time = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(time.time()))
         push_system_notification("任务结束", str(getattr(getattr(task, 'end_task_reason', None), 'value', '')), 10)
         controller.destroy()
         self.close_pool()
+        if fetch is not None:
+            fetch.bind_controller(None)
+        recog_service.device_stopped(device_name)
+        recog_service.bind_device(None)
+        with _running_lock:
+            _running_devices.discard(device_name)
+            shared = bool(_running_devices)
         try:
             save_task_data(task)
         except Exception:
@@ -346,7 +396,8 @@ class Executor:
         except Exception:
             pass
         try:
-            soft_process_restart()
+            finish_task_process("task end", shared)
         except Exception:
             pass
+        self.active = False
 
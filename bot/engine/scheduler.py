@@ -6,15 +6,49 @@ import time
 import croniter
 
 from bot.base.task import TaskStatus as TaskStatus, TaskExecuteMode, Task
+from bot.conn.u2_ctrl import U2AndroidConfig, device_list
 import bot.engine.executor as executor
 import bot.base.log as logger
+from config import CONFIG
 
 log = logger.get_logger(__name__)
 
 
+class DeviceSlot:
+    """One emulator instance: its own executor (and, through it, controller and frame source)."""
+
+    def __init__(self, device):
+        self.device = device
+        try:
+            self.name = U2AndroidConfig.load(CONFIG, device).device_name
+        except Exception:
+            self.name = str(device)
+        self.executor = executor.Executor(device)
+        self.thread = None
+        self.task = None
+
+    def busy(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def accepts(self, task) -> bool:
+        return not getattr(task, "device_name", None) or task.device_name == self.name
+
+    def status(self) -> dict:
+        busy = self.busy()
+        task = self.task if busy else None
+        return {
+            "device": self.name,
+            "busy": busy,
+            "task_id": getattr(task, "task_id", None),
+            "task_status": getattr(getattr(task, "task_status", None), "name", None),
+            "last_task_id": getattr(self.task, "task_id", None),
+        }
+
+
 class Scheduler:
     task_list: list[Task] = []
     running_task: Task = None
+    slots: list[DeviceSlot] = []
 
     active = False
 
@@ -22,9 +56,29 @@ class Scheduler:
         log.info("Task added: " + task.task_id)
         self.task_list.append(task)
 
-    def start_executor_for(self, task, task_executor):
-        executor_thread = threading.Thread(target=task_executor.start, args=([task]))
-        executor_thread.start()
+    def start_executor_for(self, task, slot: DeviceSlot):
+        log.info(f"Task {task.task_id} assigned to device {slot.name}")
+        slot.task = task
+        slot.thread = threading.Thread(target=slot.executor.start, args=([task]), name=f"executor-{slot.name}")
+        slot.thread.start()
+
+    def free_slot(self, task):
+        for slot in self.slots:
+            if not slot.busy() and slot.accepts(task):
+                return slot
+        return None
+
+    def is_running(self, task) -> bool:
+        return any(slot.task is task and slot.busy() for slot in self.slots)
+
+    def device_for(self, task_id):
+        for slot in self.slots:
+            if getattr(slot.task, "task_id", None) == task_id:
+                return slot.device
+        return None
+
+    def device_status(self) -> list[dict]:
+        return [slot.status() for slot in self.slots]
 
     def compute_next_cron(self, cron_expr):
         now = datetime.datetime.now()
@@ -67,14 +121,17 @@ class Scheduler:
             return False
 
     def init(self):
-        task_executor = executor.Executor()
+        self.slots = [DeviceSlot(d) for d in device_list()]
+        log.info("Devices: " + ", ".join(slot.name for slot in self.slots))
         while True:
             if self.active:
-                for task in self.task_list:
+                for task in list(self.task_list):
                     if task.task_execute_mode in [TaskExecuteMode.TASK_EXECUTE_MODE_ONE_TIME,
                                                    TaskExecuteMode.TASK_EXECUTE_MODE_TEAM_TRIALS]:
-                        if task.task_status == TaskStatus.TASK_STATUS_PENDING and not task_executor.active:
-                            self.start_executor_for(task, task_executor)
+                        if task.task_status == TaskStatus.TASK_STATUS_PENDING and not self.is_running(task):
+                            slot = self.free_slot(task)
+                            if slot is not None:
+                                self.start_executor_for(task, slot)
                     elif task.task_execute_mode == TaskExecuteMode.TASK_EXECUTE_MODE_CRON_JOB:
                         if task.task_status == TaskStatus.TASK_STATUS_SCHEDULED:
                             if task.cron_job_config is not None:
@@ -85,17 +142,20 @@ class Scheduler:
                                         self.copy_task(task, TaskExecuteMode.TASK_EXECUTE_MODE_ONE_TIME)
                                         task.cron_job_config.next_time = self.compute_next_cron(task.cron_job_config.cron)
                     elif task.task_execute_mode == TaskExecuteMode.TASK_EXECUTE_MODE_LOOP:
-                        if not task_executor.active:
-                            if task.task_status in [TaskStatus.TASK_STATUS_SUCCESS, TaskStatus.TASK_STATUS_FAILED]:
-                                task.task_status = TaskStatus.TASK_STATUS_PENDING
-                            if task.task_status == TaskStatus.TASK_STATUS_PENDING:
-                                self.start_executor_for(task, task_executor)
+                        if not self.is_running(task):
+                            slot = self.free_slot(task)
+                            if slot is not None:
+                                if task.task_status in [TaskStatus.TASK_STATUS_SUCCESS, TaskStatus.TASK_STATUS_FAILED]:
+                                    task.task_status = TaskStatus.TASK_STATUS_PENDING
+                                if task.task_status == TaskStatus.TASK_STATUS_PENDING:
+                                    self.start_executor_for(task, slot)
                     else:
                         log.warning("Unknown task type: " + str(task.task_execute_mode) + ", task_id: " + str(task.task_id))
 
             else:
-                if task_executor.active:
-                    task_executor.stop()
+                for slot in self.slots:
+                    if slot.executor.active:
+                        slot.executor.stop()
             time.sleep(1)
 
     def copy_task(self, task, to_task_execute_mode: TaskExecuteMode):
@@ -0,0 +1,108 @@
+import threading
+from collections import defaultdict
+
+import cv2
+import numpy as np
+
+import bot.base.log as logger
+from bot.base.common import ImageMatchMode
+from bot.base.resource import UI
+from bot.recog.image_matcher import image_match
+
+log = logger.get_logger(__name__)
+
+THUMB_SIZE = (18, 32)
+FINGERPRINT_NEAR = 6.0
+
+
+def thumbnail(gray):
+    try:
+        return cv2.resize(gray, THUMB_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32)
+    except Exception:
+        return None
+
+
+def match_ui(ui: UI, target) -> bool:
+    for template in ui.check_exist_template_list:
+        area = template.image_match_config.match_area
+        if template.image_match_config.match_mode != ImageMatchMode.IMAGE_MATCH_MODE_TEMPLATE_MATCH:
+            log.error("template not set match mode")
+            continue
+        if not image_match(target[area.y1:area.y2, area.x1:area.x2], template).find_match:
+            return False
+    for template in ui.check_non_exist_template_list:
+        area = template.image_match_config.match_area
+        if template.image_match_config.match_mode != ImageMatchMode.IMAGE_MATCH_MODE_TEMPLATE_MATCH:
+            log.error("template not set match mode")
+            continue
+        if image_match(target[area.y1:area.y2, area.x1:area.x2], template).find_match:
+            return False
+    return True
+
+
+class UIClassifier:
+    """Orders candidate UIs before template verification.
+
+    Stage one is cheap: a 18x32 thumbnail of the frame is compared with the last thumbnail
+    seen for every UI, and UIs whose thumbnail is close are tried first. The rest are ordered by
+    the per-session transition counts prev_ui -> ui. Stage two verifies candidates in that order
+    and stops at the first match.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.transitions = defaultdict(lambda: defaultdict(int))
+        self.seen = defaultdict(int)
+        self.fingerprints = {}
+        self.frames = 0
+        self.verified = 0
+        self.skipped = 0
+
+    def reset(self):
+        with self._lock:
+            self.transitions.clear()
+            self.seen.clear()
+            self.fingerprints.clear()
+            self.frames = 0
+            self.verified = 0
+            self.skipped = 0
+
+    def rank(self, ui_list, prev_ui, thumb):
+        prev_name = getattr(prev_ui, 'ui_name', None)
+        row = self.transitions.get(prev_name, {})
+        keys = []
+        for idx, ui in enumerate(ui_list):
+            near = 0
+            fp = self.fingerprints.get(ui.ui_name)
+            if thumb is not None and fp is not None:
+                try:
+                    dist = float(np.abs(thumb - fp).mean())
+                except Exception:
+                    dist = 255.0
+                if dist < FINGERPRINT_NEAR:
+                    near = 1
+            keys.append((-near, -row.get(ui.ui_name, 0), -self.seen.get(ui.ui_name, 0), idx))
+        order = sorted(range(len(ui_list)), key=lambda i: keys[i])
+        return [ui_list[i] for i in order]
+
+    def record(self, prev_ui, ui, thumb):
+        with self._lock:
+            self.frames += 1
+            if ui is None:
+                return
+            prev_name = getattr(prev_ui, 'ui_name', None)
+            self.transitions[prev_name][ui.ui_name] += 1
+            self.seen[ui.ui_name] += 1
+            if thumb is not None:
+                self.fingerprints[ui.ui_name] = thumb
+
+    def stats(self):
+        with self._lock:
+            frames = self.frames
+            return {
+                "frames": frames,
+                "verified": self.verified,
+                "skipped_unchanged": self.skipped,
+                "avg_verified_per_frame": (self.verified / frames) if frames else 0.0,
+                "known_ui": len(self.seen),
+            }
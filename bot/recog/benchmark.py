@@ -0,0 +1,81 @@
+import argparse
+import glob
+import os
+import time
+
+import cv2
+
+from bot.recog.image_matcher import clip_roi, template_match, to_gray
+
+
+def load_frames(path):
+    files = sorted(glob.glob(os.path.join(path, "*.png")) + glob.glob(os.path.join(path, "*.jpg")))
+    frames = []
+    for f in files:
+        img = cv2.imread(f, cv2.IMREAD_COLOR)
+        if img is not None:
+            frames.append((os.path.basename(f), to_gray(img)))
+    return frames
+
+
+def bench_pyramid(frames, templates, scales=(2, 4), repeat=5):
+    rows = []
+    for name, tpl in templates:
+        cfg = tpl.image_match_config
+        original_scale = getattr(cfg, 'pyramid_scale', 1)
+        try:
+            baseline = []
+            t0 = time.perf_counter()
+            for _ in range(repeat):
+                baseline = []
+                for _, frame in frames:
+                    roi, _, _ = clip_roi(frame, cfg.match_area)
+                    baseline.append(template_match(roi, tpl, cfg.match_accuracy, use_pyramid=False))
+            full_ms = (time.perf_counter() - t0) * 1000.0 / max(1, repeat * len(frames))
+            rows.append((name, 1, full_ms, 1.0, 0.0))
+            for scale in scales:
+                cfg.pyramid_scale = scale
+                results = []
+                t0 = time.perf_counter()
+                for _ in range(repeat):
+                    results = []
+                    for _, frame in frames:
+                        roi, _, _ = clip_roi(frame, cfg.match_area)
+                        results.append(template_match(roi, tpl, cfg.match_accuracy))
+                ms = (time.perf_counter() - t0) * 1000.0 / max(1, repeat * len(frames))
+                agree = 0
+                offsets = []
+                for a, b in zip(baseline, results):
+                    if a.find_match == b.find_match:
+                        agree += 1
+                    if a.find_match and b.find_match:
+                        offsets.append(abs(a.center_point[0] - b.center_point[0]) + abs(a.center_point[1] - b.center_point[1]))
+                rows.append((name, scale, ms, agree / max(1, len(frames)),
+                             (sum(offsets) / len(offsets)) if offsets else 0.0))
+        finally:
+            cfg.pyramid_scale = original_scale
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="coarse-to-fine template matching benchmark on recorded frames")
+    parser.add_argument("--frames", required=True, help="directory of recorded 720x1280 screenshots")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--templates", nargs="*",
+                        default=["REF_SKILL_LIST_DETECT_LABEL", "REF_RACE_LIST_DETECT_LABEL", "REF_SELECTOR"])
+    args = parser.parse_args()
+
+    import module.umamusume.asset.template as tpl_module
+    templates = [(n, getattr(tpl_module, n)) for n in args.templates if hasattr(tpl_module, n)]
+    frames = load_frames(args.frames)
+    if not frames:
+        print("no frames found")
+        return
+    print(f"{len(frames)} frames, {len(templates)} templates")
+    print(f"{'template':32} {'scale':>5} {'ms/frame':>9} {'agree':>7} {'offset_px':>9}")
+    for name, scale, ms, agree, offset in bench_pyramid(frames, templates, repeat=args.repeat):
+        print(f"{name:32} {scale:>5} {ms:>9.3f} {agree:>7.1%} {offset:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import re
+import threading
+
+import cv2
+
+import bot.base.log as logger
+from bot.recog import ocr
+
+log = logger.get_logger(__name__)
+
+# 固定位置数字读取: 属性值 / 训练加成 / 失败率 / 技能点数.
+# 先把 ROI 规整成识别模型的输入高度, 只跑识别模型; 置信度不够时退回完整 OCR.
+DIGIT_LINE_HEIGHT = 48
+DIGIT_MIN_SCORE = 0.8
+# 数字框里常见的非数字字符, 出现其他字符说明 ROI 里混进了别的东西
+DIGIT_EXTRA_CHARS = set("+%/,. ")
+
+_lock = threading.Lock()
+_stats = {"rec": 0, "fallback": 0, "empty": 0}
+
+
+class DigitRead:
+    text: str = ""
+    score: float = 0.0
+    source: str = ""
+
+    def __init__(self, text="", score=0.0, source=""):
+        self.text = text
+        self.score = score
+        self.source = source
+
+    @property
+    def value(self):
+        return int(self.text) if self.text else None
+
+    def __repr__(self):
+        return f"DigitRead({self.text!r}, {self.score:.2f}, {self.source})"
+
+
+def normalize_line(img):
+    if img is None or getattr(img, 'size', 0) == 0:
+        return None
+    if len(img.shape) == 2:
+        img = cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    h, w = img.shape[:2]
+    if h != DIGIT_LINE_HEIGHT:
+        scale = DIGIT_LINE_HEIGHT / h
+        img = cv2.resize(img, (max(1, int(round(w * scale))), DIGIT_LINE_HEIGHT),
+                         interpolation=cv2.INTER_CUBIC if scale > 1 else cv2.INTER_AREA)
+    return cv2.copyMakeBorder(img, 0, 0, 4, 4, cv2.BORDER_REPLICATE)
+
+
+def _confidence(text, score):
+    text = text.strip()
+    if any(not c.isdigit() and c not in DIGIT_EXTRA_CHARS for c in text):
+        return score * 0.5
+    return score
+
+
+def read_digits_batch(imgs, min_score=DIGIT_MIN_SCORE, fallback="digits", pad=20, allow_empty=False) -> list[DigitRead]:
+    """Digits of every ROI, in order. `fallback` is "digits" (ocr_digits), "line" (ocr_line) or None."""
+    def accept(text, score):
+        return bool(re.sub("\\D", "", text)) and _confidence(text, score) >= min_score
+
+    reads = []
+    for text, score, source in ocr.ocr_batch_scored(imgs, digits=fallback == "digits", pad=pad,
+                                                    allow_empty=allow_empty, prepare=normalize_line,
+                                                    accept=accept, fallback=fallback is not None):
+        if source == "rec":
+            reads.append(DigitRead(re.sub("\\D", "", text), _confidence(text, score), "rec"))
+        elif source == "ocr":
+            reads.append(DigitRead(re.sub("\\D", "", text), 0.0, "ocr"))
+        elif source == "empty":
+            reads.append(DigitRead("", score, "empty"))
+        else:
+            reads.append(DigitRead())
+    with _lock:
+        for r in reads:
+            key = "fallback" if r.source == "ocr" else ("rec" if r.source == "rec" else "empty")
+            _stats[key] += 1
+    return reads
+
+
+def read_digits(img, **kwargs) -> DigitRead:
+    return read_digits_batch([img], **kwargs)[0]
+
+
+def stats():
+    with _lock:
+        return dict(_stats)
@@ -0,0 +1,179 @@
+import threading
+
+import cv2
+import numpy as np
+
+from bot.base.common import Area
+from bot.recog.image_matcher import image_match, clip_roi
+
+_lock = threading.Lock()
+# 最近几帧的缓存, 多台设备交替调用时各自的当前帧都能命中
+RECENT_FRAMES = 8
+_recent = []
+
+# 画面指纹: 缩小后的灰度图, 用平均绝对差判断画面是否变化
+SIGNATURE_SIZE = (36, 64)
+
+
+def signature(img):
+    try:
+        if img is None or getattr(img, 'size', 0) == 0:
+            return None
+        if len(img.shape) == 3:
+            img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        return cv2.resize(img, SIGNATURE_SIZE, interpolation=cv2.INTER_AREA).astype(np.float32)
+    except Exception:
+        return None
+
+
+def signature_delta(a, b) -> float:
+    if a is None or b is None or a.shape != b.shape:
+        return 255.0
+    return float(np.abs(a - b).mean())
+
+
+# 与 Executor.unchanged_threshold 相同: 平均差低于它视为画面没变
+CHANGED_THRESHOLD = 0.5
+
+
+def dirty_area(a, b, shape, threshold=8.0, changed_threshold=CHANGED_THRESHOLD):
+    """Bounding Area (in frame pixels) of signature cells that changed by more than `threshold`.
+    None only when the frame is unchanged by signature_delta's measure (< `changed_threshold`); a change
+    spread too thinly for any cell to cross `threshold` (fades, brightness shifts) gives the whole frame."""
+    full = Area(0, 0, shape[1], shape[0])
+    if a is None or b is None or a.shape != b.shape:
+        return full
+    diff = np.abs(a - b)
+    if float(diff.mean()) < changed_threshold:
+        return None
+    ys, xs = np.nonzero(diff > threshold)
+    if len(ys) == 0:
+        return full
+    sy = shape[0] / a.shape[0]
+    sx = shape[1] / a.shape[1]
+    return Area(int(xs.min() * sx), int(ys.min() * sy), int((xs.max() + 1) * sx), int((ys.max() + 1) * sy))
+
+
+class FrameCache:
+    """Conversions, crops and template matches derived from one captured frame.
+
+    Arrays handed out are marked read-only because they are shared between parsers;
+    callers that need to draw on an image must .copy() it first.
+    """
+
+    def __init__(self, image):
+        self.image = image
+        self._lock = threading.RLock()
+        self._gray = None
+        self._rgb = None
+        self._signature = None
+        self._crops = {}
+        self._matches = {}
+        self.memo = {}
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _freeze(arr):
+        try:
+            arr.flags.writeable = False
+        except Exception:
+            pass
+        return arr
+
+    def gray(self):
+        if self._gray is None:
+            with self._lock:
+                if self._gray is None:
+                    img = self.image
+                    if img is not None and len(img.shape) == 3:
+                        self._gray = self._freeze(cv2.cvtColor(img, cv2.COLOR_BGR2GRAY))
+                    else:
+                        self._gray = img
+                    self.misses += 1
+                    return self._gray
+        self.hits += 1
+        return self._gray
+
+    def rgb(self):
+        if self._rgb is None:
+            with self._lock:
+                if self._rgb is None:
+                    self._rgb = self._freeze(cv2.cvtColor(self.image, cv2.COLOR_BGR2RGB))
+                    self.misses += 1
+                    return self._rgb
+        self.hits += 1
+        return self._rgb
+
+    def signature(self):
+        if self._signature is None:
+            self._signature = signature(self.gray())
+        return self._signature
+
+    def crop(self, y1, y2, x1, x2, mode="bgr"):
+        key = (y1, y2, x1, x2, mode)
+        roi = self._crops.get(key)
+        if roi is not None:
+            self.hits += 1
+            return roi
+        if mode == "gray":
+            src = self.gray()
+        elif mode == "rgb":
+            src = self.rgb()
+        else:
+            src = self.image
+        if src is None:
+            return None
+        h, w = src.shape[:2]
+        y1c = max(0, min(h, y1)); y2c = max(y1c, min(h, y2))
+        x1c = max(0, min(w, x1)); x2c = max(x1c, min(w, x2))
+        roi = src[y1c:y2c, x1c:x2c]
+        with self._lock:
+            self._crops[key] = roi
+        self.misses += 1
+        return roi
+
+    def match(self, template, area=None):
+        """image_match on the gray frame, memoized per (template, area)."""
+        key = (id(template), None if area is None else (area.x1, area.y1, area.x2, area.y2))
+        res = self._matches.get(key)
+        if res is not None and res[0] is template:
+            self.hits += 1
+            return res[1]
+        gray = self.gray()
+        if area is not None:
+            roi, x1, y1 = clip_roi(gray, area)
+            result = image_match(roi, template)
+            if result is not None and result.find_match:
+                cx, cy = result.center_point
+                result.center_point = (cx + x1, cy + y1)
+                (p1, p2) = result.matched_area
+                result.matched_area = ((p1[0] + x1, p1[1] + y1), (p2[0] + x1, p2[1] + y1))
+        else:
+            result = image_match(gray, template)
+        with self._lock:
+            self._matches[key] = (template, result)
+        self.misses += 1
+        return result
+
+
+def get_frame(image):
+    """FrameCache for `image`; reuses the cached one while the same frame object is passed in."""
+    if image is None:
+        return None
+    for fc in tuple(_recent):
+        if fc.image is image:
+            return fc
+    with _lock:
+        for fc in _recent:
+            if fc.image is image:
+                return fc
+        fc = FrameCache(image)
+        _recent.insert(0, fc)
+        del _recent[RECENT_FRAMES:]
+        return fc
+
+
+def invalidate():
+    with _lock:
+        _recent.clear()
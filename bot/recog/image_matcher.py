@@ -8,6 +8,9 @@ import bot.base.log as logger
 
 log = logger.get_logger(__name__)
 
+PYRAMID_COARSE_MARGIN = 0.2
+PYRAMID_CANDIDATES = 3
+
 
 class ImageMatchResult:
     matched_area = None
@@ -60,13 +63,16 @@ def image_match(target, template: Template) -> ImageMatchResult:
         return ImageMatchResult()
 
 
-def template_match(target, template, accuracy: float = 0.86) -> ImageMatchResult:
+def template_match(target, template, accuracy: float = 0.86, use_pyramid: bool = True) -> ImageMatchResult:
     if target is None or target.size == 0:
         return ImageMatchResult()
+    scale = getattr(getattr(template, 'image_match_config', None), 'pyramid_scale', 1) or 1
+    if use_pyramid and scale > 1:
+        res = pyramid_template_match(target, template, accuracy, scale)
+        if res is not None:
+            return res
     try:
-        arr = getattr(template, 'template_img', None)
-        if arr is None:
-            arr = getattr(template, 'template_image', None)
+        arr = getattr(template, 'template_image', None)
         if arr is not None:
             try:
                 th, tw = arr.shape[::]
@@ -90,6 +96,110 @@ def template_match(target, template, accuracy: float = 0.86) -> ImageMatchResult
         return ImageMatchResult()
 
 
+def find_all(target, template: Template, accuracy: float = None, max_results: int = 32,
+             order: str = "score") -> list[ImageMatchResult]:
+    """Every instance of `template` in one matchTemplate pass, peaks separated by non-maximum suppression.
+
+    Boxes overlapping an already accepted box are dropped, like the old blank-and-rematch loops.
+    `order` is "score" (best first) or "y" (top to bottom).
+    """
+    results = []
+    try:
+        if target is None or target.size == 0:
+            return results
+        cfg = template.image_match_config
+        if accuracy is None:
+            accuracy = cfg.match_accuracy
+        tgt = to_gray(target)
+        roi, ox, oy = clip_roi(tgt, cfg.match_area)
+        arr = template.template_image
+        if arr is None or roi is None or roi.size == 0:
+            return results
+        th, tw = arr.shape[:2]
+        if roi.shape[0] < th or roi.shape[1] < tw:
+            return results
+        res = cv2.matchTemplate(roi, arr, cv2.TM_CCOEFF_NORMED)
+        ys, xs = np.nonzero(res > accuracy)
+        if len(ys) == 0:
+            return results
+        scores = res[ys, xs]
+        if len(scores) > 4096:
+            top = np.argpartition(-scores, 4096)[:4096]
+            ys, xs, scores = ys[top], xs[top], scores[top]
+        kept = []
+        for i in np.argsort(-scores, kind="stable"):
+            x, y = int(xs[i]), int(ys[i])
+            if any(abs(x - kx) < tw and abs(y - ky) < th for kx, ky in kept):
+                continue
+            kept.append((x, y))
+            r = ImageMatchResult()
+            r.find_match = True
+            r.score = float(scores[i])
+            r.center_point = (int(x + tw / 2) + ox, int(y + th / 2) + oy)
+            r.matched_area = ((x + ox, y + oy), (x + tw + ox, y + th + oy))
+            results.append(r)
+            if len(results) >= max_results:
+                break
+        if order == "y":
+            results.sort(key=lambda r: (r.center_point[1], r.center_point[0]))
+    except Exception as e:
+        log.error(f"find_all failed: {e}")
+    return results
+
+
+def pyramid_template_match(target, template, accuracy: float, scale: int):
+    # 粗匹配: 1/scale 分辨率找候选; 精匹配: 原分辨率候选附近小窗口确认. 返回 None 表示退回全分辨率
+    try:
+        arr = template.template_image
+        small_tpl = template.scaled_image(scale)
+        if arr is None or small_tpl is None:
+            return None
+        th, tw = arr.shape[:2]
+        h, w = target.shape[:2]
+        if h < th or w < tw:
+            return ImageMatchResult()
+        sh, sw = h // scale, w // scale
+        sth, stw = small_tpl.shape[:2]
+        if sh < sth or sw < stw or sth < 4 or stw < 4:
+            return None
+        small = cv2.resize(target, (sw, sh), interpolation=cv2.INTER_AREA)
+        coarse = cv2.matchTemplate(small, small_tpl, cv2.TM_CCOEFF_NORMED)
+        coarse_accuracy = accuracy - PYRAMID_COARSE_MARGIN
+        pad = scale * 2
+        best_val = -1.0
+        best_loc = None
+        for _ in range(PYRAMID_CANDIDATES):
+            _, cval, _, cloc = cv2.minMaxLoc(coarse)
+            if cval < coarse_accuracy:
+                break
+            x, y = cloc[0] * scale, cloc[1] * scale
+            x1 = max(0, x - pad)
+            y1 = max(0, y - pad)
+            x2 = min(w, x + tw + pad)
+            y2 = min(h, y + th + pad)
+            window = target[y1:y2, x1:x2]
+            if window.shape[0] >= th and window.shape[1] >= tw:
+                fine = cv2.matchTemplate(window, arr, cv2.TM_CCOEFF_NORMED)
+                _, fval, _, floc = cv2.minMaxLoc(fine)
+                if fval > best_val:
+                    best_val = float(fval)
+                    best_loc = (floc[0] + x1, floc[1] + y1)
+                if fval > accuracy:
+                    break
+            cy1 = max(0, cloc[1] - sth // 2)
+            cx1 = max(0, cloc[0] - stw // 2)
+            coarse[cy1:cloc[1] + sth // 2 + 1, cx1:cloc[0] + stw // 2 + 1] = -1.0
+        match_result = ImageMatchResult()
+        match_result.score = max(0.0, best_val)
+        if best_loc is not None and best_val > accuracy:
+            match_result.find_match = True
+            match_result.center_point = (int(best_loc[0] + tw / 2), int(best_loc[1] + th / 2))
+            match_result.matched_area = ((best_loc[0], best_loc[1]), (best_loc[0] + tw, best_loc[1] + th))
+        return match_result
+    except Exception:
+        return None
+
+
 def compare_color_equal(p: list, target: list, tolerance: int = 10) -> bool:
     distance = np.sqrt(np.sum((np.array(target) - np.array(p)) ** 2))
     return distance < tolerance
@@ -1,9 +1,14 @@
 import cv2
-import importlib, sys, threading
+import hashlib
+import importlib, re, sys, threading, time
+import numpy as np
+from collections import OrderedDict
 paddleocr = None
 from difflib import SequenceMatcher
 import bot.base.log as logger
 import os
+from bot.recog.service import FairGate
+from bot.recog.text_index import best_ratio
 from config import CONFIG
 os.environ['FLAGS_allocator_strategy'] = 'naive_best_fit'
 os.environ['FLAGS_fraction_of_cpu_memory_to_use'] = '0.27'
@@ -22,9 +27,50 @@ def cpu_threads():
         return os.cpu_count()
 
 
-OCR_JP = None
-OCR_CH = None
-OCR_EN = None
+OCR_LANGS = ("en", "japan", "ch")
+
+# 每种语言的模型第一次用到时才加载, 任务之间保持常驻 (keep_warm), 不再每次任务结束都重新加载.
+# keep_warm 只管模型的去留, 任务结束后是否重启进程由 purge.finish_task_process 决定
+_models = {}
+_model_info = {}
+_model_locks = {lang: threading.Lock() for lang in OCR_LANGS}
+
+
+def ocr_config():
+    cfg = getattr(CONFIG.bot.auto, 'ocr', None) or {}
+    preload = cfg.get('preload')
+    if preload is None:
+        preload = ["en"]
+    elif isinstance(preload, str):
+        preload = [x.strip() for x in preload.split(",") if x.strip()]
+    keep_warm = cfg.get('keep_warm')
+    try:
+        workers = int(os.getenv("UAT_OCR_WORKERS", cfg.get('workers') or 0))
+    except Exception:
+        workers = 0
+    return {"preload": [x for x in preload if x in OCR_LANGS], "keep_warm": True if keep_warm is None else bool(keep_warm),
+            "workers": max(0, workers)}
+
+
+def ocr_pool():
+    # workers > 0 时 OCR 交给独立进程池, 每个进程分到 cpu_alloc 中的一部分核心
+    workers = ocr_config()["workers"]
+    if workers <= 0:
+        return None
+    from bot.recog.ocr_pool import get_pool
+    return get_pool(workers, range(min(cpu_threads() or 1, os.cpu_count() or 1)))
+
+
+# 所有设备的模型调用都经过同一个闸门: 进程内模型一次只跑一个请求, 进程池时并发数等于 worker 数
+OCR_GATE = FairGate(max(1, ocr_config()["workers"]))
+
+
+def _rss_mb():
+    try:
+        import psutil
+        return psutil.Process(os.getpid()).memory_info().rss / 1048576.0
+    except Exception:
+        return 0.0
 
 
 def ensure_paddleocr():
@@ -44,43 +90,84 @@ def ensure_paddleocr():
         log.error(f"Failed to import paddleocr: {e}")
         raise
 
-def init_ocr_if_needed():
-    global OCR_JP, OCR_CH, OCR_EN
-    ensure_paddleocr()
-    try:
-        if OCR_EN is None:
-            OCR_EN = paddleocr.PaddleOCR(lang="en", show_log=False, use_angle_cls=False, use_gpu=False, enable_mkldnn=True, cpu_threads=cpu_threads())
-        if OCR_JP is None:
-            OCR_JP = paddleocr.PaddleOCR(lang="japan", show_log=False, use_angle_cls=False, use_gpu=False, enable_mkldnn=True, cpu_threads=cpu_threads())
-        if OCR_CH is None:
-            OCR_CH = paddleocr.PaddleOCR(lang="ch", show_log=False, use_angle_cls=False, use_gpu=False, enable_mkldnn=True, cpu_threads=cpu_threads())
-    except Exception as e:
-        log.error(f"Failed to initialize PaddleOCR: {e}")
-        raise
+
+def load_ocr(lang: str):
+    if lang not in OCR_LANGS:
+        lang = "en"
+    o = _models.get(lang)
+    if o is not None:
+        return o
+    with _model_locks[lang]:
+        o = _models.get(lang)
+        if o is not None:
+            return o
+        ensure_paddleocr()
+        started = time.time()
+        rss_before = _rss_mb()
+        try:
+            o = paddleocr.PaddleOCR(lang=lang, show_log=False, use_angle_cls=False, use_gpu=False,
+                                    enable_mkldnn=True, cpu_threads=cpu_threads())
+        except Exception as e:
+            log.error(f"Failed to initialize PaddleOCR ({lang}): {e}")
+            raise
+        _models[lang] = o
+        _model_info[lang] = {
+            "load_ms": round((time.time() - started) * 1000.0, 1),
+            "rss_mb": round(max(0.0, _rss_mb() - rss_before), 1),
+            "loaded_at": time.strftime('%Y-%m-%d %H:%M:%S', time.localtime()),
+            "calls": 0,
+        }
+        log.info(f"OCR model '{lang}' loaded in {_model_info[lang]['load_ms']:.0f} ms, +{_model_info[lang]['rss_mb']:.0f} MB")
+        return o
+
+
+def init_ocr_if_needed(langs=None):
+    if ocr_pool() is not None:
+        return
+    for lang in (ocr_config()["preload"] if langs is None else langs):
+        load_ocr(lang)
 
 
 def get_ocr(lang: str):
-    init_ocr_if_needed()
-    if lang == "en":
-        return OCR_EN
-    if lang == "japan":
-        return OCR_JP
-    if lang == "ch":
-        return OCR_CH
-    return OCR_EN
+    o = load_ocr(lang)
+    info = _model_info.get(lang if lang in OCR_LANGS else "en")
+    if info is not None:
+        info["calls"] += 1
+    return o
 
 
+def ocr_status():
+    from bot.recog.ocr_pool import current_pool
+    pool = current_pool()
+    return {
+        "pool": pool.status() if pool is not None else None,
+        "cache": OCR_CACHE.stats(),
+        "gate": OCR_GATE.stats(),
+        "loaded": sorted(_models.keys()),
+        "models": {k: dict(v) for k, v in _model_info.items() if k in _models},
+        "rss_mb": round(_rss_mb(), 1),
+        **ocr_config(),
+    }
 
 
+def release_ocr(reason: str = ""):
+    # 任务结束时调用: keep_warm 时模型保留, 否则完全卸载. 不影响进程是否重启
+    if ocr_config()["keep_warm"]:
+        return False
+    try:
+        from bot.recog.ocr_pool import stop_pool
+        stop_pool()
+    except Exception:
+        pass
+    reset_ocr()
+    return True
 
 
 def reset_ocr():
-    global OCR_EN, OCR_JP, OCR_CH, paddleocr
+    global paddleocr
     try:
-        for obj in (OCR_EN, OCR_JP, OCR_CH):
+        for obj in list(_models.values()):
             try:
-                if obj is None:
-                    continue
                 for attr in ("text_detector", "text_recognizer", "text_classifier"):
                     if hasattr(obj, attr):
                         try:
@@ -90,9 +177,9 @@ def reset_ocr():
             except Exception:
                 pass
     finally:
-        OCR_EN = None
-        OCR_JP = None
-        OCR_CH = None
+        _models.clear()
+        _model_info.clear()
+        OCR_CACHE.clear()
         try:
             import importlib as _il
             _il.invalidate_caches()
@@ -133,7 +220,92 @@ def reset_ocr():
             pass
 
 
+# OCR 结果缓存: 以 ROI 像素的哈希 + 语言为键的 LRU, 同样的像素不再重复进模型.
+# near_bits > 0 时先丢掉每个像素的低位再哈希, 让只有轻微噪声差异的 ROI 也能命中.
+class OCRCache:
+    def __init__(self, max_entries=2048, near_bits=0):
+        self.max_entries = max_entries
+        self.near_bits = near_bits
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, img, lang, op):
+        try:
+            arr = np.ascontiguousarray(img)
+            if self.near_bits:
+                arr = arr >> self.near_bits
+            h = hashlib.blake2b(arr.tobytes(), digest_size=16)
+            h.update(str(arr.shape).encode())
+            return lang, op, h.digest()
+        except Exception:
+            return None
+
+    def get(self, key):
+        if key is None or self.max_entries <= 0:
+            return None
+        with self._lock:
+            v = self._data.get(key)
+            if v is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return v
+
+    def put(self, key, value):
+        if key is None or self.max_entries <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"entries": len(self._data), "max_entries": self.max_entries, "near_bits": self.near_bits,
+                    "hits": self.hits, "misses": self.misses, "hit_rate": (self.hits / total) if total else 0.0}
+
+
+def _make_cache():
+    cfg = getattr(CONFIG.bot.auto, 'ocr', None) or {}
+    try:
+        size = int(os.getenv("UAT_OCR_CACHE_SIZE", cfg.get('cache_size') if cfg.get('cache_size') is not None else 2048))
+        near = int(cfg.get('cache_near_bits') or 0)
+    except Exception:
+        size, near = 2048, 0
+    return OCRCache(size, max(0, min(7, near)))
+
+
+OCR_CACHE = _make_cache()
+
+
 def ocr(img, lang="en"):
+    key = OCR_CACHE.key(img, lang, "ocr")
+    cached = OCR_CACHE.get(key)
+    if cached is not None:
+        OCR_GATE.cache_hit()
+        return cached
+    with OCR_GATE.slot():
+        raw = _ocr(img, lang)
+    OCR_CACHE.put(key, raw if raw is not None else [])
+    return raw
+
+
+def _ocr(img, lang="en"):
+    pool = ocr_pool()
+    if pool is not None:
+        try:
+            return pool.ocr(img, lang)
+        except Exception as e:
+            log.warning(f"ocr worker failed, running in-process: {e}")
     o = get_ocr(lang)
     return o.ocr(img, cls=False)
 
@@ -192,13 +364,108 @@ def ocr_line(img, lang="en"):
 
 
 def ocr_digits(img):
-    raw = get_ocr("en").ocr(img, cls=False)
+    raw = ocr(img, "en")
     items = parse_text_items(raw)
     if not items:
         return ""
     best, _ = max(items, key=lambda x: x[1])
     return best
 
+def _to_bgr(img):
+    if img is not None and len(img.shape) == 2:
+        return cv2.cvtColor(img, cv2.COLOR_GRAY2BGR)
+    return img
+
+
+def _recognize(imgs, lang="en"):
+    keys = [OCR_CACHE.key(i, lang, "rec") for i in imgs]
+    out = [OCR_CACHE.get(k) for k in keys]
+    miss = [i for i, v in enumerate(out) if v is None]
+    if len(miss) < len(imgs):
+        OCR_GATE.cache_hit()
+    if miss:
+        with OCR_GATE.slot():
+            results = _recognize_uncached([imgs[i] for i in miss], lang)
+        for i, v in zip(miss, results):
+            out[i] = v
+            OCR_CACHE.put(keys[i], v)
+    return out
+
+
+def _recognize_uncached(imgs, lang="en"):
+    # 只跑识别模型, 不跑检测: 输入必须已经是紧贴文字的单行图片
+    pool = ocr_pool()
+    if pool is not None:
+        try:
+            return pool.recognize([_to_bgr(i) for i in imgs], lang)
+        except Exception as e:
+            log.warning(f"ocr worker failed, running in-process: {e}")
+    o = get_ocr(lang)
+    rec = getattr(o, "text_recognizer", None)
+    if rec is not None:
+        res, _ = rec([_to_bgr(i) for i in imgs])
+        return [(str(t or ""), float(sc or 0)) for t, sc in res]
+    out = []
+    for i in imgs:
+        items = parse_text_items(o.ocr(_to_bgr(i), det=False, cls=False))
+        out.append(items[0] if items else ("", 0.0))
+    return out
+
+
+# ocr_batch 一次识别多个单行 ROI, 结果按输入顺序返回.
+# det=False 时整批送进识别模型 (一次前向), 置信度低于 min_score 或不符合 expect 正则的
+# ROI 再单独走一遍完整 OCR (加白边 + 检测), 与原来的 ocr_line / ocr_digits 结果一致.
+# allow_empty: 空白 ROI 是正常情况 (例如没有加成的属性), 识别为空时不再重试.
+OCR_BATCH_MIN_SCORE = 0.6
+
+
+def ocr_batch_scored(imgs, lang="en", det=False, digits=False, pad=20, min_score=OCR_BATCH_MIN_SCORE, expect=None,
+                     allow_empty=False, prepare=None, accept=None, fallback=True):
+    """(text, score, source) per ROI in input order. source is "rec" (batched recognition), "empty",
+    "ocr" (full OCR fallback, score 0) or "" when the ROI was not read.
+
+    `prepare` turns each ROI into the recognizer's input (None skips the ROI); `accept(text, score)`
+    replaces the min_score / expect check."""
+    out = [("", 0.0, "")] * len(imgs)
+    inputs = [prepare(img) if prepare is not None else img for img in imgs]
+    todo = [i for i, img in enumerate(inputs) if img is not None and getattr(img, 'size', 0) > 0]
+    retry = list(todo)
+    if not det and todo:
+        if accept is None:
+            def accept(text, score):
+                return score >= min_score and (expect is None or re.search(expect, text) is not None)
+        try:
+            results = _recognize([inputs[i] for i in todo], lang)
+            retry = []
+            for i, (text, score) in zip(todo, results):
+                text = text.strip()
+                if not text:
+                    if allow_empty:
+                        out[i] = ("", score, "empty")
+                    else:
+                        retry.append(i)
+                elif accept(text, score):
+                    out[i] = (text, score, "rec")
+                else:
+                    retry.append(i)
+        except Exception as e:
+            log.debug(f"batched recognition failed, falling back to full ocr: {e}")
+            retry = list(todo)
+    if not fallback:
+        return out
+    for i in retry:
+        img = imgs[i]
+        if pad:
+            img = cv2.copyMakeBorder(img, pad, pad, pad, pad, cv2.BORDER_CONSTANT, None, (255, 255, 255))
+        out[i] = (ocr_digits(img) if digits else ocr_line(img, lang), 0.0, "ocr")
+    return out
+
+
+def ocr_batch(imgs, lang="en", **kwargs):
+    """Text of every ROI, in input order; see ocr_batch_scored for the options."""
+    return [text for text, _, _ in ocr_batch_scored(imgs, lang, **kwargs)]
+
+
 # find_text_pos 查找目标文字在图片中的位置
 def find_text_pos(ocr_result, target):
     threshold = 0.6
@@ -213,10 +480,4 @@ def find_text_pos(ocr_result, target):
 
 
 def find_similar_text(target_text, ref_text_list, threshold=0):
-    result = ""
-    for ref_text in ref_text_list:
-        s = SequenceMatcher(None, target_text, ref_text)
-        if s.ratio() > threshold:
-            result = ref_text
-            threshold = s.ratio()
-    return result
+    return best_ratio(target_text, ref_text_list, threshold)
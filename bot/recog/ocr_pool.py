@@ -0,0 +1,234 @@
+import atexit
+import contextlib
+import itertools
+import multiprocessing
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from multiprocessing import shared_memory
+
+import numpy as np
+
+import bot.base.log as logger
+from bot.recog.ocr_worker import worker_main
+
+log = logger.get_logger(__name__)
+
+# OCR 进程池: N 个子进程各自持有 PaddleOCR 模型, 绑定到 cpu_alloc 中的一部分核心.
+# 图片通过共享内存传递, 请求/结果走队列, 调用方拿到 Future.
+# 子进程崩溃只会让正在处理的请求失败 (调用方退回进程内 OCR), 进程会被自动拉起.
+
+OCR_POOL_TIMEOUT = 30.0
+
+
+def _pack(arrays):
+    metas = []
+    offset = 0
+    for a in arrays:
+        a = np.ascontiguousarray(a)
+        metas.append((offset, a.shape, a.dtype.str))
+        offset += a.nbytes
+    shm = shared_memory.SharedMemory(create=True, size=max(1, offset))
+    for a, (off, shape, dtype) in zip(arrays, metas):
+        a = np.ascontiguousarray(a)
+        np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=off)[...] = a
+    return shm, metas
+
+
+@contextlib.contextmanager
+def _hidden_main():
+    # spawn 会在子进程里重新导入父进程的 __main__ (main.py: cv2 / 控制器 / 调度器...).
+    # 启动期间隐藏 __main__ 的路径, 子进程只导入 worker_main 所在的 ocr_worker
+    main = sys.modules.get("__main__")
+    if main is None or getattr(sys, "frozen", False):
+        yield
+        return
+    saved = {k: main.__dict__[k] for k in ("__file__", "__spec__") if k in main.__dict__}
+    try:
+        main.__dict__.pop("__file__", None)
+        main.__spec__ = None
+        yield
+    finally:
+        main.__dict__.pop("__spec__", None)
+        main.__dict__.update(saved)
+
+
+class OCRPool:
+    def __init__(self, workers, cores=None):
+        self.ctx = multiprocessing.get_context("spawn")
+        self.size = max(1, int(workers))
+        cores = list(cores or range(os.cpu_count() or 1))
+        self.core_sets = [cores[i::self.size] or cores for i in range(self.size)]
+        self.req_q = self.ctx.Queue()
+        self.res_q = self.ctx.Queue()
+        self.procs = [None] * self.size
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._inflight = {}
+        self._running = False
+        self.stats = {"requests": 0, "errors": 0, "restarts": 0}
+
+    def _spawn(self, wid):
+        p = self.ctx.Process(target=worker_main, args=(wid, self.core_sets[wid], self.req_q, self.res_q),
+                             name=f"ocr-worker-{wid}", daemon=True)
+        with _hidden_main():
+            p.start()
+        self.procs[wid] = p
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        for wid in range(self.size):
+            self._spawn(wid)
+        threading.Thread(target=self._collect, name="ocr-pool-results", daemon=True).start()
+        threading.Thread(target=self._watch, name="ocr-pool-watch", daemon=True).start()
+        log.info(f"OCR worker pool started: {self.size} workers, cores {self.core_sets}")
+
+    def stop(self):
+        if not self._running:
+            return
+        self._running = False
+        for _ in self.procs:
+            try:
+                self.req_q.put(None)
+            except Exception:
+                pass
+        for p in self.procs:
+            try:
+                if p is not None:
+                    p.join(timeout=3)
+                    if p.is_alive():
+                        p.terminate()
+            except Exception:
+                pass
+        with self._lock:
+            pending = list(self._pending.keys())
+        for rid in pending:
+            self._finish(rid, error=RuntimeError("ocr pool stopped"))
+
+    def _finish(self, rid, result=None, error=None):
+        with self._lock:
+            entry = self._pending.pop(rid, None)
+            self._inflight.pop(rid, None)
+        if entry is None:
+            return
+        fut, shm = entry
+        try:
+            shm.close()
+            shm.unlink()
+        except Exception:
+            pass
+        if error is not None:
+            with self._lock:
+                self.stats["errors"] += 1
+            fut.set_exception(error)
+        else:
+            fut.set_result(result)
+
+    def _collect(self):
+        while self._running:
+            try:
+                kind, rid, wid, payload = self.res_q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            except Exception:
+                break
+            if kind == "take":
+                with self._lock:
+                    if rid in self._pending:
+                        self._inflight[rid] = wid
+            elif kind == "ok":
+                self._finish(rid, result=payload)
+            elif kind == "err":
+                self._finish(rid, error=RuntimeError(payload))
+
+    def _watch(self):
+        while self._running:
+            time.sleep(1.0)
+            for wid, p in enumerate(self.procs):
+                if not self._running or p is None or p.is_alive():
+                    continue
+                log.warning(f"OCR worker {wid} exited with code {p.exitcode}, restarting")
+                # 还没回 "take" 的请求可能正是被这个进程取走的, 分不清就一起判失败 (调用方退回进程内 OCR);
+                # 仍在队列里的请求之后被别的进程处理时, 共享内存已释放, 结果会被忽略
+                with self._lock:
+                    lost = [rid for rid in self._pending if self._inflight.get(rid, wid) == wid]
+                    self.stats["restarts"] += 1
+                for rid in lost:
+                    self._finish(rid, error=RuntimeError(f"ocr worker {wid} died"))
+                self._spawn(wid)
+
+    def _submit(self, op, imgs, lang):
+        fut = Future()
+        shm, metas = _pack(imgs)
+        rid = next(self._ids)
+        with self._lock:
+            self._pending[rid] = (fut, shm)
+            self.stats["requests"] += 1
+        self.req_q.put((rid, op, lang, shm.name, metas))
+        return rid, fut
+
+    def submit(self, op, imgs, lang="en") -> Future:
+        return self._submit(op, imgs, lang)[1]
+
+    def _call(self, op, imgs, lang, timeout):
+        rid, fut = self._submit(op, imgs, lang)
+        try:
+            return fut.result(timeout=timeout)
+        except FutureTimeout:
+            # 卡住的进程不会再回结果, 释放共享内存并让 Future 失败
+            self._finish(rid, error=RuntimeError(f"ocr request {rid} timed out"))
+            raise
+
+    def ocr(self, img, lang="en", timeout=OCR_POOL_TIMEOUT):
+        return self._call("ocr", [img], lang, timeout)
+
+    def recognize(self, imgs, lang="en", timeout=OCR_POOL_TIMEOUT):
+        return self._call("rec", list(imgs), lang, timeout)
+
+    def status(self):
+        with self._lock:
+            pending = len(self._pending)
+            stats = dict(self.stats)
+        return {
+            "workers": self.size,
+            "alive": sum(1 for p in self.procs if p is not None and p.is_alive()),
+            "cores": self.core_sets,
+            "pending": pending,
+            **stats,
+        }
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool(workers, cores=None):
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                p = OCRPool(workers, cores)
+                p.start()
+                _pool = p
+    return _pool
+
+
+def current_pool():
+    return _pool
+
+
+def stop_pool():
+    global _pool
+    with _pool_lock:
+        p, _pool = _pool, None
+    if p is not None:
+        p.stop()
+
+
+atexit.register(stop_pool)
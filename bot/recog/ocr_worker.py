@@ -0,0 +1,59 @@
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# OCR 子进程入口. spawn 出来的进程只导入这个模块, 不能依赖 bot 的其他模块 (日志、配置、控制器),
+# 更不能导入 main.py.
+
+
+def _unpack(shm, metas):
+    return [np.array(np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=off)) for off, shape, dtype in metas]
+
+
+def worker_main(wid, cores, req_q, res_q):
+    threads = max(1, len(cores))
+    for k in ("OMP_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[k] = str(threads)
+    try:
+        import psutil
+        psutil.Process(os.getpid()).cpu_affinity(list(cores))
+    except Exception:
+        pass
+    import paddleocr
+    models = {}
+
+    def model(lang):
+        o = models.get(lang)
+        if o is None:
+            o = paddleocr.PaddleOCR(lang=lang, show_log=False, use_angle_cls=False, use_gpu=False,
+                                    enable_mkldnn=True, cpu_threads=threads)
+            models[lang] = o
+        return o
+
+    res_q.put(("ready", None, wid, None))
+    while True:
+        item = req_q.get()
+        if item is None:
+            break
+        rid, op, lang, shm_name, metas = item
+        res_q.put(("take", rid, wid, None))
+        shm = None
+        try:
+            shm = shared_memory.SharedMemory(name=shm_name)
+            imgs = _unpack(shm, metas)
+            o = model(lang)
+            if op == "rec":
+                res, _ = o.text_recognizer(imgs)
+                out = [(str(t or ""), float(sc or 0)) for t, sc in res]
+            else:
+                out = o.ocr(imgs[0], cls=False)
+            res_q.put(("ok", rid, wid, out))
+        except Exception as e:
+            res_q.put(("err", rid, wid, repr(e)))
+        finally:
+            if shm is not None:
+                try:
+                    shm.close()
+                except Exception:
+                    pass
@@ -0,0 +1,194 @@
+import numpy as np
+
+
+# 像素探针: 声明式描述需要检查的像素/像素行, 每帧用一次向量化计算得到全部结果.
+# 颜色一律按 RGB 书写, evaluate(bgr=True) 时直接读 BGR 画面, 不需要先 cvtColor.
+# 颜色比较与 compare_color_equal 一致: 欧氏距离 < tolerance.
+
+
+class PixelProbe:
+    """One pixel. With `color` it is true when the pixel is within `tolerance` of it;
+    with `lo`/`hi` it is true when every channel lies in [lo, hi] (None = no bound).
+    A pixel outside the image reads as None."""
+
+    def __init__(self, name, x, y, color=None, tolerance=10, lo=None, hi=None):
+        self.name = name
+        self.x = int(x)
+        self.y = int(y)
+        self.color = color
+        self.tolerance = tolerance
+        self.lo = lo
+        self.hi = hi
+
+
+class LineProbe:
+    """Pixels x1..x2 (exclusive) on row y. Result is the number of pixels matching `color`,
+    or not matching it when `count="miss"`."""
+
+    def __init__(self, name, y, x1, x2, color, tolerance=10, count="match"):
+        self.name = name
+        self.y = int(y)
+        self.x1 = int(x1)
+        self.x2 = int(x2)
+        self.color = color
+        self.tolerance = tolerance
+        self.count = count
+
+    @property
+    def length(self):
+        return max(0, self.x2 - self.x1)
+
+
+class PaletteProbe:
+    """Pixels `points` [(x, y), ...] checked in order against `palette` [(label, color), ...].
+    The first pixel that matches any palette colour gives the result, else `default`."""
+
+    def __init__(self, name, points, palette, tolerance=10, default=None):
+        self.name = name
+        self.points = [(int(x), int(y)) for x, y in points]
+        self.palette = list(palette)
+        self.tolerance = tolerance
+        self.default = default
+
+
+class ProbeSet:
+    def __init__(self, probes):
+        self.probes = list(probes)
+        xs, ys = [], []
+        # colour tests: (point index, rgb, tolerance^2); range tests: (point index, lo, hi)
+        c_idx, c_rgb, c_tol = [], [], []
+        r_idx, r_lo, r_hi = [], [], []
+        self._plan = []
+        for p in self.probes:
+            if isinstance(p, PixelProbe):
+                pi = len(xs)
+                xs.append(p.x)
+                ys.append(p.y)
+                if p.color is not None:
+                    self._plan.append((p, "color", len(c_idx)))
+                    c_idx.append(pi)
+                    c_rgb.append(p.color)
+                    c_tol.append(p.tolerance ** 2)
+                else:
+                    self._plan.append((p, "range", len(r_idx)))
+                    r_idx.append(pi)
+                    r_lo.append([-1 if v is None else v for v in (p.lo or (None,) * 3)])
+                    r_hi.append([256 if v is None else v for v in (p.hi or (None,) * 3)])
+            elif isinstance(p, PaletteProbe):
+                grid = []
+                for x, y in p.points:
+                    pi = len(xs)
+                    xs.append(x)
+                    ys.append(y)
+                    row = []
+                    for label, color in p.palette:
+                        row.append((label, len(c_idx)))
+                        c_idx.append(pi)
+                        c_rgb.append(color)
+                        c_tol.append(p.tolerance ** 2)
+                    grid.append(row)
+                self._plan.append((p, "palette", grid))
+            elif isinstance(p, LineProbe):
+                self._plan.append((p, "line", None))
+        self._xs = np.array(xs, dtype=np.intp)
+        self._ys = np.array(ys, dtype=np.intp)
+        self._c_idx = np.array(c_idx, dtype=np.intp)
+        self._c_rgb = np.array(c_rgb, dtype=np.int32).reshape(-1, 3)
+        self._c_tol = np.array(c_tol, dtype=np.float64)
+        self._r_idx = np.array(r_idx, dtype=np.intp)
+        self._r_lo = np.array(r_lo, dtype=np.int32).reshape(-1, 3)
+        self._r_hi = np.array(r_hi, dtype=np.int32).reshape(-1, 3)
+        self._lines = [p for p in self.probes if isinstance(p, LineProbe)]
+        if self._lines:
+            self._l_rgb = np.concatenate([np.tile(np.array(p.color, dtype=np.int32), (p.length, 1))
+                                          for p in self._lines]).reshape(-1, 3)
+            self._l_tol = np.concatenate([np.full(p.length, p.tolerance ** 2, dtype=np.float64)
+                                          for p in self._lines])
+            self._l_bounds = np.cumsum([0] + [p.length for p in self._lines])
+
+    def evaluate(self, img, bgr=True, origin=(0, 0)) -> dict:
+        """All probe results for `img` keyed by probe name. `origin` (x, y) offsets every probe."""
+        out = {}
+        if img is None or getattr(img, "ndim", 0) != 3 or img.size == 0:
+            for p, kind, _ in self._plan:
+                out[p.name] = _empty(p, kind)
+            return out
+        h, w = img.shape[:2]
+        ox, oy = int(origin[0]), int(origin[1])
+        ch = slice(None, None, -1) if bgr else slice(None)
+
+        c_hit = np.zeros(len(self._c_idx), dtype=bool)
+        r_hit = np.zeros(len(self._r_idx), dtype=bool)
+        valid = np.zeros(len(self._xs), dtype=bool)
+        if len(self._xs):
+            xs = self._xs + ox
+            ys = self._ys + oy
+            valid = (xs >= 0) & (xs < w) & (ys >= 0) & (ys < h)
+            pix = img[np.clip(ys, 0, h - 1), np.clip(xs, 0, w - 1), :3][:, ch].astype(np.int32)
+            if len(self._c_idx):
+                d = pix[self._c_idx] - self._c_rgb
+                c_hit = ((d * d).sum(axis=1) < self._c_tol) & valid[self._c_idx]
+            if len(self._r_idx):
+                p = pix[self._r_idx]
+                r_hit = ((p >= self._r_lo) & (p <= self._r_hi)).all(axis=1) & valid[self._r_idx]
+
+        line_hits = None
+        line_ok = []
+        if self._lines:
+            segs = []
+            for p in self._lines:
+                y = p.y + oy
+                x1, x2 = p.x1 + ox, p.x2 + ox
+                ok = 0 <= y < h and x1 >= 0 and x2 <= w
+                line_ok.append(ok)
+                if ok:
+                    segs.append(img[y, x1:x2, :3][:, ch])
+                else:
+                    segs.append(np.full((p.length, 3), -1024, dtype=np.int32))
+            d = np.concatenate(segs).astype(np.int32) - self._l_rgb
+            line_hits = (d * d).sum(axis=1) < self._l_tol
+
+        li = 0
+        for p, kind, ref in self._plan:
+            if kind == "color":
+                out[p.name] = bool(c_hit[ref]) if valid[self._c_idx[ref]] else None
+            elif kind == "range":
+                out[p.name] = bool(r_hit[ref]) if valid[self._r_idx[ref]] else None
+            elif kind == "palette":
+                result = p.default
+                for row in ref:
+                    label = next((lb for lb, k in row if c_hit[k]), None)
+                    if label is not None:
+                        result = label
+                        break
+                out[p.name] = result
+            else:
+                a, b = self._l_bounds[li], self._l_bounds[li + 1]
+                ok = line_ok[li]
+                li += 1
+                if not ok:
+                    out[p.name] = 0
+                    continue
+                matched = int(np.count_nonzero(line_hits[a:b]))
+                out[p.name] = matched if p.count == "match" else p.length - matched
+        return out
+
+
+def _empty(p, kind):
+    if kind == "palette":
+        return p.default
+    if kind == "line":
+        return 0
+    return None
+
+
+def leading(result: dict, names, value=False) -> int:
+    """How many of `names`, in order, have `value` before the first that does not.
+    An unread probe (None, e.g. out of bounds) ends the run."""
+    n = 0
+    for name in names:
+        v = result.get(name)
+        if v is None or v != value:
+            break
+        n += 1
+    return n
@@ -0,0 +1,152 @@
+import contextlib
+import itertools
+import threading
+import time
+
+import bot.base.log as logger
+
+log = logger.get_logger(__name__)
+
+# 多台设备共用同一套识别模型 / 模板库. 模型调用经过 FairGate 排队:
+#   1. 优先级高的请求先执行 (事件名这类卡住流程的读取 > 普通读取 > 后台读取)
+#   2. 同一优先级内按设备轮转, 最久没被服务的设备先执行, 单台设备连续请求不会饿死其他设备
+# 只有一台设备在跑时不排队 (只记指标), 单设备内的并行解析 (训练界面多线程读取) 不受 capacity 限制
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BACKGROUND = 2
+PRIORITY_NAMES = {PRIORITY_HIGH: "high", PRIORITY_NORMAL: "normal", PRIORITY_BACKGROUND: "background"}
+
+DEFAULT_DEVICE = "default"
+
+_local = threading.local()
+_active = set()
+_active_lock = threading.Lock()
+
+
+def bind_device(name):
+    _local.device = name
+
+
+def device_started(name):
+    with _active_lock:
+        _active.add(name or DEFAULT_DEVICE)
+
+
+def device_stopped(name):
+    with _active_lock:
+        _active.discard(name or DEFAULT_DEVICE)
+
+
+def active_devices() -> int:
+    with _active_lock:
+        return len(_active)
+
+
+def current_device():
+    return getattr(_local, "device", None) or DEFAULT_DEVICE
+
+
+def current_priority():
+    return getattr(_local, "priority", PRIORITY_NORMAL)
+
+
+@contextlib.contextmanager
+def priority(level):
+    prev = current_priority()
+    _local.priority = level
+    try:
+        yield
+    finally:
+        _local.priority = prev
+
+
+class DeviceMetrics:
+    def __init__(self):
+        self.requests = 0
+        self.cache_hits = 0
+        self.wait_ms = 0.0
+        self.max_wait_ms = 0.0
+        self.run_ms = 0.0
+        self.by_priority = {name: 0 for name in PRIORITY_NAMES.values()}
+
+    def as_dict(self):
+        n = self.requests
+        return {
+            "requests": n,
+            "cache_hits": self.cache_hits,
+            "avg_wait_ms": round(self.wait_ms / n, 1) if n else 0.0,
+            "max_wait_ms": round(self.max_wait_ms, 1),
+            "avg_run_ms": round(self.run_ms / n, 1) if n else 0.0,
+            "by_priority": dict(self.by_priority),
+        }
+
+
+class FairGate:
+    def __init__(self, capacity=1):
+        self.capacity = max(1, int(capacity))
+        self._cond = threading.Condition()
+        self._running = 0
+        self._waiting = []
+        self._seq = itertools.count()
+        self._last_served = {}
+        self._metrics = {}
+
+    def _metric(self, device):
+        m = self._metrics.get(device)
+        if m is None:
+            m = DeviceMetrics()
+            self._metrics[device] = m
+        return m
+
+    def _next(self):
+        return min(self._waiting, key=lambda t: (t[0], self._last_served.get(t[1], -1), t[2]))
+
+    def resize(self, capacity):
+        with self._cond:
+            self.capacity = max(1, int(capacity))
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def slot(self, device=None, level=None):
+        device = device or current_device()
+        level = current_priority() if level is None else level
+        gated = active_devices() > 1
+        started = time.perf_counter()
+        with self._cond:
+            if gated:
+                ticket = (level, device, next(self._seq))
+                self._waiting.append(ticket)
+                while self._running >= self.capacity or self._next() is not ticket:
+                    self._cond.wait()
+                self._waiting.remove(ticket)
+            self._running += 1
+            self._last_served[device] = next(self._seq)
+        waited = (time.perf_counter() - started) * 1000.0
+        ran = time.perf_counter()
+        try:
+            yield
+        finally:
+            run_ms = (time.perf_counter() - ran) * 1000.0
+            with self._cond:
+                self._running -= 1
+                m = self._metric(device)
+                m.requests += 1
+                m.wait_ms += waited
+                m.max_wait_ms = max(m.max_wait_ms, waited)
+                m.run_ms += run_ms
+                name = PRIORITY_NAMES.get(level, str(level))
+                m.by_priority[name] = m.by_priority.get(name, 0) + 1
+                self._cond.notify_all()
+
+    def cache_hit(self, device=None):
+        with self._cond:
+            self._metric(device or current_device()).cache_hits += 1
+
+    def stats(self):
+        with self._cond:
+            return {
+                "capacity": self.capacity,
+                "running": self._running,
+                "waiting": len(self._waiting),
+                "devices": {k: m.as_dict() for k, m in self._metrics.items()},
+            }
@@ -0,0 +1,164 @@
+import re
+import unicodedata
+from collections import Counter
+from difflib import SequenceMatcher
+
+import numpy as np
+
+# 模糊文本索引: 事件名 / 技能名 / 赛事名 / 弹窗标题共用.
+# 建索引时预先算好规范化文本、bigram 倒排表、词倒排表和定长字符矩阵;
+# 查询时对所有条目一次性向量化算出 bigram Jaccard / 词 Jaccard / 同长逐位相等率, 取最大值作为得分.
+TOP_K = 8
+MIN_SCORE = 0.85
+MIN_LEN_RATIO = 0.8
+ACCEPT_SCORE = 0.95
+
+
+def normalize_text(text) -> str:
+    if not text:
+        return ""
+    t = unicodedata.normalize('NFKD', str(text))
+    t = t.lower().strip()
+    t = re.sub(r"[^a-z0-9]+", " ", t)
+    return " ".join(t.split())
+
+
+def ngrams(text: str, n=2) -> Counter:
+    return Counter(text[i:i + n] for i in range(len(text) - n + 1)) if len(text) >= n else Counter()
+
+
+class TextIndex:
+    def __init__(self, keys, n=2, normalize=normalize_text):
+        self.n = n
+        self.normalize = normalize
+        self.keys = [str(k) for k in keys]
+        self.norm = [normalize(k) for k in self.keys]
+        self.exact = {}
+        for i, nk in enumerate(self.norm):
+            if nk:
+                self.exact.setdefault(nk, i)
+        size = len(self.keys)
+        self.lengths = np.array([len(nk) for nk in self.norm], dtype=np.int32)
+
+        grams = {}
+        tokens = {}
+        gram_total = np.zeros(size, dtype=np.float32)
+        token_count = np.zeros(size, dtype=np.float32)
+        for i, nk in enumerate(self.norm):
+            for g, c in ngrams(nk, n).items():
+                grams.setdefault(g, ([], []))
+                grams[g][0].append(i)
+                grams[g][1].append(c)
+                gram_total[i] += c
+            toks = set(nk.split())
+            token_count[i] = len(toks)
+            for t in toks:
+                tokens.setdefault(t, []).append(i)
+        self.grams = {g: (np.array(ix, dtype=np.int32), np.array(cs, dtype=np.float32)) for g, (ix, cs) in grams.items()}
+        self.tokens = {t: np.array(ix, dtype=np.int32) for t, ix in tokens.items()}
+        self.gram_total = gram_total
+        self.token_count = token_count
+
+        width = int(self.lengths.max()) if size else 0
+        self.chars = np.zeros((size, width), dtype=np.uint32)
+        for i, nk in enumerate(self.norm):
+            if nk:
+                self.chars[i, :len(nk)] = np.frombuffer(nk.encode("utf-32-le"), dtype=np.uint32)
+
+    def __len__(self):
+        return len(self.keys)
+
+    def scores(self, text):
+        """(normalized query, score, len_ratio) arrays over every key."""
+        q = self.normalize(text)
+        size = len(self.keys)
+        if not q or not size:
+            return q, np.zeros(size, dtype=np.float32), np.zeros(size, dtype=np.float32)
+        qlen = len(q)
+
+        qg = ngrams(q, self.n)
+        q_total = float(sum(qg.values()))
+        inter = np.zeros(size, dtype=np.float32)
+        for g, c in qg.items():
+            p = self.grams.get(g)
+            if p is not None:
+                inter[p[0]] += np.minimum(p[1], c)
+        if q_total:
+            union = q_total + self.gram_total - inter
+            score = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+        else:
+            score = (self.gram_total == 0).astype(np.float32)
+
+        qt = set(q.split())
+        tinter = np.zeros(size, dtype=np.float32)
+        for t in qt:
+            ix = self.tokens.get(t)
+            if ix is not None:
+                tinter[ix] += 1
+        score = np.maximum(score, tinter / np.maximum(len(qt) + self.token_count - tinter, 1))
+
+        same = self.lengths == qlen
+        if qlen <= self.chars.shape[1] and same.any():
+            qc = np.frombuffer(q.encode("utf-32-le"), dtype=np.uint32)
+            score[same] = np.maximum(score[same], (self.chars[same, :qlen] == qc).sum(axis=1) / qlen)
+
+        lengths = self.lengths.astype(np.float32)
+        len_ratio = np.minimum(qlen, lengths) / np.maximum(np.maximum(qlen, lengths), 1)
+
+        # 一方是另一方的子串时得分记为 1; 先用 bigram 交集数筛出可能的条目再逐个确认.
+        # 只给长度接近且和查询有共同词的条目记子串分, 否则 "Her" / "Gambler" 这类短名
+        # 会吃掉所有包含它的查询 (lookup 对满分不再看长度比)
+        maybe = (inter > 0) & (inter >= np.minimum(q_total, self.gram_total)) & (len_ratio >= MIN_LEN_RATIO)
+        shared = tinter > 0
+        if shared.any():
+            maybe &= shared
+        for i in np.nonzero(maybe)[0]:
+            nk = self.norm[i]
+            if nk and (q in nk or nk in q):
+                score[i] = 1.0
+        return q, score, len_ratio
+
+    def top(self, text, k=TOP_K):
+        """Best `k` keys as (key, score, len_ratio), highest score first, longer overlap breaking ties."""
+        q, score, len_ratio = self.scores(text)
+        if not q:
+            return []
+        i = self.exact.get(q)
+        head = [(self.keys[i], 1.0, 1.0)] if i is not None else []
+        order = np.lexsort((-len_ratio, -score))[:k]
+        return head + [(self.keys[j], float(score[j]), float(len_ratio[j])) for j in order if j != i and score[j] > 0]
+
+    def lookup(self, text, min_score=MIN_SCORE, min_len_ratio=MIN_LEN_RATIO, accept_score=ACCEPT_SCORE):
+        """(key, score) of the best match, or (None, score) when it is not close enough."""
+        best = self.top(text, 1)
+        if not best:
+            return None, 0.0
+        key, score, len_ratio = best[0]
+        if (score >= min_score and len_ratio >= min_len_ratio) or score >= accept_score:
+            return key, score
+        return None, score
+
+
+def best_ratio(target, refs, threshold=0, normalize=None):
+    """SequenceMatcher best match over `refs` with a ratio above `threshold`, first one winning ties.
+    real_quick_ratio / quick_ratio bound ratio from above, so refs that cannot beat the current best
+    skip the full comparison; an exact hit (ratio 1.0) ends the scan."""
+    result = ""
+    sm = SequenceMatcher(None, target)
+    nsm = SequenceMatcher(None, normalize(target)) if normalize is not None else None
+    for ref in refs:
+        if threshold >= 1:
+            break
+        sm.set_seq2(ref)
+        if sm.real_quick_ratio() > threshold and sm.quick_ratio() > threshold:
+            ratio = sm.ratio()
+        else:
+            ratio = 0.0
+        if nsm is not None and ratio < 1:
+            nsm.set_seq2(normalize(ref))
+            if nsm.real_quick_ratio() > threshold and nsm.quick_ratio() > threshold:
+                ratio = max(ratio, nsm.ratio())
+        if ratio > threshold:
+            result = ref
+            threshold = ratio
+    return result
@@ -5,13 +5,13 @@ import re
 from typing import Dict, Any
 import subprocess
 
-from fastapi import FastAPI, Path
+from fastapi import FastAPI, Path, Request
 from fastapi.middleware.cors import CORSMiddleware
 
 from bot.base.log import task_log_handler
 from bot.engine import ctrl as bot_ctrl
 from bot.server.protocol.task import *
-from starlette.responses import FileResponse, JSONResponse
+from starlette.responses import FileResponse, JSONResponse, Response
 from pydantic import BaseModel
 from typing import Optional
 
@@ -103,7 +103,7 @@ def cancel_manual_skill_notification():
 @server.post("/task")
 def add_task(req: AddTaskRequest):
     bot_ctrl.add_task(req.app_name, req.task_execute_mode, req.task_type, req.task_desc,
-                      req.cron_job_config, req.attachment_data)
+                      req.cron_job_config, req.attachment_data, req.device_name)
 
 
 @server.delete("/task")
@@ -136,6 +136,52 @@ def get_runtime_state():
         }
 
 
+@server.get("/api/template-bank")
+def get_template_bank_stats():
+    try:
+        from bot.base.template_bank import stats
+        return stats()
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@server.get("/api/diagnostics/memory")
+def get_memory_diagnostics(limit: int = 20):
+    try:
+        from bot.base.memory import stats, allocation_report
+        return {"gc": stats(), "allocations": allocation_report(limit)}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@server.post("/api/diagnostics/memory/trace")
+def set_memory_tracing(enable: bool = True):
+    try:
+        from bot.base.memory import start_tracing, stop_tracing
+        start_tracing() if enable else stop_tracing()
+        return {"status": "ok", "tracing": enable}
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@server.get("/api/input-latency")
+def get_input_latency():
+    try:
+        from bot.conn.input_channel import LATENCY
+        return LATENCY.stats()
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
+@server.get("/api/ocr-models")
+def get_ocr_models():
+    try:
+        from bot.recog.ocr import ocr_status
+        return ocr_status()
+    except Exception as e:
+        return {"status": "error", "message": str(e)}
+
+
 @server.post("/api/runtime-thresholds")
 def set_runtime_thresholds(req: RuntimeThresholds):
     try:
@@ -225,6 +271,19 @@ def get_pal_defaults():
     return read_pal_defaults()
 
 
+@server.get("/api/skills")
+def get_skills(request: Request):
+    from module.umamusume.asset.skill_data import skill_catalogue
+    catalogue = skill_catalogue()
+    etag = catalogue.etag if catalogue.etag.startswith('"') else '"' + catalogue.etag + '"'
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    # If-None-Match 可能是 "*", 逗号分隔的多个值, 或带 W/ 前缀的弱校验值
+    tags = [t.strip() for t in request.headers.get("if-none-match", "").split(",")]
+    if "*" in tags or etag in (t[2:] if t.startswith("W/") else t for t in tags):
+        return Response(status_code=304, headers=headers)
+    return Response(content=catalogue.payload, media_type="application/json", headers=headers)
+
+
 
 @server.get("/")
 async def get_index():
@@ -12,6 +12,7 @@ class AddTaskRequest(BaseModel):
     task_desc: str
     attachment_data: object
     cron_job_config: Union[object, None] = None
+    device_name: Union[str, None] = None
 
 
 class AddTaskResponse(BaseModel):
@@ -1,3 +1,9 @@
+import multiprocessing
+
+if __name__ == '__main__':
+    # 打包版 (PyInstaller) 里 OCR 子进程也是从这个入口启动的, 必须在其他导入和启动逻辑之前交给 multiprocessing
+    multiprocessing.freeze_support()
+
 import sys
 import threading
 import subprocess
@@ -447,10 +453,11 @@ def time_window_enforcer(device_id: str):
                     pass
                 u2_ctrl.INPUT_BLOCKED = True
                 KEEPALIVE_ACTIVE = False
-                try:
-                    _run_adb(["-s", device_id, "shell", "am", "force-stop", "com.cygames.umamusume"], timeout=5)
-                except Exception:
-                    pass
+                for dev in [slot.name for slot in scheduler.slots] or [device_id]:
+                    try:
+                        _run_adb(["-s", dev, "shell", "am", "force-stop", "com.cygames.umamusume"], timeout=5)
+                    except Exception:
+                        pass
                 paused = True
             next_start = next_window_start(now)
             total_sec = int((next_start - now).total_seconds()) + int(DAILY_WAIT_OFFSET)
@@ -472,7 +479,12 @@ if __name__ == '__main__':
     
     # Device selection
     selected_device = None
-    if os.environ.get("UAT_AUTORESTART", "0") == "1":
+    configured_devices = [d for d in u2_ctrl.device_list() if d]
+    if configured_devices:
+        # 配置了 bot.auto.adb.devices 时不再交互选择, 调度器为每台设备各开一个执行器
+        selected_device = u2_ctrl.U2AndroidConfig.load(u2_ctrl.CONFIG, configured_devices[0]).device_name
+        print(f"Using configured devices: {len(configured_devices)}")
+    elif os.environ.get("UAT_AUTORESTART", "0") == "1":
         try:
             with open("config.yaml", 'r', encoding='utf-8') as f:
                 cfg = yaml.safe_load(f)
@@ -507,8 +519,29 @@ if __name__ == '__main__':
     enforcer_thread.start()
 
 
+    try:
+        from bot.base.template_bank import preload, DEFAULT_CACHE_PATH
+        from config import CONFIG
+        preload(cache_path=DEFAULT_CACHE_PATH if CONFIG.bot.auto.template_cache else None)
+    except Exception as e:
+        log.warning(f"template preload failed: {e}")
+
+    try:
+        from bot.recog.ocr import init_ocr_if_needed
+        threading.Thread(target=init_ocr_if_needed, name="ocr-preload", daemon=True).start()
+    except Exception as e:
+        log.warning(f"ocr preload failed: {e}")
+
     from module.umamusume.script.cultivate_task.event.manifest import warmup_event_index
     warmup_event_index()
+    from module.umamusume.asset.skill_data import warmup_skill_catalogue
+    warmup_skill_catalogue()
+
+    try:
+        from bot.base.memory import configure_gc
+        configure_gc()
+    except Exception:
+        pass
 
     # Start the bot
     register_app(UmamusumeManifest)
@@ -1,54 +1,139 @@
 import csv
 import os.path
+from dataclasses import dataclass, field
+from typing import Optional
 
 from bot.base.resource import Template
+from bot.recog.text_index import TextIndex, normalize_text
 from module.umamusume.asset import REF_SUITABLE_RACE
 
-RACE_LIST: list[list] = []
 UMAMUSUME_RACE_TEMPLATE_PATH = "/umamusume/race"
+RACE_CSV_PATH = os.path.join('resource', 'umamusume', 'data', 'race.csv')
 
+# race.csv: time_period,race_id,period_name,race_name,,grade,venue,surface,distance,direction,going,category
+# 游戏内赛事列表的第二行: "Chukyo Turf 1600m (Mile) Left"
+CATEGORY_LABELS = {"medium": "Med"}
 
-def load_race_data():
-    for i in range(10000):
-        RACE_LIST.append([])
-    with open('resource/umamusume/data/race.csv', 'r', encoding="utf-8") as file:
-        reader = csv.reader(file)
-        for row in reader:
-            race_id = row[1]
-            path = "resource" + UMAMUSUME_RACE_TEMPLATE_PATH + "/" + str(race_id)+".png"
-            if os.path.isfile(path):
-                t = Template(str(race_id), UMAMUSUME_RACE_TEMPLATE_PATH)
-                race_name = row[3]
-                race_info = [race_id, race_name, t]
-                RACE_LIST[int(race_id)] = race_info
-    RACE_LIST[0] = [0, "suitable", REF_SUITABLE_RACE]
 
-load_race_data()
+@dataclass
+class RaceRecord:
+    race_id: int
+    period: int
+    period_name: str
+    name: str
+    grade: str = ""
+    venue: str = ""
+    surface: str = ""
+    distance: str = ""
+    direction: str = ""
+    going: str = ""
+    category: str = ""
+    display: str = ""
+    template: Optional[Template] = field(default=None, repr=False)
 
 
+def ingame_display(r: RaceRecord) -> str:
+    parts = []
+    if r.venue and r.surface and r.distance:
+        if r.distance.isdigit() and len(r.distance) == 4:
+            parts.append(f"{r.venue} {r.surface} {r.distance}m")
+        else:
+            parts.append(f"{r.venue} {r.surface} {r.distance}")
+    elif r.venue and r.surface:
+        parts.append(f"{r.venue} {r.surface}")
+    elif r.venue:
+        parts.append(r.venue)
+    label = r.category or r.going
+    if label:
+        parts.append(f"({CATEGORY_LABELS.get(label.lower(), label)})")
+    if r.direction:
+        parts.append(r.direction)
+    return " ".join(parts)
+
+
+class RaceCatalogue:
+    def __init__(self, path=RACE_CSV_PATH):
+        self.by_id: dict[int, RaceRecord] = {}
+        self.by_period: dict[int, list[int]] = {}
+        self.by_name: dict[str, list[int]] = {}
+        with open(path, 'r', encoding="utf-8") as file:
+            for row in csv.reader(file):
+                if len(row) < 4:
+                    continue
+                row = row + [""] * (12 - len(row))
+                r = RaceRecord(race_id=int(row[1]), period=int(row[0]), period_name=row[2], name=row[3],
+                               grade=row[5], venue=row[6], surface=row[7], distance=row[8], direction=row[9],
+                               going=row[10], category=row[11])
+                r.display = ingame_display(r)
+                if os.path.isfile("resource" + UMAMUSUME_RACE_TEMPLATE_PATH + "/" + str(r.race_id) + ".png"):
+                    r.template = Template(str(r.race_id), UMAMUSUME_RACE_TEMPLATE_PATH)
+                self.by_id[r.race_id] = r
+                self.by_period.setdefault(r.period, []).append(r.race_id)
+                self.by_name.setdefault(normalize_text(r.name), []).append(r.race_id)
+        # 名称和游戏内描述各建一个索引, 描述相同的赛事很多, 只用来在名称匹配不上时兜底
+        self._keys = {}
+        for r in self.by_id.values():
+            for text in (r.name, r.display):
+                if text:
+                    self._keys.setdefault(text, []).append(r.race_id)
+        self.name_index = TextIndex(sorted({r.name for r in self.by_id.values() if r.name}))
+        self.display_index = TextIndex(sorted({r.display for r in self.by_id.values() if r.display}))
+
+    def __contains__(self, race_id):
+        return race_id in self.by_id
+
+    def get(self, race_id) -> Optional[RaceRecord]:
+        return self.by_id.get(race_id)
+
+    def name(self, race_id) -> str:
+        if race_id == 0:
+            return "suitable"
+        r = self.by_id.get(race_id)
+        return r.name if r is not None else ""
+
+    def template(self, race_id) -> Optional[Template]:
+        if race_id == 0:
+            return REF_SUITABLE_RACE
+        r = self.by_id.get(race_id)
+        return r.template if r is not None else None
+
+    def display(self, race_id) -> str:
+        r = self.by_id.get(race_id)
+        if r is None:
+            return ""
+        return r.display or r.name
+
+    def races_for_period(self, period) -> list[int]:
+        return self.by_period.get(period, [])
+
+    def ids_by_name(self, name) -> list[int]:
+        return self.by_name.get(normalize_text(name), [])
+
+    def match(self, text, period=None):
+        """(race_id, score) for OCR text of a race-list entry, or (None, score). With `period`, races held
+        in that period win over same-named races of other periods."""
+        ids = self.ids_by_name(text)
+        if ids:
+            in_period = [i for i in ids if self.by_id[i].period == period]
+            return (in_period or ids)[0], 1.0
+        best_score = 0.0
+        for index in (self.name_index, self.display_index):
+            key, score = index.lookup(text)
+            best_score = max(best_score, score)
+            if key is None:
+                continue
+            ids = self._keys.get(key, [])
+            if period is not None:
+                in_period = [i for i in ids if self.by_id[i].period == period]
+                ids = in_period or ids
+            if ids:
+                return ids[0], score
+        return None, best_score
+
+
+RACES = RaceCatalogue()
 
-# Race period mapping for new Global Server system
-PERIOD_TO_RACES = {}
 
 def get_races_for_period(time_period: int) -> list[int]:
     """Get all race IDs available for a specific time period"""
-    return PERIOD_TO_RACES.get(time_period, [])
-
-def load_period_mapping():
-    """Load the time period to race ID mapping from race.csv"""
-    global PERIOD_TO_RACES
-    PERIOD_TO_RACES.clear()
-    
-    with open('resource/umamusume/data/race.csv', 'r', encoding="utf-8") as file:
-        reader = csv.reader(file)
-        for row in reader:
-            if len(row) >= 4:
-                time_period = int(row[0])
-                race_id = int(row[1])
-                
-                if time_period not in PERIOD_TO_RACES:
-                    PERIOD_TO_RACES[time_period] = []
-                
-                PERIOD_TO_RACES[time_period].append(race_id)
-
-load_period_mapping()
+    return RACES.races_for_period(time_period)
@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+import bot.base.log as logger
+import bot.base.pickle_cache as pickle_cache
+import bot.recog.text_index as text_index
+from bot.recog.text_index import TextIndex, normalize_text
+
+log = logger.get_logger(__name__)
+
+# 技能目录: skill_data.json 编译成一个快照 (技能记录 + 别名表 + 匹配索引 + 给前端的紧凑 JSON),
+# 以源文件内容和相关源码的哈希作为失效条件. 后端启动时加载一次, 前端通过 /api/skills 拿同一份数据.
+SNAPSHOT_VERSION = 1
+SKILL_DATA_PATH = os.path.join('resource', 'umamusume', 'data', 'skill_data.json')
+# 可选, {"OCR 误读": "技能名"}
+SKILL_ALIAS_PATH = os.path.join('resource', 'umamusume', 'data', 'skill_aliases.json')
+DEFAULT_SNAPSHOT_PATH = os.path.join("userdata", "skill_data.pkl")
+
+# 英文 OCR 常见的字形混淆, 技能名和识别结果折叠成同一形式后再比对
+OCR_FOLDS = (("rn", "m"), ("vv", "w"), ("cl", "d"), ("0", "o"), ("1", "l"), ("i", "l"), ("5", "s"))
+MEMO_SIZE = 512
+
+
+def fold_text(text) -> str:
+    t = normalize_text(text).replace(" ", "")
+    for a, b in OCR_FOLDS:
+        t = t.replace(a, b)
+    return t
+
+
+@dataclass
+class SkillRecord:
+    skill_id: str
+    name: str
+    tier: str = ""
+    skill_type: str = ""
+    rarity: str = ""
+    description: str = ""
+    distance: str = ""
+    strategy: str = ""
+    cost: Optional[int] = None
+    gold: str = ""
+    normal: str = ""
+    aliases: list = field(default_factory=list)
+
+
+def compact_record(r: SkillRecord) -> dict:
+    """The web UI's view of a skill, without empty fields."""
+    d = {"skill_id": r.skill_id, "name": r.name}
+    for k in ("tier", "skill_type", "rarity", "description", "distance", "strategy", "cost", "gold", "normal"):
+        v = getattr(r, k)
+        if v not in (None, ""):
+            d[k] = v
+    return d
+
+
+def _cost(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class SkillCatalogue:
+    def __init__(self, items, aliases=None):
+        self.by_name: dict[str, SkillRecord] = {}
+        by_id = {}
+        links = []
+        for item in items or []:
+            name = str(item.get('name') or "").strip()
+            if not name or name in self.by_name:
+                continue
+            r = SkillRecord(skill_id=str(item.get('skill_id') or name), name=name,
+                            tier=item.get('tier') or "", skill_type=item.get('skill_type') or "",
+                            rarity=item.get('rarity') or "", description=item.get('description') or "",
+                            distance=item.get('distance') or "", strategy=item.get('strategy') or "",
+                            cost=_cost(item.get('cost')), aliases=list(item.get('aliases') or []))
+            self.by_name[name] = r
+            by_id[r.skill_id] = r
+            # prerequisites 是普通版, prerequisite_of 是金色版
+            for base in item.get('prerequisites') or []:
+                links.append((str(base), name))
+            for gold in item.get('prerequisite_of') or []:
+                links.append((name, str(gold)))
+        for base, gold in links:
+            b = self.by_name.get(base) or by_id.get(base)
+            g = self.by_name.get(gold) or by_id.get(gold)
+            if b is not None and g is not None:
+                b.gold = g.name
+                g.normal = b.name
+
+        self.names = list(self.by_name.keys())
+        self.exact = {}
+        for name in self.names:
+            self.exact.setdefault(normalize_text(name), name)
+        self.aliases = {}
+        for r in self.by_name.values():
+            for a in r.aliases:
+                self.aliases.setdefault(normalize_text(a), r.name)
+        for a, name in (aliases or {}).items():
+            if name in self.by_name:
+                self.aliases[normalize_text(a)] = name
+        # 折叠后撞车的名字不进表, 交给模糊索引
+        self.folded = {}
+        clash = set()
+        for name in self.names:
+            f = fold_text(name)
+            if f in self.folded and self.folded[f] != name:
+                clash.add(f)
+            self.folded.setdefault(f, name)
+        for f in clash:
+            del self.folded[f]
+        self.index = TextIndex(self.names)
+
+        self.payload = json.dumps([compact_record(r) for r in self.by_name.values()],
+                                  ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        self.etag = '"' + hashlib.blake2b(self.payload, digest_size=16).hexdigest() + '"'
+        self._memo = {}
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_memo"] = {}
+        return state
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.by_name
+
+    def get(self, name) -> Optional[SkillRecord]:
+        return self.by_name.get(name)
+
+    def cost(self, name) -> Optional[int]:
+        r = self.by_name.get(name)
+        return r.cost if r is not None else None
+
+    def gold_of(self, name) -> str:
+        r = self.by_name.get(name)
+        return r.gold if r is not None else ""
+
+    def normal_of(self, name) -> str:
+        r = self.by_name.get(name)
+        return r.normal if r is not None else ""
+
+    def match(self, text):
+        """(name, score) for OCR text of a skill name, or (None, score). Exact name, alias table and
+        OCR-folded forms are checked before the fuzzy index."""
+        key = normalize_text(text)
+        if not key:
+            return None, 0.0
+        hit = self._memo.get(key)
+        if hit is not None:
+            return hit
+        name = self.exact.get(key) or self.aliases.get(key) or self.folded.get(fold_text(key))
+        result = (name, 1.0) if name else self.index.lookup(text)
+        if len(self._memo) >= MEMO_SIZE:
+            self._memo.clear()
+        self._memo[key] = result
+        return result
+
+
+def _read(path):
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except Exception:
+        return b""
+
+
+def compile_catalogue(raw: bytes, alias_raw: bytes) -> SkillCatalogue:
+    items = json.loads(raw.decode("utf-8"))
+    aliases = json.loads(alias_raw.decode("utf-8")) if alias_raw else {}
+    return SkillCatalogue(items, aliases)
+
+
+def load_catalogue(src=SKILL_DATA_PATH, alias_src=SKILL_ALIAS_PATH, dst=DEFAULT_SNAPSHOT_PATH) -> SkillCatalogue:
+    started = time.time()
+    raw = _read(src)
+    if not raw:
+        log.warning(f"skill data not found: {src}")
+        return SkillCatalogue([])
+    alias_raw = _read(alias_src)
+    # SkillCatalogue / TextIndex 实例整个被 pickle, 两者源码变了也要重建
+    key = pickle_cache.digest(SNAPSHOT_VERSION, raw, alias_raw, modules=(text_index, sys.modules[__name__]))
+    catalogue = pickle_cache.load(dst, key)
+    source = "snapshot"
+    if catalogue is None:
+        source = "json"
+        catalogue = compile_catalogue(raw, alias_raw)
+        pickle_cache.save(dst, key, catalogue)
+    log.info(f"skill catalogue: {len(catalogue)} skills from {source} in {(time.time() - started) * 1000:.0f} ms")
+    return catalogue
+
+
+_catalogue = None
+_catalogue_lock = threading.Lock()
+
+
+def skill_catalogue() -> SkillCatalogue:
+    global _catalogue
+    if _catalogue is not None:
+        return _catalogue
+    with _catalogue_lock:
+        if _catalogue is None:
+            try:
+                _catalogue = load_catalogue()
+            except Exception as e:
+                log.warning(f"skill catalogue load failed: {e}")
+                _catalogue = SkillCatalogue([])
+        return _catalogue
+
+
+def warmup_skill_catalogue():
+    try:
+        skill_catalogue()
+    except Exception:
+        pass
+
+
+if __name__ == "__main__":
+    # 经包名导入, 否则 pickle 里记录的是 __main__.SkillCatalogue
+    from module.umamusume.asset import skill_data
+    c = skill_data.load_catalogue()
+    print(f"{len(c)} skills, {len(c.payload)} bytes payload -> {DEFAULT_SNAPSHOT_PATH}")
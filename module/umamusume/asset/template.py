@@ -96,6 +96,13 @@ REF_HINT_LEVEL_4 = Template("hint_4", UMAMUSUME_REF_TEMPLATE_PATH)
 REF_HINT_LEVEL_5 = Template("hint_5", UMAMUSUME_REF_TEMPLATE_PATH)
 REF_HINT_LEVELS = [REF_HINT_LEVEL_1, REF_HINT_LEVEL_2, REF_HINT_LEVEL_3, REF_HINT_LEVEL_4, REF_HINT_LEVEL_5]
 
+REF_DIALOGUE_1 = Template("dialogue1", UMAMUSUME_REF_TEMPLATE_PATH)
+REF_DIALOGUE_2 = Template("dialogue2", UMAMUSUME_REF_TEMPLATE_PATH)
+REF_DIALOGUE_3 = Template("dialogue3", UMAMUSUME_REF_TEMPLATE_PATH)
+REF_DIALOGUE_4 = Template("dialogue4", UMAMUSUME_REF_TEMPLATE_PATH)
+REF_DIALOGUE_5 = Template("dialogue5", UMAMUSUME_REF_TEMPLATE_PATH)
+REF_DIALOGUE_LIST = [REF_DIALOGUE_1, REF_DIALOGUE_2, REF_DIALOGUE_3, REF_DIALOGUE_4, REF_DIALOGUE_5]
+
 UI_GOAL_ACHIEVED = Template("GOAL_ACHIEVED", UMAMUSUME_UI_TEMPLATE_PATH)
 UI_GOAL_FAILED = Template("GOAL_FAILED", UMAMUSUME_UI_TEMPLATE_PATH)
 UI_NEXT_GOAL = Template("NEXT_GOAL", UMAMUSUME_UI_TEMPLATE_PATH)
@@ -163,12 +170,12 @@ MOTIVATION_LIST = [REF_MOTIVATION_1, REF_MOTIVATION_2, REF_MOTIVATION_3, REF_MOT
 REF_CULTIVATE_SUPPORT_CARD_EMPTY = Template("CULTIVATE_SUPPORT_CARD_EMPTY", UMAMUSUME_REF_TEMPLATE_PATH)
 REF_FOLLOW_SUPPORT_CARD_DETECT_LABEL = Template("FOLLOW_SUPPORT_CARD_DETECT_LABEL", UMAMUSUME_REF_TEMPLATE_PATH)
 REF_BORROW_CARD = Template("borrow_card", UMAMUSUME_REF_TEMPLATE_PATH)
-REF_SELECTOR = Template("SELECTOR", UMAMUSUME_REF_TEMPLATE_PATH)
+REF_SELECTOR = Template("SELECTOR", UMAMUSUME_REF_TEMPLATE_PATH, ImageMatchConfig(pyramid_scale=2))
 REF_TRAIN_BTN = Template("train_btn", UMAMUSUME_REF_TEMPLATE_PATH)
 REF_RACE_LIST_GOAL_RACE = Template("RACE_LIST_GOAL_RACE", UMAMUSUME_REF_TEMPLATE_PATH)
 REF_RACE_LIST_URA_RACE = Template("RACE_LIST_URA_RACE", UMAMUSUME_REF_TEMPLATE_PATH)
-REF_RACE_LIST_DETECT_LABEL = Template("RACE_LIST_DETECT_LABEL", UMAMUSUME_REF_TEMPLATE_PATH)
-REF_SKILL_LIST_DETECT_LABEL = Template("SKILL_LIST_DETECT_LABEL", UMAMUSUME_REF_TEMPLATE_PATH)
+REF_RACE_LIST_DETECT_LABEL = Template("RACE_LIST_DETECT_LABEL", UMAMUSUME_REF_TEMPLATE_PATH, ImageMatchConfig(pyramid_scale=2))
+REF_SKILL_LIST_DETECT_LABEL = Template("SKILL_LIST_DETECT_LABEL", UMAMUSUME_REF_TEMPLATE_PATH, ImageMatchConfig(pyramid_scale=2))
 REF_SKILL_LEARNED = Template("SKILL_LEARNED", UMAMUSUME_REF_TEMPLATE_PATH)
 
 REF_DEBUT_RACE_NOT_WIN = Template("DEBUT_RACE_NOT_WIN", UMAMUSUME_REF_TEMPLATE_PATH)
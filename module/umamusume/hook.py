@@ -45,7 +45,7 @@ def tt_next_sequence(ctx: UmamusumeContext):
             ctx.ctrl.click(cx, cy, "team trials next 1")
         else:
             ctx.ctrl.click(354, 1077, "team trials next 1")
-        time.sleep(0.7)
+        ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.7)
         ctx.ctrl.click(508, 896, "team trials next 2")
     except Exception:
         pass
@@ -119,7 +119,7 @@ def apply_rules(ctx: UmamusumeContext, img_gray):
 
 
 def before_hook(ctx: UmamusumeContext):
-    img = cv2.cvtColor(ctx.current_screen, cv2.COLOR_BGR2GRAY)
+    img = ctx.frame.gray()
     if apply_rules(ctx, img):
         return
     if image_match(img, REF_HOME_GIFT).find_match:
@@ -127,7 +127,7 @@ def before_hook(ctx: UmamusumeContext):
             ctx.ctrl.click(0, 0, "team trials resume 1")
         else:
             ctx.ctrl.click(552, 1082, "resume 1")
-        time.sleep(1)
+        ctx.ctrl.wait_for(template=REF_RESUME_CAREER, timeout=1)
         img = cv2.cvtColor(ctx.ctrl.get_screen(), cv2.COLOR_BGR2GRAY)
         if image_match(img, REF_RESUME_CAREER).find_match:
             if ctx.task.task_execute_mode.name == "TASK_EXECUTE_MODE_TEAM_TRIALS":
@@ -174,7 +174,7 @@ def after_hook(ctx: UmamusumeContext):
                 pass
     except Exception:
         pass
-    img = cv2.cvtColor(ctx.current_screen, cv2.COLOR_BGR2GRAY)
+    img = ctx.frame.gray()
     try:
         from module.umamusume.define import ScenarioType
         scv = getattr(ctx.task.detail.scenario, 'value', ctx.task.detail.scenario)
@@ -228,17 +228,17 @@ def after_hook(ctx: UmamusumeContext):
                         sel = prs[idx]
                         if sel == 1:
                             ctx.ctrl.click(339, 278, 'select opp')
-                            time.sleep(0.5)
+                            ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.5)
                         elif sel == 2:
                             ctx.ctrl.click(335, 574, 'select opp')
-                            time.sleep(0.5)
+                            ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.5)
                         elif sel == 3:
                             ctx.ctrl.click(339, 830, 'select opp')
-                            time.sleep(0.5)
+                            ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.5)
                 except Exception:
                     pass
                 ctx.ctrl.click(355, 1082, 'select opp2')
-                time.sleep(0.5)
+                ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.5)
                 ctx.ctrl.click(522, 930, 'select opp2 cont')
                 time.sleep(0.17)
                 ctx.ctrl.click(522, 930, 'select opp2 cont')
@@ -257,7 +257,7 @@ def after_hook(ctx: UmamusumeContext):
                 return
             if image_match(img[7:31, 24:180], REF_TEAM_SHOWDOWN).find_match:
                 ctx.ctrl.click(354, 961, 'team showdown')
-                time.sleep(1)
+                ctx.ctrl.wait_for(changed=True, stable=True, timeout=1)
                 ctx.ctrl.click(522, 930, 'select opp2 cont')
                 return
             if image_match(img[1097:1124, 327:393], REF_NEXT).find_match:
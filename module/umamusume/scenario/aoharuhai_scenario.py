@@ -1,18 +1,21 @@
-import re
 import cv2
 import time
 
-from .base_scenario import BaseScenario
+from .base_scenario import BaseScenario, favor_probes
 from module.umamusume.asset import *
 from module.umamusume.define import ScenarioType, SupportCardFavorLevel, SupportCardType
 from module.umamusume.types import SupportCardInfo
-from bot.recog.image_matcher import image_match, compare_color_equal
+from bot.recog.image_matcher import image_match
 from module.umamusume.asset.template import *
-from bot.recog.ocr import ocr_line, find_similar_text, ocr_digits
+from bot.recog.digits import read_digits_batch
+from bot.recog.ocr import ocr_line, find_similar_text
 
 import bot.base.log as logger
 log = logger.get_logger(__name__)
 
+# 支援卡位置: x=550, y=177 起每张间隔 115; 羁绊条 (56,106)/(60,106)
+SUPPORT_CARD_FAVOR_PROBES = favor_probes(550, 177, 115, [(56, 106), (60, 106)])
+
 
 class AoharuHaiScenario(BaseScenario):
     def __init__(self):
@@ -32,65 +35,14 @@ class AoharuHaiScenario(BaseScenario):
 
     def parse_training_result(self, img: any) -> list[int]:
         # Use digital OCR to achieve higher accuracy
-        sub_img_speed_incr = img[800:830, 30:140]
-        sub_img_speed_incr = cv2.copyMakeBorder(sub_img_speed_incr, 20, 20, 20, 20, cv2.BORDER_CONSTANT, value=(255, 255, 255))
-        speed_incr_text = ocr_digits(sub_img_speed_incr)
-        speed_incr_text = re.sub("\\D", "", speed_incr_text)
-
-        sub_img_speed_incr_extra = img[760:800, 30:140]
-        sub_img_speed_incr_extra = cv2.copyMakeBorder(sub_img_speed_incr_extra, 20, 20, 20, 20, cv2.BORDER_CONSTANT, value=(255, 255, 255))
-        speed_incr_extra_text = ocr_digits(sub_img_speed_incr_extra)
-        speed_incr_extra_text = re.sub("\\D", "", speed_incr_extra_text)
-
-        sub_img_stamina_incr = img[800:830, 140:250]
-        sub_img_stamina_incr = cv2.copyMakeBorder(sub_img_stamina_incr, 20, 20, 20, 20, cv2.BORDER_CONSTANT, value=(255, 255, 255))
-        stamina_incr_text = ocr_digits(sub_img_stamina_incr)
-        stamina_incr_text = re.sub("\\D", "", stamina_incr_text)
-
-        sub_img_stamina_incr_extra = img[760:800, 140:250]
-        sub_img_stamina_incr_extra = cv2.copyMakeBorder(sub_img_stamina_incr_extra, 20, 20, 20, 20, cv2.BORDER_CONSTANT, value=(255, 255, 255))
-        stamina_incr_extra_text = ocr_digits(sub_img_stamina_incr_extra)
-        stamina_incr_extra_text = re.sub("\\D", "", stamina_incr_extra_text)
-
-        sub_img_power_incr = img[800:830, 250:360]
-        sub_img_power_incr = cv2.copyMakeBorder(sub_img_power_incr, 20, 20, 20, 20, cv2.BORDER_CONSTANT, value=(255, 255, 255))
-        power_incr_text = ocr_digits(sub_img_power_incr)
-        power_incr_text = re.sub("\\D", "", power_incr_text)
-
-        sub_img_power_incr_extra = img[760:800, 250:360]
-        sub_img_power_incr_extra = cv2.copyMakeBorder(sub_img_power_incr_extra, 20, 20, 20, 20, cv2.BORDER_CONSTANT, value=(255, 255, 255))
-        power_incr_extra_text = ocr_digits(sub_img_power_incr_extra)
-        power_incr_extra_text = re.sub("\\D", "", power_incr_extra_text)
-
-        sub_img_will_incr = img[800:830, 360:470]
-        sub_img_will_incr = cv2.copyMakeBorder(sub_img_will_incr, 20, 20, 20, 20, cv2.BORDER_CONSTANT, value=(255, 255, 255))
-        will_incr_text = ocr_digits(sub_img_will_incr)
-        will_incr_text = re.sub("\\D", "", will_incr_text)
-
-        sub_img_will_incr_extra = img[760:800, 360:470]
-        sub_img_will_incr_extra = cv2.copyMakeBorder(sub_img_will_incr_extra, 20, 20, 20, 20, cv2.BORDER_CONSTANT, value=(255, 255, 255))
-        will_incr_extra_text = ocr_digits(sub_img_will_incr_extra)
-        will_incr_extra_text = re.sub("\\D", "", will_incr_extra_text)
-
-        sub_img_intelligence_incr = img[800:830, 470:580]
-        sub_img_intelligence_incr = cv2.copyMakeBorder(sub_img_intelligence_incr, 20, 20, 20, 20, cv2.BORDER_CONSTANT, value=(255, 255, 255))
-        intelligence_incr_text = ocr_digits(sub_img_intelligence_incr)
-        intelligence_incr_text = re.sub("\\D", "", intelligence_incr_text)
-
-        sub_img_intelligence_incr_extra = img[760:800, 470:580]
-        sub_img_intelligence_incr_extra = cv2.copyMakeBorder(sub_img_intelligence_incr_extra, 20, 20, 20, 20, cv2.BORDER_CONSTANT, value=(255, 255, 255))
-        intelligence_incr_extra_text = ocr_digits(sub_img_intelligence_incr_extra)
-        intelligence_incr_extra_text = re.sub("\\D", "", intelligence_incr_extra_text)
-
-        sub_img_skill_point_incr = img[800:830, 588:695]
-        sub_img_skill_point_incr = cv2.copyMakeBorder(sub_img_skill_point_incr, 20, 20, 20, 20, cv2.BORDER_CONSTANT, value=(255, 255, 255))
-        skill_point_incr_text = ocr_digits(sub_img_skill_point_incr)
-        skill_point_incr_text = re.sub("\\D", "", skill_point_incr_text)
-
-        sub_img_skill_point_incr_extra = img[760:800, 588:695]
-        sub_img_skill_point_incr_extra = cv2.copyMakeBorder(sub_img_skill_point_incr_extra, 20, 20, 20, 20, cv2.BORDER_CONSTANT, value=(255, 255, 255))
-        skill_point_incr_extra_text = ocr_digits(sub_img_skill_point_incr_extra)
-        skill_point_incr_extra_text = re.sub("\\D", "", skill_point_incr_extra_text)
+        # 每列 (x1, x2): 速度 耐力 力量 根性 智力 技能点; 第一行是基础加成 (800~830), 第二行是额外加成 (760~800)
+        columns = [(30, 140), (140, 250), (250, 360), (360, 470), (470, 580), (588, 695)]
+        rois = [img[800:830, x1:x2] for x1, x2 in columns] + [img[760:800, x1:x2] for x1, x2 in columns]
+        texts = [r.text for r in read_digits_batch(rois, allow_empty=True)]
+        (speed_incr_text, stamina_incr_text, power_incr_text, will_incr_text, intelligence_incr_text,
+         skill_point_incr_text) = texts[:6]
+        (speed_incr_extra_text, stamina_incr_extra_text, power_incr_extra_text, will_incr_extra_text,
+         intelligence_incr_extra_text, skill_point_incr_extra_text) = texts[6:]
 
         speed_icr = (0 if speed_incr_text == "" else int(speed_incr_text)) + (0 if speed_incr_extra_text == "" else int(speed_incr_extra_text))
         stamina_incr = (0 if stamina_incr_text == "" else int(stamina_incr_text)) + (0 if stamina_incr_extra_text == "" else int(stamina_incr_extra_text))
@@ -107,7 +59,7 @@ class AoharuHaiScenario(BaseScenario):
         inc = 115
         support_card_list_info_result: list[SupportCardInfo] = []
 
-        
+        favor = SUPPORT_CARD_FAVOR_PROBES.evaluate(img)
         for i in range(5):
             roi = img[base_y:base_y + inc, base_x: base_x + 145]
             if roi is None or getattr(roi, 'size', 0) == 0:
@@ -151,20 +103,7 @@ class AoharuHaiScenario(BaseScenario):
                         pass
 
             # Favor detection (color)
-            roi_rgb = cv2.cvtColor(roi, cv2.COLOR_BGR2RGB)
-            favor_process_check_list = [roi_rgb[106, 56], roi_rgb[106, 60]]
-            support_card_favor_process = SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_UNKNOWN
-            for pix in favor_process_check_list:
-                if compare_color_equal(pix, [255, 235, 120]):
-                    support_card_favor_process = SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_4
-                elif compare_color_equal(pix, [255, 173, 30]):
-                    support_card_favor_process = SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_3
-                elif compare_color_equal(pix, [162, 230, 30]):
-                    support_card_favor_process = SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_2
-                elif (compare_color_equal(pix, [42, 192, 255]) or compare_color_equal(pix, [109, 108, 117])):
-                    support_card_favor_process = SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_1
-                if support_card_favor_process != SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_UNKNOWN:
-                    break
+            support_card_favor_process = favor[f"favor_{i}"]
 
             # Support card type (template match for type icon only)
             support_card_type = SupportCardType.SUPPORT_CARD_TYPE_UNKNOWN
@@ -1,7 +1,26 @@
 from abc import ABC, abstractmethod
-from module.umamusume.define import ScenarioType
+from bot.recog.pixel_probe import PaletteProbe, ProbeSet
+from module.umamusume.define import ScenarioType, SupportCardFavorLevel
 from module.umamusume.types import SupportCardInfo
 
+# 羁绊条颜色 (RGB), 顺序即判定优先级
+FAVOR_PALETTE = [
+    (SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_4, (255, 235, 120)),
+    (SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_3, (255, 173, 30)),
+    (SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_2, (162, 230, 30)),
+    (SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_1, (42, 192, 255)),
+    (SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_1, (109, 108, 117)),
+]
+
+
+def favor_probes(base_x, base_y, inc, points, count=5, extra=()):
+    """One favor PaletteProbe "favor_<i>" per support card slot; `points` are (x, y) inside a slot."""
+    probes = [PaletteProbe(f"favor_{i}", [(base_x + x, base_y + i * inc + y) for x, y in points], FAVOR_PALETTE,
+                           default=SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_UNKNOWN)
+              for i in range(count)]
+    return ProbeSet(probes + list(extra))
+
+
 class BaseScenario(ABC):
     def __init__(self):
         super().__init__()
@@ -1,16 +1,22 @@
 import re
 import cv2
 
-from .base_scenario import BaseScenario
+from .base_scenario import BaseScenario, favor_probes
 from module.umamusume.asset import *
 from module.umamusume.define import ScenarioType, SupportCardFavorLevel, SupportCardType
 from module.umamusume.types import SupportCardInfo
-from bot.recog.image_matcher import image_match, compare_color_equal
+from bot.recog.image_matcher import image_match
+from bot.recog.pixel_probe import PixelProbe
 from bot.recog.ocr import ocr_line, find_similar_text, ocr_digits
 
 import bot.base.log as logger
 log = logger.get_logger(__name__)
 
+# 支援卡位置: x=590, y=190 起每张间隔 120; 羁绊条 (16,95)/(20,95), 事件提示 (83,5)
+SUPPORT_CARD_PROBES = favor_probes(590, 190, 120, [(16, 95), (20, 95)], extra=[
+    PixelProbe(f"event_{i}", 590 + 83, 190 + i * 120 + 5, lo=(250, 55, 115), hi=(None, 90, 150)) for i in range(5)
+])
+
 
 class URAScenario(BaseScenario):
     def __init__(self):
@@ -70,36 +76,16 @@ class URAScenario(BaseScenario):
         w, h = 105, 110
         support_card_list_info_result: list[SupportCardInfo] = []
 
+        probes = SUPPORT_CARD_PROBES.evaluate(img)
         for i in range(5):
             support_card_icon = img[base_y:base_y + h, base_x: base_x + w]
 
-            # Check favor level
-            support_card_icon = cv2.cvtColor(support_card_icon, cv2.COLOR_BGR2RGB)
-            favor_process_check_list = [support_card_icon[95, 16], support_card_icon[95, 20]]
-            support_card_favor_process = SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_UNKNOWN
-            for support_card_favor_process_pos in favor_process_check_list:
-                if compare_color_equal(support_card_favor_process_pos, [255, 235, 120]):
-                    support_card_favor_process = SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_4
-                elif compare_color_equal(support_card_favor_process_pos, [255, 173, 30]):
-                    support_card_favor_process = SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_3
-                elif compare_color_equal(support_card_favor_process_pos, [162, 230, 30]):
-                    support_card_favor_process = SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_2
-                elif compare_color_equal(support_card_favor_process_pos, [42, 192, 255]) or compare_color_equal(support_card_favor_process_pos, [109, 108, 117]):
-                    support_card_favor_process = SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_1
-                if support_card_favor_process != SupportCardFavorLevel.SUPPORT_CARD_FAVOR_LEVEL_UNKNOWN:
-                    break
-
-            # Check if there's an event
-            support_card_event_pos = support_card_icon[5, 83]
-            support_card_event_available = False
-            if (support_card_event_pos[0] >= 250
-                and 55 <= support_card_event_pos[1] <= 90
-                and 115 <= support_card_event_pos[2] <= 150):
-                support_card_event_available = True
+            support_card_favor_process = probes[f"favor_{i}"]
+            support_card_event_available = bool(probes[f"event_{i}"])
 
             # Check support card type
             support_card_type = SupportCardType.SUPPORT_CARD_TYPE_UNKNOWN
-            support_card_icon = cv2.cvtColor(support_card_icon, cv2.COLOR_RGB2GRAY)
+            support_card_icon = cv2.cvtColor(support_card_icon, cv2.COLOR_BGR2GRAY)
             match_center = None
             for ref, t in (
                 (REF_SUPPORT_CARD_TYPE_SPEED,SupportCardType.SUPPORT_CARD_TYPE_SPEED),
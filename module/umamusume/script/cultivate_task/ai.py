@@ -53,7 +53,7 @@ def get_operation(ctx: UmamusumeContext) -> TurnOperation | None:
     turn_operation = TurnOperation()
     if not ctx.cultivate_detail.debut_race_win:
         turn_operation.turn_operation_type = TurnOperationType.TURN_OPERATION_TYPE_RACE
-    state = fetch_state()
+    state = fetch_state(ctx=ctx)
     energy = state.get("energy", 0)
     mood_raw = state.get("mood")
     mood_val = mood_raw if mood_raw is not None else 4
@@ -129,7 +129,7 @@ def get_operation(ctx: UmamusumeContext) -> TurnOperation | None:
 
     cached_screen = None
     if ctx.current_screen is not None:
-        cached_screen = cv2.cvtColor(ctx.current_screen, cv2.COLOR_BGR2GRAY)
+        cached_screen = ctx.frame.gray()
 
     turn_info = ctx.cultivate_detail.turn_info
     date = turn_info.date
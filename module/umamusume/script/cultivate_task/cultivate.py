@@ -26,9 +26,8 @@ def should_use_pal_outing_simple(ctx: UmamusumeContext):
     if img is None:
         return False
     
-    img_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     from module.umamusume.asset.template import UI_RECREATION_FRIEND_NOTIFICATION
-    result = image_match(img_gray, UI_RECREATION_FRIEND_NOTIFICATION)
+    result = ctx.frame.match(UI_RECREATION_FRIEND_NOTIFICATION)
     if not result.find_match:
         return False
     
@@ -45,7 +44,7 @@ def should_use_pal_outing_simple(ctx: UmamusumeContext):
     energy_threshold = thresholds[1]
     
     from bot.conn.fetch import fetch_state
-    state = fetch_state()
+    state = fetch_state(ctx=ctx)
     current_energy = state.get("energy", 0)
     current_mood_raw = state.get("mood")
     current_mood = current_mood_raw if current_mood_raw is not None else 4
@@ -109,9 +108,8 @@ def script_cultivate_main_menu(ctx: UmamusumeContext):
             return
         
         if ctx.cultivate_detail.prioritize_recreation:
-            img_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
             from module.umamusume.asset.template import UI_RECREATION_FRIEND_NOTIFICATION
-            result = image_match(img_gray, UI_RECREATION_FRIEND_NOTIFICATION)
+            result = ctx.frame.match(UI_RECREATION_FRIEND_NOTIFICATION)
             log.info(f"🔍 Recreation friend notification detection: {result.find_match}")
             
             need_detection = False
@@ -132,7 +130,7 @@ def script_cultivate_main_menu(ctx: UmamusumeContext):
             if need_detection:
                 log.info("🔍 Opening recreation menu to detect stage")
                 ctx.ctrl.click_by_point(CULTIVATE_TRIP)
-                time.sleep(0.5)
+                ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.5)
                 img = ctx.ctrl.get_screen()
                 
                 pal_name = ctx.cultivate_detail.pal_name
@@ -172,7 +170,7 @@ def script_cultivate_main_menu(ctx: UmamusumeContext):
                     log.error("boi what the hell")
 
                 ctx.ctrl.click(5, 5)
-                time.sleep(0.3)
+                ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.3)
                 ctx.cultivate_detail.turn_info.parse_main_menu_finish = False
                 return
                 
@@ -230,7 +228,7 @@ def script_cultivate_main_menu(ctx: UmamusumeContext):
 
     if not ctx.cultivate_detail.turn_info.parse_train_info_finish:
         from bot.conn.fetch import read_energy
-        energy = read_energy()
+        energy = read_energy(ctx.current_screen)
         if energy == 0:
             time.sleep(0.37)
             energy = read_energy()
@@ -262,7 +260,7 @@ def script_cultivate_main_menu(ctx: UmamusumeContext):
                 ctx.ctrl.click_by_point(CULTIVATE_MEDIC_SUMMER)
             else:
                 ctx.ctrl.click_by_point(CULTIVATE_MEDIC)
-            time.sleep(0.5)
+            ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.5)
             img = ctx.ctrl.get_screen()
             img_rgb = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
             is_summer = (36 < ctx.cultivate_detail.turn_info.date <= 40 or 60 < ctx.cultivate_detail.turn_info.date <= 64)
@@ -364,9 +362,9 @@ def script_cultivate_training_select(ctx: UmamusumeContext):
         if turn_op.turn_operation_type == TurnOperationType.TURN_OPERATION_TYPE_TRAINING:
             training_type = turn_op.training_type
             ctx.ctrl.click_by_point(TRAINING_POINT_LIST[training_type.value - 1])
-            time.sleep(0.35)
+            ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.35)
             ctx.ctrl.click_by_point(TRAINING_POINT_LIST[training_type.value - 1])
-            time.sleep(1.5)
+            ctx.ctrl.wait_for(changed=True, stable=True, timeout=1.5)
             return
 
         else:
@@ -374,7 +372,7 @@ def script_cultivate_training_select(ctx: UmamusumeContext):
             return
 
     from bot.conn.fetch import read_energy
-    energy = read_energy()
+    energy = read_energy(ctx.current_screen)
     if energy == 0:
         time.sleep(0.37)
         energy = read_energy()
@@ -391,6 +389,8 @@ def script_cultivate_training_select(ctx: UmamusumeContext):
         return
 
     if not ctx.cultivate_detail.turn_info.parse_train_info_finish:
+        from bot.conn.fetch import bound
+
         def _parse_training_in_thread(ctx, img, train_type):
             """Helper function to run parsing in a separate thread."""
             parse_training_result(ctx, img, train_type)
@@ -444,7 +444,7 @@ def script_cultivate_training_select(ctx: UmamusumeContext):
         viewed = train_type.value
 
         if extra_weight[viewed - 1] > -1:
-            thread = threading.Thread(target=_parse_training_in_thread, args=(ctx, img, train_type))
+            thread = threading.Thread(target=bound(_parse_training_in_thread), args=(ctx, img, train_type))
             threads.append(thread)
             time.sleep(0.1)
             thread.start()
@@ -461,7 +461,7 @@ def script_cultivate_training_select(ctx: UmamusumeContext):
                     while parse_train_type(ctx, img) != TrainingType(i + 1) and retry < max_retry:
                         if retry > 2:
                             ctx.ctrl.click_by_point(TRAINING_POINT_LIST[i])
-                        time.sleep(0.2)
+                        ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.2)
                         img = ctx.ctrl.get_screen()
                         retry += 1
                     if retry == max_retry:
@@ -469,7 +469,7 @@ def script_cultivate_training_select(ctx: UmamusumeContext):
                         _clear_training(ctx, TrainingType(i + 1))
                         continue
 
-                    thread = threading.Thread(target=_parse_training_in_thread, args=(ctx, img, TrainingType(i + 1)))
+                    thread = threading.Thread(target=bound(_parse_training_in_thread), args=(ctx, img, TrainingType(i + 1)))
                     threads.append(thread)
                     time.sleep(0.1)
                     thread.start()
@@ -551,7 +551,7 @@ def script_cultivate_training_select(ctx: UmamusumeContext):
 
         from bot.conn.fetch import read_energy
         try:
-            current_energy = int(read_energy())
+            current_energy = int(read_energy(ctx.current_screen))
             if current_energy == 0:
                 time.sleep(0.37)
                 current_energy = int(read_energy())
@@ -680,7 +680,7 @@ def script_cultivate_training_select(ctx: UmamusumeContext):
                 is_aoharu = False
             if is_aoharu and idx == 4 and se_w != 0.0 and spirit_counts[idx] > 0:
                 try:
-                    energy = int(read_energy())
+                    energy = int(read_energy(ctx.current_screen))
                     if energy == 0:
                         time.sleep(0.37)
                         energy = int(read_energy())
@@ -877,7 +877,7 @@ def script_cultivate_training_select(ctx: UmamusumeContext):
                     thresholds = pal_data[stage - 1]
                     mood_threshold, energy_threshold, score_threshold = thresholds
                     
-                    state = fetch_state()
+                    state = fetch_state(ctx=ctx)
                     current_energy = state.get("energy", 0)
                     current_mood_raw = state.get("mood")
                     current_mood = current_mood_raw if current_mood_raw is not None else 4
@@ -907,9 +907,9 @@ def script_cultivate_training_select(ctx: UmamusumeContext):
             op.training_type = local_training_type
         
         ctx.ctrl.click_by_point(TRAINING_POINT_LIST[op.training_type.value - 1])
-        time.sleep(0.35)
+        ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.35)
         ctx.ctrl.click_by_point(TRAINING_POINT_LIST[op.training_type.value - 1])
-        time.sleep(1.5)
+        ctx.ctrl.wait_for(changed=True, stable=True, timeout=1.5)
         return
     
     ctx.ctrl.click_by_point(RETURN_TO_CULTIVATE_MAIN_MENU)
@@ -937,7 +937,7 @@ def script_scenario_select(ctx: UmamusumeContext):
 
         log.debug(f"Scenario does not match, checking next scenario")
         ctx.ctrl.swipe(x1=400, y1=600, x2=500, y2=600, duration=300, name="swipe right")
-        time.sleep(1)
+        ctx.ctrl.wait_for(changed=True, stable=True, timeout=1)
 
     log.error(f"Could not find specified scenario")
     ctx.task.end_task(TaskStatus.TASK_STATUS_FAILED, EndTaskReason.SCENARIO_NOT_FOUND)
@@ -955,11 +955,11 @@ def script_extend_umamusume_select(ctx: UmamusumeContext):
     except Exception:
         pass
     ctx.ctrl.click_by_point(TO_CULTIVATE_PREPARE_AUTO_SELECT)
-    time.sleep(1)
+    ctx.ctrl.wait_for(changed=True, stable=True, timeout=1)
     ctx.ctrl.click_by_point(TO_CULTIVATE_PREPARE_INCLUDE_GUEST)
-    time.sleep(1)
+    ctx.ctrl.wait_for(changed=True, stable=True, timeout=1)
     ctx.ctrl.click_by_point(TO_CULTIVATE_PREPARE_CONFIRM)
-    time.sleep(1)
+    ctx.ctrl.wait_for(changed=True, stable=True, timeout=1)
     ctx.ctrl.click_by_point(TO_CULTIVATE_PREPARE_NEXT)
 
 
@@ -991,7 +991,7 @@ def script_follow_support_card_select(ctx: UmamusumeContext):
             except Exception:
                 pass
             ctx.ctrl.swipe(x1=350, y1=1000, x2=350, y2=400, duration=600, name="scroll down list")
-            time.sleep(0.5)
+            ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.5)
             img = ctx.ctrl.get_screen()
         for __ in range(3):
             if find_support_card(ctx, img):
@@ -1009,10 +1009,10 @@ def script_follow_support_card_select(ctx: UmamusumeContext):
             except Exception:
                 pass
             ctx.ctrl.swipe(x1=350, y1=400, x2=350, y2=1000, duration=600, name="scroll up list")
-            time.sleep(0.5)
+            ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.5)
             img = ctx.ctrl.get_screen()
         ctx.ctrl.click_by_point(FOLLOW_SUPPORT_CARD_SELECT_REFRESH)
-        time.sleep(1.2)
+        ctx.ctrl.wait_for(changed=True, stable=True, timeout=1.2)
     ctx.ctrl.click_by_point(FOLLOW_SUPPORT_CARD_SELECT_REFRESH)
 
 
@@ -1133,8 +1133,8 @@ def script_cultivate_event(ctx: UmamusumeContext):
         ctx.cultivate_detail.event_cooldown_until = time.time() + 2.5
         return
     try:
-        tpl = Template(f"dialogue{choice_index}", UMAMUSUME_REF_TEMPLATE_PATH)
-    except:
+        tpl = REF_DIALOGUE_LIST[choice_index - 1]
+    except Exception:
         tpl = None
     img_gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
     x1, y1, x2, y2 = 24, 316, 696, 936
@@ -1266,7 +1266,7 @@ def script_cultivate_race_list(ctx: UmamusumeContext):
                 if race_id in [2381, 2382, 2385, 2386, 2387] or race_id == 0:
                     log.info("🏆 Detected URA race operation - clicking race button directly")
                     ctx.ctrl.click(319, 1082, "URA Race Button")
-                    time.sleep(1)
+                    ctx.ctrl.wait_for(changed=True, stable=True, timeout=1)
                     return
         if ctx.cultivate_detail.turn_info.turn_operation.turn_operation_type == TurnOperationType.TURN_OPERATION_TYPE_RACE:
             swiped = False
@@ -1311,7 +1311,7 @@ def script_cultivate_race_list(ctx: UmamusumeContext):
                         delattr(ti, 'race_search_id')
                     time.sleep(1)
                     ctx.ctrl.click_by_point(CULTIVATE_GOAL_RACE_INTER_1)
-                    time.sleep(1)
+                    ctx.ctrl.wait_for(changed=True, stable=True, timeout=1)
                     return
                 img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
                 if not compare_color_equal(img[1006, 701], [211, 209, 219]):
@@ -1330,7 +1330,7 @@ def script_cultivate_race_list(ctx: UmamusumeContext):
                     ctx.ctrl.click_by_point(RETURN_TO_CULTIVATE_MAIN_MENU)
                     return
                 ctx.ctrl.swipe(x1=20, y1=1000, x2=20, y2=850, duration=1000, name="")
-                time.sleep(1)
+                ctx.ctrl.wait_for(changed=True, stable=True, timeout=1)
                 img = ctx.ctrl.get_screen()
         else:
             ctx.ctrl.click_by_point(RETURN_TO_CULTIVATE_MAIN_MENU)
@@ -1604,7 +1604,7 @@ def script_cultivate_learn_skill(ctx: UmamusumeContext):
         if not compare_color_equal(img[1006, 701], [211, 209, 219]):
             break
         ctx.ctrl.swipe(x1=23, y1=1000, x2=23, y2=636, duration=1000, name="")
-        time.sleep(1)
+        ctx.ctrl.wait_for(changed=True, stable=True, timeout=1)
         
         # Additional safety check after each swipe
         if (ctx.task.detail.manual_purchase_at_end and 
@@ -1721,7 +1721,7 @@ def script_cultivate_learn_skill(ctx: UmamusumeContext):
 
     # Move up to align
     ctx.ctrl.swipe(x1=23, y1=950, x2=23, y2=968, duration=100, name="")
-    time.sleep(1)
+    ctx.ctrl.wait_for(changed=True, stable=True, timeout=1)
 
     # Remove already learned skills
     for skill in target_skill_list_raw:
@@ -1785,7 +1785,7 @@ def script_cultivate_learn_skill(ctx: UmamusumeContext):
             log.debug("🔍 Reached end of skill list page")
             break
         ctx.ctrl.swipe(x1=23, y1=636, x2=23, y2=1000, duration=1000, name="")
-        time.sleep(1)
+        ctx.ctrl.wait_for(changed=True, stable=True, timeout=1)
 
     log.debug("Skills to learn: " + str(ctx.cultivate_detail.learn_skill_list))
     log.debug("Skills learned: " + str([skill['skill_name'] for skill in skill_list if not skill['available']]))
@@ -1,12 +1,7 @@
 from typing import Union
 import requests
-import re
 from urllib.parse import quote
 import time
-import json
-import os
-from collections import Counter
-import unicodedata
 
 from bot.conn.fetch import *
 
@@ -18,6 +13,8 @@ except ImportError:
     BEAUTIFULSOUP_AVAILABLE = False
 
 from bot.recog.ocr import find_similar_text
+from bot.recog.text_index import TextIndex
+from module.umamusume.script.cultivate_task.event.snapshot import load_snapshot
 from module.umamusume.context import UmamusumeContext
 from module.umamusume.script.cultivate_task.event.scenario_event import *
 import bot.base.log as logger
@@ -43,30 +40,25 @@ event_name_list: list[str] = [*event_map]
 
 # Global variable to store the events database
 _events_database = None
+# (事件库, 索引), 事件库重新加载后重建
+_event_index = None
+# 事件选项收益矩阵 (EventStats), 随快照一起加载
+_event_stats = None
 
 def load_events_database():
-    """Load the events database from the JSON file"""
-    global _events_database
-    
+    """Load the events database from the compiled snapshot of event_data.json"""
+    global _events_database, _event_index, _event_stats
+
     if _events_database is not None:
         return _events_database
-    
+
     try:
-        # Try to load from the JSON file in resource/umamusume/data folder, robustly
-        base_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', '..'))
-        candidates = [
-            os.path.join(base_dir, 'resource', 'umamusume', 'data', 'event_data.json'),
-            os.path.join(os.getcwd(), 'resource', 'umamusume', 'data', 'event_data.json'),
-        ]
-        events_dict = None
-        for json_path in candidates:
-            if os.path.exists(json_path):
-                log.info("📊 Loading events database from event_data.json...")
-                with open(json_path, 'r', encoding='utf-8') as f:
-                    events_dict = json.load(f)
-                break
-        if events_dict is not None:
+        data = load_snapshot()
+        if data is not None:
+            events_dict = data["events"]
             _events_database = events_dict
+            _event_index = (events_dict, data["index"])
+            _event_stats = data.get("stats")
             count = len(events_dict)
             log.info(f"✅ Loaded {count} events from local database")
             try:
@@ -77,7 +69,7 @@ def load_events_database():
         else:
             log.warning("⚠️ Events JSON file not found, will use web scraping fallback")
             return {}
-            
+
     except Exception as e:
         log.error(f"❌ Error loading events database: {e}")
         return {}
@@ -94,169 +86,60 @@ def get_local_event_choice(ctx: UmamusumeContext, event_name: str) -> Union[int,
     # Try exact match only
     if event_name in events_db:
         log.info(f"✅ Found event '{event_name}' in local database")
-        return calculate_optimal_choice_from_db(ctx, events_db[event_name])
-    
-    def normalizeString(text: str) -> str:
-        if not text:
-            return ""
-        t = unicodedata.normalize('NFKD', str(text))
-        t = t.lower().strip()
-        t = re.sub(r"[^a-z0-9]+", " ", t)
-        t = " ".join(t.split())
-        return t
-
-    def positionalRatio(left: str, right: str) -> float:
-        length_left = len(left)
-        if length_left == 0:
-            return 0.0
-        match_count = 0
-        for position in range(length_left):
-            if left[position] == right[position]:
-                match_count += 1
-        return match_count / length_left
-
-    def build_bigrams(text: str) -> Counter:
-        return Counter(text[i:i+2] for i in range(len(text) - 1)) if len(text) >= 2 else Counter()
-
-    def jaccard_counter_ratio(a: Counter, b: Counter) -> float:
-        if not a and not b:
-            return 1.0
-        inter = sum((a & b).values())
-        union = sum((a | b).values())
-        return inter / union if union else 0.0
-
-    query = normalizeString(event_name)
-    query_length = len(query)
-    query_bigrams = build_bigrams(query)
-    query_tokens = set(query.split())
-    norm_map = getattr(get_local_event_choice, "cacheNormalizedKeyMap", None)
-    if norm_map and query in norm_map:
-        key = norm_map[query]
+        return calculate_optimal_choice_from_db(ctx, events_db[event_name], event_name)
+
+    key, _ = event_index().lookup(event_name)
+    if key is not None:
         log.info(f"detected='{event_name}' matched='{key}'")
-        return calculate_optimal_choice_from_db(ctx, events_db[key])
-
-    index_cache = getattr(get_local_event_choice, "cacheIndex", None)
-    source_cache = getattr(get_local_event_choice, "cacheSource", None)
-    if index_cache is None or source_cache is not events_db:
-        cache_list = []
-        token_index = {}
-        norm_map = {}
-        for original_key in events_db.keys():
-            normalized_key = normalizeString(original_key)
-            tokens = set(normalized_key.split())
-            entry = (original_key, normalized_key, len(normalized_key), build_bigrams(normalized_key), tokens)
-            cache_list.append(entry)
-            norm_map[normalized_key] = original_key
-            idx = len(cache_list) - 1
-            for tok in tokens:
-                if tok:
-                    token_index.setdefault(tok, []).append(idx)
-        setattr(get_local_event_choice, "cacheIndex", cache_list)
-        setattr(get_local_event_choice, "cacheSource", events_db)
-        setattr(get_local_event_choice, "cacheTokenIndex", token_index)
-        setattr(get_local_event_choice, "cacheNormalizedKeyMap", norm_map)
-        index_cache = cache_list
-
-    best_key = None
-    best_score = 0.0
-    best_len_ratio = 0.0
-    token_index = getattr(get_local_event_choice, "cacheTokenIndex", None)
-    candidate_indices = set()
-    for tok in query_tokens:
-        if token_index and tok in token_index:
-            for idx in token_index[tok]:
-                candidate_indices.add(idx)
-    if not candidate_indices:
-        iterable = range(len(index_cache))
-    else:
-        iterable = candidate_indices
-    for idx in iterable:
-        original_key, normalized_key, normalized_length, normalized_bigrams, normalized_tokens = index_cache[idx]
-        if not query or not normalized_key:
-            continue
-        if query in normalized_key or normalized_key in query:
-            best_key = original_key
-            best_score = 1.0
-            best_len_ratio = min(query_length, normalized_length) / max(query_length, normalized_length) if max(query_length, normalized_length) else 1.0
-            break
-        token_inter = len(query_tokens & normalized_tokens)
-        token_union = len(query_tokens | normalized_tokens) or 1
-        token_score = token_inter / token_union
-        bigram_score = jaccard_counter_ratio(query_bigrams, normalized_bigrams)
-        if normalized_length == query_length:
-            positional = positionalRatio(query, normalized_key)
-            score = max(bigram_score, token_score, positional)
-            len_ratio = 1.0
-        else:
-            score = max(bigram_score, token_score)
-            len_ratio = min(query_length, normalized_length) / max(query_length, normalized_length)
-        if score > best_score or (score == best_score and len_ratio > best_len_ratio):
-            best_score = score
-            best_len_ratio = len_ratio
-            best_key = original_key
-
-    if best_key is not None and ((best_score >= 0.85 and best_len_ratio >= 0.8) or best_score >= 0.95):
-        log.info(f"detected='{event_name}' matched='{best_key}'")
-        return calculate_optimal_choice_from_db(ctx, events_db[best_key])
-    
+        return calculate_optimal_choice_from_db(ctx, events_db[key], key)
+
     log.info(f"🔄 Event '{event_name}' not in database")
     return None
 
-def warmup_event_index():
+
+def event_index() -> TextIndex:
+    global _event_index
     events_db = load_events_database()
-    if not events_db:
+    if _event_index is None or _event_index[0] is not events_db:
+        _event_index = (events_db, TextIndex(events_db.keys()))
+    return _event_index[1]
+
+
+def warmup_event_index():
+    if not load_events_database():
         return False
-    def normalizeString(text: str) -> str:
-        if not text:
-            return ""
-        t = unicodedata.normalize('NFKD', str(text))
-        t = t.lower().strip()
-        t = re.sub(r"[^a-z0-9]+", " ", t)
-        t = " ".join(t.split())
-        return t
-    def build_bigrams(text: str):
-        return Counter(text[i:i+2] for i in range(len(text) - 1)) if len(text) >= 2 else Counter()
-    cache_list = []
-    token_index = {}
-    norm_map = {}
-    for original_key in events_db.keys():
-        normalized_key = normalizeString(original_key)
-        tokens = set(normalized_key.split())
-        entry = (original_key, normalized_key, len(normalized_key), build_bigrams(normalized_key), tokens)
-        cache_list.append(entry)
-        norm_map[normalized_key] = original_key
-        idx = len(cache_list) - 1
-        for tok in tokens:
-            if tok:
-                token_index.setdefault(tok, []).append(idx)
-    setattr(get_local_event_choice, "cacheIndex", cache_list)
-    setattr(get_local_event_choice, "cacheSource", events_db)
-    setattr(get_local_event_choice, "cacheTokenIndex", token_index)
-    setattr(get_local_event_choice, "cacheNormalizedKeyMap", norm_map)
+    event_index()
     return True
 
 
-def calculate_optimal_choice_from_db(ctx: UmamusumeContext, event_data: dict) -> int:
-    """Calculate optimal choice from database event data"""
-    choices = event_data['choices']
-    stats = event_data['stats']
-    if not choices:
-        return 1
+DEFAULT_EVENT_WEIGHTS = {
+    'Power': 10,
+    'Speed': 10,
+    'Guts': 20,
+    'Stamina': 10,
+    'Wisdom': 1,
+    'Friendship': 15,
+    'Mood': 9999,
+    'Max Energy': 50,
+    'HP': 16,
+    'Skill': 10,
+    'Skill Hint': 100,
+    'Skill Pts': 10
+}
 
-    state = fetch_state()
-    energy = state["energy"]
-    year_text = state["year"] if state["year"] else "Unknown"
-    mood_val = state["mood"]
-    mood_text = f"Level {mood_val}" if mood_val is not None else "Unknown"
-    log.info(f"HP: {energy}, Year: {year_text}, Mood: {mood_text}")
+# 权重只取决于 (年份, 心情是否已满, 体力区间, 自定义权重), 按这几个值缓存权重向量
+_weight_vectors = {}
 
-    custom_weights = None
-    try:
-        if hasattr(ctx, 'task') and hasattr(ctx.task, 'detail') and hasattr(ctx.task.detail, 'event_weights'):
-            custom_weights = ctx.task.detail.event_weights
-    except Exception:
-        pass
 
+def energy_bucket(energy: int) -> str:
+    if energy > 84:
+        return "full"
+    if 40 <= energy <= 60:
+        return "mid"
+    return "other"
+
+
+def event_weights(custom_weights, year_text: str, mood_val, energy: int) -> dict:
     if custom_weights and isinstance(custom_weights, dict):
         if year_text == "Junior" and 'junior' in custom_weights:
             weights = dict(custom_weights['junior'])
@@ -265,35 +148,9 @@ def calculate_optimal_choice_from_db(ctx: UmamusumeContext, event_data: dict) ->
         elif year_text == "Senior" and 'senior' in custom_weights:
             weights = dict(custom_weights['senior'])
         else:
-            weights = {
-                'Power': 10,
-                'Speed': 10,
-                'Guts': 20,
-                'Stamina': 10,
-                'Wisdom': 1,
-                'Friendship': 15,
-                'Mood': 9999,
-                'Max Energy': 50,
-                'HP': 16,
-                'Skill': 10,
-                'Skill Hint': 100,
-                'Skill Pts': 10
-            }
+            weights = dict(DEFAULT_EVENT_WEIGHTS)
     else:
-        weights = {
-            'Power': 10,
-            'Speed': 10,
-            'Guts': 20,
-            'Stamina': 10,
-            'Wisdom': 1,
-            'Friendship': 15,
-            'Mood': 9999,
-            'Max Energy': 50,
-            'HP': 16,
-            'Skill': 10,
-            'Skill Hint': 100,
-            'Skill Pts': 10
-        }
+        weights = dict(DEFAULT_EVENT_WEIGHTS)
 
         if year_text == "Junior":
             weights['Friendship'] = 35
@@ -305,34 +162,93 @@ def calculate_optimal_choice_from_db(ctx: UmamusumeContext, event_data: dict) ->
         weights['Mood'] = 0
         log.info("Mood already maxxed")
 
-    if energy > 84:
+    bucket = energy_bucket(energy)
+    if bucket == "full":
         weights['HP'] = 0
         log.info("Energy already near full")
-    elif 40 <= energy <= 60:
+    elif bucket == "mid":
         weights['HP'] = 30
         log.info("Focusing on energy to avoid rest")
     else:
         if 'HP' not in weights:
             weights['HP'] = 16
+    return weights
+
+
+def event_weight_vector(event_stats, custom_weights, year_text: str, mood_val, energy: int):
+    key = (id(event_stats), id(custom_weights), year_text, mood_val == 5, energy_bucket(energy))
+    cached = _weight_vectors.get(key)
+    if cached is not None and cached[0] is custom_weights:
+        return cached[1], cached[2]
+    weights = event_weights(custom_weights, year_text, mood_val, energy)
+    vec = event_stats.weight_vector(weights)
+    if len(_weight_vectors) > 64:
+        _weight_vectors.clear()
+    _weight_vectors[key] = (custom_weights, weights, vec)
+    return weights, vec
+
+
+def event_state(ctx: UmamusumeContext):
+    """Energy / year / mood from the frame the event was detected on; the year comes from the parsed
+    turn date when there is one, so no OCR runs."""
+    img = getattr(ctx, 'current_screen', None)
+    energy = read_energy(img)
+    mood_val = read_mood(img)
+    year_text = None
+    try:
+        date = ctx.cultivate_detail.turn_info.date
+        if date is not None and date > 0:
+            year_text = "Junior" if date <= 24 else ("Classic" if date <= 48 else ("Senior" if date <= 72 else "Finals"))
+    except Exception:
+        pass
+    if year_text is None:
+        year_text = read_year(img)
+    return energy, year_text or "Unknown", mood_val
 
-    weight_str = ", ".join(f"{k}:{v}" for k, v in sorted(weights.items()))
-    log.info(f"Event weights: {weight_str}")
+
+def calculate_optimal_choice_from_db(ctx: UmamusumeContext, event_data: dict, event_key: str = None) -> int:
+    """Calculate optimal choice from database event data"""
+    choices = event_data['choices']
+    stats = event_data['stats']
+    if not choices:
+        return 1
+
+    energy, year_text, mood_val = event_state(ctx)
+    mood_text = f"Level {mood_val}" if mood_val is not None else "Unknown"
+    log.info(f"HP: {energy}, Year: {year_text}, Mood: {mood_text}")
+
+    custom_weights = None
+    try:
+        if hasattr(ctx, 'task') and hasattr(ctx.task, 'detail') and hasattr(ctx.task.detail, 'event_weights'):
+            custom_weights = ctx.task.detail.event_weights
+    except Exception:
+        pass
 
     best_choice = None
     best_score = -1
+    event_stats = _event_stats
+    if event_stats is not None and event_key in event_stats:
+        weights, vec = event_weight_vector(event_stats, custom_weights, year_text, mood_val, energy)
+        choice, score = event_stats.best_choice(event_key, vec)
+        if choice is not None and score > best_score:
+            best_choice, best_score = choice, score
+    else:
+        weights = event_weights(custom_weights, year_text, mood_val, energy)
+        for choice_num, choice_stats in stats.items():
+            choice_num_int = int(choice_num)
+            score = 0
+            for stat, value in choice_stats.items():
+                if stat in weights:
+                    score += value * weights[stat]
+            if score > best_score:
+                best_score = score
+                best_choice = choice_num_int
 
-    for choice_num, choice_stats in stats.items():
-        choice_num_int = int(choice_num)
-        score = 0
-        for stat, value in choice_stats.items():
-            if stat in weights:
-                score += value * weights[stat]
-        if score > best_score:
-            best_score = score
-            best_choice = choice_num_int
+    weight_str = ", ".join(f"{k}:{v}" for k, v in sorted(weights.items()))
+    log.info(f"Event weights: {weight_str}")
 
     if best_choice:
-        log.info(f"🎯 Optimal choice: {best_choice} (Score: {best_score})")
+        log.info(f"🎯 Optimal choice: {best_choice} (Score: {best_score:g})")
         return best_choice
 
     if choices:
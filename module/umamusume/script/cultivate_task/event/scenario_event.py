@@ -1,7 +1,7 @@
 from module.umamusume.context import UmamusumeContext
 from module.umamusume.define import TurnOperationType
 from module.umamusume.asset.template import REF_SELECTOR, REF_AOHARUHAI_TEAM_NAME
-from bot.recog.image_matcher import image_match
+from bot.recog.image_matcher import image_match, find_all
 from bot.conn.fetch import read_energy
 import time
 
@@ -32,15 +32,7 @@ def scenario_event_2(ctx: UmamusumeContext) -> int:
 # Youth Cup team name selection event
 def aoharuhai_team_name_event(ctx: UmamusumeContext) -> int:
     img = ctx.ctrl.get_screen(to_gray=True)
-    event_selector_list = []
-    while True:
-        match_result = image_match(img, REF_SELECTOR)
-        if match_result.find_match:
-            event_selector_list.append(match_result)
-            img[match_result.matched_area[0][1]:match_result.matched_area[1][1],
-            match_result.matched_area[0][0]:match_result.matched_area[1][0]] = 0
-        else:
-            break
+    event_selector_list = find_all(img, REF_SELECTOR, order="y")
 
     try:
         sel = int(getattr(ctx.task.detail.scenario_config.aoharu_config, 'aoharu_team_name_selection', 4))
@@ -0,0 +1,56 @@
+import numpy as np
+
+# 事件选项收益矩阵: (事件, 选项, 属性) 的稠密 float 矩阵, 权重是同一属性顺序的向量,
+# 选哪个选项只需要一次 values[row] @ weights.
+
+
+class EventStats:
+    def __init__(self, events: dict):
+        self.keys = list(events.keys())
+        self.rows = {k: i for i, k in enumerate(self.keys)}
+        names = set()
+        width = 0
+        for ev in events.values():
+            stats = ev.get('stats') or {}
+            width = max(width, len(stats))
+            for choice_stats in stats.values():
+                names.update(choice_stats.keys())
+        self.stat_names = sorted(names)
+        cols = {s: i for i, s in enumerate(self.stat_names)}
+        self.values = np.zeros((len(self.keys), width, len(self.stat_names)), dtype=np.float32)
+        self.choice_ids = np.zeros((len(self.keys), width), dtype=np.int16)
+        self.counts = np.zeros(len(self.keys), dtype=np.int16)
+        for r, ev in enumerate(events.values()):
+            stats = ev.get('stats') or {}
+            n = 0
+            for choice_num, choice_stats in stats.items():
+                try:
+                    self.choice_ids[r, n] = int(choice_num)
+                except (TypeError, ValueError):
+                    continue
+                for stat, value in choice_stats.items():
+                    try:
+                        self.values[r, n, cols[stat]] = float(value)
+                    except (TypeError, ValueError):
+                        pass
+                n += 1
+            self.counts[r] = n
+
+    def __contains__(self, key):
+        return key in self.rows
+
+    def weight_vector(self, weights: dict):
+        return np.array([float(weights.get(s, 0) or 0) for s in self.stat_names], dtype=np.float32)
+
+    def scores(self, key, w):
+        """(choice numbers, scores) of event `key` under weight vector `w`, in the database's choice order."""
+        r = self.rows[key]
+        n = int(self.counts[r])
+        return self.choice_ids[r, :n], self.values[r, :n] @ w
+
+    def best_choice(self, key, w):
+        ids, s = self.scores(key, w)
+        if len(ids) == 0:
+            return None, None
+        j = int(np.argmax(s))
+        return int(ids[j]), float(s[j])
@@ -0,0 +1,76 @@
+import json
+import os
+import time
+
+import bot.base.log as logger
+import bot.base.pickle_cache as pickle_cache
+import bot.recog.text_index as text_index
+from bot.recog.text_index import TextIndex
+import module.umamusume.script.cultivate_task.event.scorer as scorer
+from module.umamusume.script.cultivate_task.event.scorer import EventStats
+
+log = logger.get_logger(__name__)
+
+# event_data.json 的预编译快照: 事件数据、建好的匹配索引和选项收益矩阵一起 pickle,
+# 以源文件内容和 TextIndex / EventStats 源码的哈希作为失效条件. 进程重启后直接反序列化, 不再 json 解析 + 建索引.
+SNAPSHOT_VERSION = 2
+DEFAULT_SNAPSHOT_PATH = os.path.join("userdata", "event_data.pkl")
+
+_BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..', '..', '..'))
+EVENT_DATA_CANDIDATES = [
+    os.path.join(_BASE_DIR, 'resource', 'umamusume', 'data', 'event_data.json'),
+    os.path.join(os.getcwd(), 'resource', 'umamusume', 'data', 'event_data.json'),
+]
+
+
+def source_path():
+    for p in EVENT_DATA_CANDIDATES:
+        if os.path.exists(p):
+            return p
+    return None
+
+
+def snapshot_key(raw: bytes) -> str:
+    # TextIndex / EventStats 实例整个被 pickle, 两者源码变了也要重建
+    return pickle_cache.digest(SNAPSHOT_VERSION, raw, modules=(text_index, scorer))
+
+
+def compile_events(raw: bytes, key: str) -> dict:
+    events = json.loads(raw.decode("utf-8"))
+    return {"version": SNAPSHOT_VERSION, "hash": key, "events": events, "index": TextIndex(events.keys()),
+            "stats": EventStats(events)}
+
+
+def build_snapshot(src=None, dst=DEFAULT_SNAPSHOT_PATH):
+    src = src or source_path()
+    with open(src, "rb") as f:
+        raw = f.read()
+    key = snapshot_key(raw)
+    data = compile_events(raw, key)
+    pickle_cache.save(dst, key, data)
+    return data
+
+
+def load_snapshot(src=None, dst=DEFAULT_SNAPSHOT_PATH):
+    """{"events", "index", "stats", "source"} for event_data.json, or None when the file is missing."""
+    src = src or source_path()
+    if src is None:
+        return None
+    started = time.time()
+    with open(src, "rb") as f:
+        raw = f.read()
+    key = snapshot_key(raw)
+    data = pickle_cache.load(dst, key)
+    source = "snapshot"
+    if data is None:
+        source = "json"
+        data = compile_events(raw, key)
+        pickle_cache.save(dst, key, data)
+    data["source"] = source
+    log.info(f"event database: {len(data['events'])} events from {source} in {(time.time() - started) * 1000:.0f} ms")
+    return data
+
+
+if __name__ == "__main__":
+    d = build_snapshot()
+    print(f"{len(d['events'])} events -> {DEFAULT_SNAPSHOT_PATH}")
@@ -166,7 +166,7 @@ def script_info(ctx: UmamusumeContext):
                 ctx.ctrl.click_by_point(USE_TP_DRINK_CONFIRM)
             elif image_match(screen, REF_RECOVER_TP_2_CARROT).find_match:
                 ctx.ctrl.click_by_point(USE_CARROT_RECOVER_TP_ADD)
-                time.sleep(2)
+                ctx.ctrl.wait_for(changed=True, stable=True, timeout=2)
                 ctx.ctrl.click_by_point(USE_CARROT_RECOVER_CONFIRM)
             elif image_match(screen, REF_RECOVER_TP_3).find_match or\
                  image_match(screen, REF_RECOVER_TP_3_CARROT).find_match:
@@ -181,7 +181,7 @@ def script_info(ctx: UmamusumeContext):
             ctx.ctrl.click(383, 840, "new day")
         if title_text == TITLE[0]: #race details
             ctx.ctrl.click_by_point(CULTIVATE_GOAL_RACE_INTER_3)
-            time.sleep(1)
+            ctx.ctrl.wait_for(changed=True, stable=True, timeout=1)
         if title_text == TITLE[1]:  # "Rest & Outing Confirmation"
             log.info("🏖️ Handling Rest & Outing Confirmation")
             ctx.ctrl.click_by_point(INFO_SUMMER_REST_CONFIRM)
@@ -229,7 +229,7 @@ def script_info(ctx: UmamusumeContext):
             ctx.ctrl.click_by_point(CULTIVATE_FINISH_RETURN_CONFIRM)
         if title_text == TITLE[7]: #Quick Mode Settings
             ctx.ctrl.click_by_point(SCENARIO_SHORTEN_SET_2)
-            time.sleep(0.5)
+            ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.5)
             ctx.ctrl.click_by_point(SCENARIO_SHORTEN_CONFIRM)
         if title_text == TITLE[8]:
             img = ctx.current_screen
@@ -282,7 +282,7 @@ def script_info(ctx: UmamusumeContext):
             ctx.ctrl.click_by_point(CULTIVATE_FAN_NOT_ENOUGH_RETURN)
         if title_text == TITLE[43]:  
             ctx.ctrl.click_by_point(CULTIVATE_FAN_NOT_ENOUGH_RETURN)
-            time.sleep(2)
+            ctx.ctrl.wait_for(changed=True, stable=True, timeout=2)
 
             ctx.current_screen = ctx.ctrl.get_screen()
 
@@ -361,7 +361,7 @@ def script_info(ctx: UmamusumeContext):
                     ctx.ctrl.click_by_point(TACTIC_LIST[ctx.cultivate_detail.tactic_list[int((date - 1)/ 24)] - 1])
                 else:
                     ctx.ctrl.click_by_point(TACTIC_LIST[ctx.cultivate_detail.tactic_list[2] - 1])
-            time.sleep(0.5)
+            ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.5)
             ctx.ctrl.click_by_point(BEFORE_RACE_CHANGE_TACTIC_CONFIRM)
         if title_text == TITLE[20]:  # "Goal Not Reached" - Navigate to races to fulfill goal
             # For Oguri Cap G1 race goals, go to race selection instead of failing
@@ -369,7 +369,7 @@ def script_info(ctx: UmamusumeContext):
             
             # Close popup to return to main menu where date is visible
             ctx.ctrl.click_by_point(WIN_TIMES_NOT_ENOUGH_RETURN)
-            time.sleep(2)  # Wait longer for main menu to fully load
+            ctx.ctrl.wait_for(changed=True, stable=True, timeout=2)  # Wait longer for main menu to fully load
             
             # Refresh screen to get the actual main menu
             ctx.current_screen = ctx.ctrl.get_screen()
@@ -454,13 +454,13 @@ def script_info(ctx: UmamusumeContext):
             if ctx.task.detail.override_insufficient_fans_forced_races:
                 log.info("Override insufficient fans forced races is enabled")
                 ctx.ctrl.click_by_point(CULTIVATE_FAN_NOT_ENOUGH_RETURN)
-                time.sleep(0.3)
+                ctx.ctrl.wait_for(changed=True, stable=True, timeout=0.3)
                 return
             
             log.info("🏁 Navigating to races to fulfill fan goals")
             # Close popup to return to main menu where date is visible
             ctx.ctrl.click_by_point(CULTIVATE_FAN_NOT_ENOUGH_RETURN)
-            time.sleep(1)  # Wait longer for main menu to fully load
+            ctx.ctrl.wait_for(changed=True, stable=True, timeout=1)  # Wait longer for main menu to fully load
             
             # Refresh screen to get the actual main menu
             ctx.current_screen = ctx.ctrl.get_screen()
@@ -616,7 +616,7 @@ def script_info(ctx: UmamusumeContext):
                             match = True
                             break
                         ctx.ctrl.click(675, 800, "Switch to next difficulty")
-                        time.sleep(1)
+                        ctx.ctrl.wait_for(changed=True, stable=True, timeout=1)
                     if not match:
                         log.error(f"Selected difficulty {ctx.task.detail.fujikiseki_show_difficulty} is not unlocked yet, please play lower difficulty modes first!")
                         ctx.task.end_task(TaskStatus.TASK_STATUS_FAILED, UEndTaskReason.DIFFICULTY_LOCKED)
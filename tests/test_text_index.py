@@ -0,0 +1,50 @@
+import json
+import os
+
+import pytest
+
+from bot.recog.text_index import TextIndex
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'resource', 'umamusume', 'data')
+
+
+def _load(name):
+    with open(os.path.join(DATA_DIR, name), 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope="module")
+def event_index():
+    return TextIndex(_load('event_data.json').keys())
+
+
+@pytest.fixture(scope="module")
+def skill_index():
+    return TextIndex(s['name'] for s in _load('skill_data.json'))
+
+
+# 短名是查询的子串时不能直接拿满分
+@pytest.mark.parametrize("query, expected", [
+    ("Together Forever", None),
+    ("A Page About Cloudy Weaaher", "A Page About Cloudy Weather"),
+    ("Sbize Her!", "Seize Her!"),
+    ("A Lone Wolf Hunts Aloce", "A Lone Wolf Hunts Alone"),
+    ("Leave it to Me to Be Considevate! ♪", "Leave it to Me to Be Considerate! ♪"),
+])
+def test_event_lookup_ignores_short_substrings(event_index, query, expected):
+    assert event_index.lookup(query)[0] == expected
+
+
+@pytest.mark.parametrize("query, expected", [
+    ("Starboard Tillbthe End", "Starboard Till the End"),
+    ("Hot-blooled Gambler", "Hot-blooded Gambler"),
+    ("Schexuled Cooldown", "Scheduled Cooldown"),
+])
+def test_skill_lookup_ignores_short_substrings(skill_index, query, expected):
+    assert skill_index.lookup(query)[0] == expected
+
+
+def test_exact_and_close_substring_still_match(event_index, skill_index):
+    assert event_index.lookup("Her")[0] == "Her"
+    assert skill_index.lookup("Right Handed")[0] == "Right-Handed"
+    assert skill_index.lookup("Laplace's Demo")[0] == "Laplace's Demon"